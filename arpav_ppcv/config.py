@@ -1,4 +1,5 @@
 import logging
+import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -55,6 +56,69 @@ class AdminUserSettings(pydantic.BaseModel):
     )
 
 
+class MannKendallWindowSettings(pydantic.BaseModel):
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+
+
+class ObservationsHarvesterSettings(pydantic.BaseModel):
+    stations_refresh_interval_seconds: int = 60 * 60 * 24 * 7
+    monthly_measurements_refresh_interval_seconds: int = 60 * 60 * 24
+    seasonal_measurements_refresh_interval_seconds: int = 60 * 60 * 24
+    yearly_measurements_refresh_interval_seconds: int = 60 * 60 * 24
+    max_parallel_variables: int = 4
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_timeout_seconds: float = 30
+    # JSON file where the daemon writes the duration and throughput of recent runs
+    stats_file: Optional[Path] = None
+    # temporal windows for which Mann-Kendall trends are precomputed after each
+    # harvest - the default window spans the whole series
+    mann_kendall_windows: list[MannKendallWindowSettings] = pydantic.Field(
+        default_factory=lambda: [MannKendallWindowSettings()]
+    )
+
+
+class ReplaySettings(pydantic.BaseModel):
+    enabled: bool = False
+    fixtures_dir: Optional[Path] = None
+    latency_seconds: float = 0
+    latency_jitter_seconds: float = 0
+    error_rate: float = pydantic.Field(default=0, ge=0, le=1)
+    error_status_code: int = 503
+    random_seed: Optional[int] = None
+
+
+class ResponseCacheSettings(pydantic.BaseModel):
+    enabled: bool = True
+    max_entries: int = 1024
+    ttl_seconds: int = 60 * 60 * 24
+
+
+class ResponseCompressionSettings(pydantic.BaseModel):
+    enabled: bool = True
+    # responses smaller than this number of bytes are not compressed
+    minimum_size: int = pydantic.Field(default=1024, ge=0)
+    gzip_level: int = pydantic.Field(default=6, ge=1, le=9)
+    brotli_quality: int = pydantic.Field(default=5, ge=0, le=11)
+    # compressed bodies of stable responses that are kept in memory
+    cache_max_entries: int = pydantic.Field(default=256, ge=0)
+
+
+class VectorTileSettings(pydantic.BaseModel):
+    cache_enabled: bool = True
+    cache_dir: Path = Path(tempfile.gettempdir()) / "arpav-ppcv-tiles"
+    extent: int = pydantic.Field(default=4096, ge=256)
+    buffer: int = pydantic.Field(default=64, ge=0)
+
+
+class ProcessPoolSettings(pydantic.BaseModel):
+    enabled: bool = False
+    max_workers: int = pydantic.Field(default=2, ge=1)
+    # tasks beyond this limit are run in the calling thread instead of waiting
+    max_pending_tasks: int = pydantic.Field(default=8, ge=1)
+
+
 class ArpavPpcvSettings(BaseSettings):  # noqa
     model_config = SettingsConfigDict(
         env_prefix="ARPAV_PPCV__",  # noqa
@@ -76,10 +140,20 @@ class ArpavPpcvSettings(BaseSettings):  # noqa
     thredds_server: ThreddsServerSettings = ThreddsServerSettings()
     martin_tile_server_base_url: str = "http://localhost:3000"
     nearest_station_radius_meters: int = 10_000
+    # how long clients may use responses with an ETag before revalidating them
+    http_cache_max_age_seconds: int = pydantic.Field(default=0, ge=0)
     v2_api_mount_prefix: str = "/api/v2"
     log_config_file: Path | None = None
     session_secret_key: str = "changeme"
     admin_user: AdminUserSettings = AdminUserSettings()
+    observations_harvester: ObservationsHarvesterSettings = (
+        ObservationsHarvesterSettings()
+    )
+    http_replay: ReplaySettings = ReplaySettings()
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
+    response_compression: ResponseCompressionSettings = ResponseCompressionSettings()
+    process_pool: ProcessPoolSettings = ProcessPoolSettings()
+    vector_tiles: VectorTileSettings = VectorTileSettings()
     cors_origins: list[str] = []
     cors_methods: list[str] = []
     allow_cors_credentials: bool = False
@@ -1,31 +1,47 @@
 """Database utilities."""
 
+import datetime as dt
 import itertools
 import logging
 import re
 import uuid
 from typing import (
+    Iterable,
     Optional,
     Sequence,
 )
 
+import numpy as np
 import shapely
 import shapely.io
 import sqlalchemy.exc
+import sqlalchemy.orm
 import sqlmodel
 from geoalchemy2.shape import from_shape
 from sqlalchemy import func
+from sqlalchemy.dialects import postgresql
 
 from . import config
 from .schemas import (
     base,
     coverages,
+    datagenerations,
     municipalities,
     observations,
 )
 
 logger = logging.getLogger(__name__)
 
+_WEB_MERCATOR_WIDTH_METERS = 2 * 20_037_508.342789244
+
+_YEARLY_SERIES_PERIOD = "YEAR"
+_SEASON_MONTH_OFFSETS = {
+    base.Season.WINTER: 0,
+    base.Season.SPRING: 3,
+    base.Season.SUMMER: 6,
+    base.Season.AUTUMN: 9,
+}
+
 
 def get_engine(settings: config.ArpavPpcvSettings, use_test_db: Optional[bool] = False):
     db_dsn = settings.test_db_dsn if use_test_db else settings.db_dsn
@@ -40,6 +56,7 @@ def create_variable(
     """Create a new variable."""
     db_variable = observations.Variable(**variable_create.model_dump())
     session.add(db_variable)
+    bump_data_generations(session, [datagenerations.VARIABLES_DOMAIN])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -59,6 +76,7 @@ def create_many_variables(
         db_variable = observations.Variable(**variable_create.model_dump())
         db_records.append(db_variable)
         session.add(db_variable)
+    bump_data_generations(session, [datagenerations.VARIABLES_DOMAIN])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -99,6 +117,7 @@ def update_variable(
     for key, value in data_.items():
         setattr(db_variable, key, value)
     session.add(db_variable)
+    bump_data_generations(session, [datagenerations.VARIABLES_DOMAIN])
     session.commit()
     session.refresh(db_variable)
     return db_variable
@@ -109,6 +128,13 @@ def delete_variable(session: sqlmodel.Session, variable_id: uuid.UUID) -> None:
     db_variable = get_variable(session, variable_id)
     if db_variable is not None:
         session.delete(db_variable)
+        bump_data_generations(
+            session,
+            [
+                datagenerations.VARIABLES_DOMAIN,
+                datagenerations.get_measurements_domain(variable_id),
+            ],
+        )
         session.commit()
     else:
         raise RuntimeError("Variable not found")
@@ -154,6 +180,7 @@ def create_station(
         geom=wkbelement,
     )
     session.add(db_station)
+    bump_data_generations(session, [datagenerations.STATIONS_DOMAIN])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -178,6 +205,7 @@ def create_many_stations(
         )
         db_records.append(db_station)
         session.add(db_station)
+    bump_data_generations(session, [datagenerations.STATIONS_DOMAIN])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -188,6 +216,62 @@ def create_many_stations(
         return db_records
 
 
+def upsert_many_stations(
+    session: sqlmodel.Session,
+    stations_to_upsert: Sequence[observations.StationCreate],
+) -> list[observations.Station]:
+    """Create or update several stations in a single statement.
+
+    Stations are matched by their code, which is unique. When a station already
+    exists, its geometry, altitude, name, type and validity dates are overwritten
+    with the provided values.
+    """
+    if len(stations_to_upsert) == 0:
+        return []
+    rows = []
+    for station_upsert in stations_to_upsert:
+        geom = shapely.io.from_geojson(station_upsert.geom.model_dump_json())
+        rows.append(
+            {
+                **station_upsert.model_dump(exclude={"geom"}),
+                "id": uuid.uuid4(),
+                "geom": from_shape(geom),
+            }
+        )
+    insert_statement = postgresql.insert(observations.Station).values(rows)
+    upsert_statement = insert_statement.on_conflict_do_update(
+        index_elements=[observations.Station.code],
+        set_={
+            col: insert_statement.excluded[col]
+            for col in (
+                "geom",
+                "altitude_m",
+                "name",
+                "type_",
+                "active_since",
+                "active_until",
+            )
+        },
+    )
+    try:
+        session.execute(upsert_statement)
+        bump_data_generations(session, [datagenerations.STATIONS_DOMAIN])
+        session.commit()
+    except sqlalchemy.exc.DBAPIError:
+        raise
+    else:
+        return session.exec(
+            sqlmodel.select(observations.Station)
+            .where(
+                observations.Station.code.in_(  # type: ignore[attr-defined]
+                    [s.code for s in stations_to_upsert]
+                )
+            )
+            .order_by(observations.Station.code)
+            .execution_options(populate_existing=True)
+        ).all()
+
+
 def get_station(
     session: sqlmodel.Session, station_id: uuid.UUID
 ) -> Optional[observations.Station]:
@@ -220,6 +304,7 @@ def update_station(
     for key, value in data.items():
         setattr(db_station, key, value)
     session.add(db_station)
+    bump_data_generations(session, [datagenerations.STATIONS_DOMAIN])
     session.commit()
     session.refresh(db_station)
     return db_station
@@ -230,6 +315,7 @@ def delete_station(session: sqlmodel.Session, station_id: uuid.UUID) -> None:
     db_station = get_station(session, station_id)
     if db_station is not None:
         session.delete(db_station)
+        bump_data_generations(session, [datagenerations.STATIONS_DOMAIN])
         session.commit()
     else:
         raise RuntimeError("Station not found")
@@ -270,21 +356,10 @@ def list_stations(
             )
         )
     if all((variable_id_filter, variable_aggregation_type)):
-        if variable_aggregation_type == base.ObservationAggregationType.MONTHLY:
-            instance_class = observations.MonthlyMeasurement
-        elif variable_aggregation_type == base.ObservationAggregationType.SEASONAL:
-            instance_class = observations.SeasonalMeasurement
-        elif variable_aggregation_type == base.ObservationAggregationType.YEARLY:
-            instance_class = observations.YearlyMeasurement
-        else:
-            raise RuntimeError(
-                f"variable filtering for {variable_aggregation_type} is not supported"
+        statement = statement.where(
+            _get_station_availability_filter(
+                variable_id_filter, variable_aggregation_type
             )
-        statement = (
-            statement.join(instance_class)
-            .join(observations.Variable)
-            .where(observations.Variable.id == variable_id_filter)
-            .distinct()
         )
 
     else:
@@ -297,6 +372,195 @@ def list_stations(
     return items, num_items
 
 
+def collect_all_nearby_stations_with_data(
+    session: sqlmodel.Session,
+    *,
+    point_geom: shapely.Point,
+    polygon_intersection_filter: shapely.Polygon,
+    variable_id: uuid.UUID,
+    aggregation_type: base.ObservationAggregationType,
+    period_filter: Optional[str] = None,
+) -> Sequence[observations.Station]:
+    """Collect stations which have data for a variable, ordered by distance.
+
+    Data availability is read from the `stationvariableavailability` table. The
+    input geometries are expected to be in the EPSG:4326 CRS.
+    """
+    statement = (
+        sqlmodel.select(observations.Station)
+        .where(
+            func.ST_Intersects(
+                observations.Station.geom,
+                func.ST_GeomFromWKB(
+                    shapely.io.to_wkb(polygon_intersection_filter), 4326
+                ),
+            ),
+            _get_station_availability_filter(
+                variable_id, aggregation_type, period_filter=period_filter
+            ),
+        )
+        .order_by(
+            func.ST_Distance(
+                observations.Station.geom,
+                func.ST_GeomFromWKB(shapely.io.to_wkb(point_geom), 4326),
+            )
+        )
+    )
+    return session.exec(statement).all()
+
+
+def _get_station_availability_filter(
+    variable_id: uuid.UUID,
+    aggregation_type: base.ObservationAggregationType,
+    period_filter: Optional[str] = None,
+):
+    availability = observations.StationVariableAvailability
+    filters = [
+        availability.station_id == observations.Station.id,
+        availability.variable_id == variable_id,
+        availability.aggregation_type == aggregation_type,
+    ]
+    if period_filter is not None:
+        filters.append(availability.period == period_filter)
+    return sqlalchemy.exists().where(*filters)
+
+
+def get_station_vector_tile(
+    session: sqlmodel.Session,
+    z: int,
+    x: int,
+    y: int,
+    *,
+    variable_id: Optional[uuid.UUID] = None,
+    aggregation_type: Optional[base.ObservationAggregationType] = None,
+    extent: int = 4096,
+    buffer: int = 64,
+) -> bytes:
+    """Get a Mapbox Vector Tile with the stations inside a web mercator tile.
+
+    If ``variable_id`` and ``aggregation_type`` are provided, only stations that
+    have data for them are included, together with the years and number of
+    values that are available, as read from the ``stationvariableavailability``
+    table.
+    """
+    station = observations.Station
+    columns = [
+        station.id,
+        station.code,
+        station.name,
+        station.altitude_m,
+        station.active_since,
+        station.active_until,
+    ]
+    availability_subquery = None
+    if variable_id is not None and aggregation_type is not None:
+        availability = observations.StationVariableAvailability
+        availability_subquery = (
+            sqlalchemy.select(
+                availability.station_id,
+                func.min(availability.first_year).label("first_year"),
+                func.max(availability.last_year).label("last_year"),
+                func.sum(availability.value_count).label("value_count"),
+            )
+            .where(
+                availability.variable_id == variable_id,
+                availability.aggregation_type == aggregation_type,
+            )
+            .group_by(availability.station_id)
+            .subquery("availability")
+        )
+        columns.extend(
+            (
+                availability_subquery.c.first_year,
+                availability_subquery.c.last_year,
+                availability_subquery.c.value_count,
+            )
+        )
+    statement = _get_vector_tile_statement(
+        station.geom, columns, z, x, y, extent=extent, buffer=buffer
+    )
+    if availability_subquery is not None:
+        statement = statement.join(
+            availability_subquery,
+            availability_subquery.c.station_id == station.id,
+        )
+    return _render_vector_tile(session, statement, "stations", extent)
+
+
+def get_municipality_vector_tile(
+    session: sqlmodel.Session,
+    z: int,
+    x: int,
+    y: int,
+    *,
+    geometry_column: str = "geom",
+    extent: int = 4096,
+    buffer: int = 64,
+) -> bytes:
+    """Get a Mapbox Vector Tile with the municipalities inside a web mercator tile.
+
+    Municipalities are only selected by the bounding box of their full geometry
+    but their shape is read from ``geometry_column``, which is meant to be one of
+    the simplified geometry columns that is suitable for the tile's zoom level.
+    """
+    model = municipalities.Municipality
+    statement = _get_vector_tile_statement(
+        getattr(model, geometry_column),
+        [model.id, model.name, model.province_name, model.region_name],
+        z,
+        x,
+        y,
+        extent=extent,
+        buffer=buffer,
+        filter_geometry=model.geom,
+    )
+    return _render_vector_tile(session, statement, "municipalities", extent)
+
+
+def _get_vector_tile_statement(
+    geometry,
+    columns: Sequence,
+    z: int,
+    x: int,
+    y: int,
+    *,
+    extent: int,
+    buffer: int,
+    filter_geometry=None,
+):
+    """Select the tile geometry and properties of the features inside a tile.
+
+    Features are selected with the spatial index of ``filter_geometry``, which
+    defaults to ``geometry``.
+    """
+    envelope = func.ST_TileEnvelope(z, x, y)
+    # features in the tile's buffer are also included, as their geometries may
+    # extend into the tile
+    buffer_meters = _WEB_MERCATOR_WIDTH_METERS / 2**z * buffer / extent
+    return sqlalchemy.select(
+        func.ST_AsMVTGeom(
+            func.ST_Transform(geometry, 3857), envelope, extent, buffer, True
+        ).label("geom"),
+        *columns,
+    ).where(
+        (filter_geometry if filter_geometry is not None else geometry).op("&&")(
+            func.ST_Transform(func.ST_Expand(envelope, buffer_meters), 4326)
+        )
+    )
+
+
+def _render_vector_tile(
+    session: sqlmodel.Session, statement, layer_name: str, extent: int
+) -> bytes:
+    features = statement.subquery("features")
+    tile = session.execute(
+        sqlalchemy.select(
+            func.ST_AsMVT(features.table_valued(), layer_name, extent, "geom")
+        ).select_from(features)
+    ).scalar_one()
+    return bytes(tile) if tile is not None else b""
+
+
 def collect_all_stations(
     session: sqlmodel.Session,
     polygon_intersection_filter: shapely.Polygon = None,
@@ -330,6 +594,15 @@ def create_monthly_measurement(
         **monthly_measurement_create.model_dump()
     )
     session.add(db_monthly_measurement)
+    session.flush()
+    refresh_derived_measurement_data(
+        session,
+        base.ObservationAggregationType.MONTHLY,
+        station_id=db_monthly_measurement.station_id,
+        variable_id=db_monthly_measurement.variable_id,
+        commit=False,
+    )
+    _bump_measurements_data_generations(session, [db_monthly_measurement])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -354,6 +627,11 @@ def create_many_monthly_measurements(
         )
         db_records.append(db_monthly_measurement)
         session.add(db_monthly_measurement)
+    session.flush()
+    _refresh_derived_data_of_measurements(
+        session, base.ObservationAggregationType.MONTHLY, db_records
+    )
+    _bump_measurements_data_generations(session, db_records)
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -377,6 +655,15 @@ def delete_monthly_measurement(
     db_monthly_measurement = get_monthly_measurement(session, monthly_measurement_id)
     if db_monthly_measurement is not None:
         session.delete(db_monthly_measurement)
+        session.flush()
+        refresh_derived_measurement_data(
+            session,
+            base.ObservationAggregationType.MONTHLY,
+            station_id=db_monthly_measurement.station_id,
+            variable_id=db_monthly_measurement.variable_id,
+            commit=False,
+        )
+        _bump_measurements_data_generations(session, [db_monthly_measurement])
         session.commit()
     else:
         raise RuntimeError("Monthly measurement not found")
@@ -440,6 +727,129 @@ def collect_all_monthly_measurements(
     return result
 
 
+def get_monthly_measurement_time_series(
+    session: sqlmodel.Session,
+    *,
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    month: int,
+    start_date: Optional[dt.date] = None,
+    end_date: Optional[dt.date] = None,
+    moving_average_window: int = 5,
+) -> tuple[list[dt.date], list[float], list[Optional[float]]]:
+    """Get the time series of monthly measurements as plain arrays.
+
+    Returns the measurement dates, their values and the centered moving average of
+    the values. Moving average positions that do not have a full window are
+    returned as NULL.
+
+    All processing is done in the database, without loading ORM instances.
+    """
+    half_window = moving_average_window // 2
+    window = {
+        "order_by": observations.MonthlyMeasurement.date,
+        "rows": (-half_window, half_window),
+    }
+    series_query = (
+        sqlmodel.select(
+            observations.MonthlyMeasurement.date,
+            observations.MonthlyMeasurement.value,
+            sqlalchemy.case(
+                (
+                    func.count(observations.MonthlyMeasurement.value).over(**window)
+                    == moving_average_window,
+                    func.avg(observations.MonthlyMeasurement.value).over(**window),
+                ),
+                else_=None,
+            ).label("moving_average"),
+        )
+        .where(
+            *_get_monthly_measurement_series_filters(
+                station_id, variable_id, month, start_date, end_date
+            )
+        )
+        .subquery()
+    )
+    ordering = postgresql.aggregate_order_by
+    statement = sqlmodel.select(
+        func.array_agg(ordering(series_query.c.date, series_query.c.date)),
+        func.array_agg(ordering(series_query.c.value, series_query.c.date)),
+        func.array_agg(ordering(series_query.c.moving_average, series_query.c.date)),
+    )
+    dates, values, moving_averages = session.exec(statement).one()
+    return (
+        dates or [],
+        values or [],
+        [float(v) if v is not None else None for v in moving_averages or []],
+    )
+
+
+def get_monthly_measurement_decade_means(
+    session: sqlmodel.Session,
+    *,
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    month: int,
+    start_date: Optional[dt.date] = None,
+    end_date: Optional[dt.date] = None,
+    min_years_per_decade: int = 7,
+) -> tuple[list[int], list[float]]:
+    """Get the mean of monthly measurements for each climatological decade.
+
+    Climatological decades start at year 1 and end at year 10 - the returned decade
+    is identified by the year that precedes its start (_i.e._ 1990 stands for
+    1991-2000). Decades with less than `min_years_per_decade` measurements are
+    discarded.
+    """
+    decade = (
+        (
+            sqlalchemy.cast(
+                func.extract("YEAR", observations.MonthlyMeasurement.date),
+                sqlalchemy.Integer,
+            )
+            - 1
+        )
+        // 10
+        * 10
+    ).label("decade")
+    statement = (
+        sqlmodel.select(decade, func.avg(observations.MonthlyMeasurement.value))
+        .where(
+            *_get_monthly_measurement_series_filters(
+                station_id, variable_id, month, start_date, end_date
+            )
+        )
+        .group_by(decade)
+        .having(func.count() >= min_years_per_decade)
+        .order_by(decade)
+    )
+    decades = []
+    means = []
+    for decade_year, mean in session.exec(statement):
+        decades.append(decade_year)
+        means.append(float(mean))
+    return decades, means
+
+
+def _get_monthly_measurement_series_filters(
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    month: int,
+    start_date: Optional[dt.date],
+    end_date: Optional[dt.date],
+) -> list:
+    filters = [
+        observations.MonthlyMeasurement.station_id == station_id,
+        observations.MonthlyMeasurement.variable_id == variable_id,
+        func.extract("MONTH", observations.MonthlyMeasurement.date) == month,
+    ]
+    if start_date is not None:
+        filters.append(observations.MonthlyMeasurement.date >= start_date)
+    if end_date is not None:
+        filters.append(observations.MonthlyMeasurement.date <= end_date)
+    return filters
+
+
 def create_seasonal_measurement(
     session: sqlmodel.Session,
     measurement_create: observations.SeasonalMeasurementCreate,
@@ -447,6 +857,15 @@ def create_seasonal_measurement(
     """Create a new seasonal measurement."""
     db_measurement = observations.SeasonalMeasurement(**measurement_create.model_dump())
     session.add(db_measurement)
+    session.flush()
+    refresh_derived_measurement_data(
+        session,
+        base.ObservationAggregationType.SEASONAL,
+        station_id=db_measurement.station_id,
+        variable_id=db_measurement.variable_id,
+        commit=False,
+    )
+    _bump_measurements_data_generations(session, [db_measurement])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -468,6 +887,11 @@ def create_many_seasonal_measurements(
         )
         db_records.append(db_measurement)
         session.add(db_measurement)
+    session.flush()
+    _refresh_derived_data_of_measurements(
+        session, base.ObservationAggregationType.SEASONAL, db_records
+    )
+    _bump_measurements_data_generations(session, db_records)
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -491,6 +915,15 @@ def delete_seasonal_measurement(
     db_measurement = get_seasonal_measurement(session, measurement_id)
     if db_measurement is not None:
         session.delete(db_measurement)
+        session.flush()
+        refresh_derived_measurement_data(
+            session,
+            base.ObservationAggregationType.SEASONAL,
+            station_id=db_measurement.station_id,
+            variable_id=db_measurement.variable_id,
+            commit=False,
+        )
+        _bump_measurements_data_generations(session, [db_measurement])
         session.commit()
     else:
         raise RuntimeError("Seasonal measurement not found")
@@ -559,6 +992,15 @@ def create_yearly_measurement(
     """Create a new yearly measurement."""
     db_measurement = observations.YearlyMeasurement(**measurement_create.model_dump())
     session.add(db_measurement)
+    session.flush()
+    refresh_derived_measurement_data(
+        session,
+        base.ObservationAggregationType.YEARLY,
+        station_id=db_measurement.station_id,
+        variable_id=db_measurement.variable_id,
+        commit=False,
+    )
+    _bump_measurements_data_generations(session, [db_measurement])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -580,6 +1022,11 @@ def create_many_yearly_measurements(
         )
         db_records.append(db_measurement)
         session.add(db_measurement)
+    session.flush()
+    _refresh_derived_data_of_measurements(
+        session, base.ObservationAggregationType.YEARLY, db_records
+    )
+    _bump_measurements_data_generations(session, db_records)
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -603,6 +1050,15 @@ def delete_yearly_measurement(
     db_measurement = get_yearly_measurement(session, measurement_id)
     if db_measurement is not None:
         session.delete(db_measurement)
+        session.flush()
+        refresh_derived_measurement_data(
+            session,
+            base.ObservationAggregationType.YEARLY,
+            station_id=db_measurement.station_id,
+            variable_id=db_measurement.variable_id,
+            commit=False,
+        )
+        _bump_measurements_data_generations(session, [db_measurement])
         session.commit()
     else:
         raise RuntimeError("Yearly measurement not found")
@@ -657,6 +1113,527 @@ def collect_all_yearly_measurements(
     return result
 
 
+def get_measurement_series(
+    session: sqlmodel.Session,
+    *,
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    aggregation_type: base.ObservationAggregationType,
+    month_filter: Optional[int] = None,
+    season_filter: Optional[base.Season] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Get a series of measurements as arrays of times and values.
+
+    Series are read from the compact `measurementseries` table, which requires a
+    single index lookup. If the series has not been built yet, measurements are
+    read from their respective table instead.
+
+    Only the time key and value columns are selected, so no ORM instances are
+    built. Times are returned as a `datetime64[D]` array, sorted in ascending
+    order, and are computed arithmetically from the time key:
+
+    - monthly measurements use their date
+    - seasonal measurements use the first day of the season's reference month -
+      January for winter, April for spring, July for summer and October for autumn
+    - yearly measurements use the first day of the year
+    """
+    statement = sqlmodel.select(
+        observations.MeasurementSeries.period,
+        observations.MeasurementSeries.start_year,
+        observations.MeasurementSeries.measurement_values,
+    ).where(
+        observations.MeasurementSeries.station_id == station_id,
+        observations.MeasurementSeries.variable_id == variable_id,
+        observations.MeasurementSeries.aggregation_type == aggregation_type,
+    )
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        if month_filter is not None:
+            statement = statement.where(
+                observations.MeasurementSeries.period == str(month_filter)
+            )
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        if season_filter is not None:
+            statement = statement.where(
+                observations.MeasurementSeries.period == season_filter.value
+            )
+    rows = session.exec(statement).all()
+    if len(rows) == 0:
+        return _get_measurement_series_from_measurements(
+            session,
+            station_id=station_id,
+            variable_id=variable_id,
+            aggregation_type=aggregation_type,
+            month_filter=month_filter,
+            season_filter=season_filter,
+        )
+    all_times = []
+    all_values = []
+    for period, start_year, measurement_values in rows:
+        values = np.array(measurement_values, dtype=float)
+        month_offset = _get_measurement_series_month_offset(aggregation_type, period)
+        months = (start_year - 1970 + np.arange(len(values))) * 12 + month_offset
+        has_value = ~np.isnan(values)
+        all_times.append(months[has_value].astype("datetime64[M]"))
+        all_values.append(values[has_value])
+    times = np.concatenate(all_times).astype("datetime64[D]")
+    values = np.concatenate(all_values)
+    order = np.argsort(times, kind="stable")
+    return times[order], values[order]
+
+
+def rebuild_measurement_series(
+    session: sqlmodel.Session,
+    aggregation_type: base.ObservationAggregationType,
+    *,
+    station_id: Optional[uuid.UUID] = None,
+    variable_id: Optional[uuid.UUID] = None,
+    commit: bool = True,
+) -> int:
+    """Rebuild the compact representation of measurement series.
+
+    Returns the number of series that were stored.
+    """
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        model = observations.MonthlyMeasurement
+        period = sqlalchemy.cast(func.extract("MONTH", model.date), sqlalchemy.Integer)
+        year = sqlalchemy.cast(func.extract("YEAR", model.date), sqlalchemy.Integer)
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        model = observations.SeasonalMeasurement
+        period = model.season
+        year = model.year
+    elif aggregation_type == base.ObservationAggregationType.YEARLY:
+        model = observations.YearlyMeasurement
+        period = sqlalchemy.literal(_YEARLY_SERIES_PERIOD)
+        year = model.year
+    else:
+        raise RuntimeError(f"aggregation type {aggregation_type} is not supported")
+    filters = []
+    series_filters = [
+        observations.MeasurementSeries.aggregation_type == aggregation_type
+    ]
+    if station_id is not None:
+        filters.append(model.station_id == station_id)
+        series_filters.append(observations.MeasurementSeries.station_id == station_id)
+    if variable_id is not None:
+        filters.append(model.variable_id == variable_id)
+        series_filters.append(observations.MeasurementSeries.variable_id == variable_id)
+    # postgres does not accept ordering by a constant, so the literal period
+    # of yearly series is referred to by its label instead
+    period = period.label("period")
+    year = year.label("year")
+    statement = (
+        sqlmodel.select(model.station_id, model.variable_id, period, year, model.value)
+        .where(*filters)
+        .order_by(model.station_id, model.variable_id, period, year)
+    )
+    rows = []
+    for (
+        series_station_id,
+        series_variable_id,
+        series_period,
+    ), measurements in itertools.groupby(
+        session.exec(statement), key=lambda r: tuple(r[:3])
+    ):
+        years, values = zip(*(m[3:] for m in measurements))
+        start_year = years[0]
+        series_values = [None] * (years[-1] - start_year + 1)
+        for measurement_year, value in zip(years, values):
+            series_values[measurement_year - start_year] = value
+        rows.append(
+            {
+                "station_id": series_station_id,
+                "variable_id": series_variable_id,
+                "aggregation_type": aggregation_type,
+                "period": (
+                    series_period.value
+                    if isinstance(series_period, base.Season)
+                    else str(series_period)
+                ),
+                "start_year": start_year,
+                "measurement_values": series_values,
+            }
+        )
+    session.execute(
+        sqlalchemy.delete(observations.MeasurementSeries).where(*series_filters)
+    )
+    for batch_start in range(0, len(rows), 1000):
+        session.execute(
+            postgresql.insert(observations.MeasurementSeries).values(
+                rows[batch_start : batch_start + 1000]
+            )
+        )
+    if commit:
+        session.commit()
+    return len(rows)
+
+
+def refresh_derived_measurement_data(
+    session: sqlmodel.Session,
+    aggregation_type: base.ObservationAggregationType,
+    *,
+    station_id: Optional[uuid.UUID] = None,
+    variable_id: Optional[uuid.UUID] = None,
+    commit: bool = True,
+) -> None:
+    """Refresh the data that is derived from measurements.
+
+    This is meant to be called whenever measurements are created or deleted. The
+    compact series and the availability summary are rebuilt, while precomputed
+    statistics are deleted - they are recomputed by a batch job and, in the
+    meantime, computed on the fly.
+    """
+    rebuild_measurement_series(
+        session,
+        aggregation_type,
+        station_id=station_id,
+        variable_id=variable_id,
+        commit=False,
+    )
+    refresh_station_variable_availability(
+        session,
+        aggregation_type,
+        station_id=station_id,
+        variable_id=variable_id,
+        commit=False,
+    )
+    delete_measurement_statistics(
+        session,
+        aggregation_type,
+        station_id=station_id,
+        variable_id=variable_id,
+        commit=False,
+    )
+    if commit:
+        session.commit()
+
+
+def refresh_station_variable_availability(
+    session: sqlmodel.Session,
+    aggregation_type: base.ObservationAggregationType,
+    *,
+    station_id: Optional[uuid.UUID] = None,
+    variable_id: Optional[uuid.UUID] = None,
+    commit: bool = True,
+) -> int:
+    """Refresh the summary of available measurements.
+
+    Returns the number of availability records that were stored.
+    """
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        model = observations.MonthlyMeasurement
+        period = sqlalchemy.cast(
+            sqlalchemy.cast(func.extract("MONTH", model.date), sqlalchemy.Integer),
+            sqlalchemy.String,
+        )
+        year = sqlalchemy.cast(func.extract("YEAR", model.date), sqlalchemy.Integer)
+        group_by = [period]
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        model = observations.SeasonalMeasurement
+        period = sqlalchemy.cast(model.season, sqlalchemy.String)
+        year = model.year
+        group_by = [period]
+    elif aggregation_type == base.ObservationAggregationType.YEARLY:
+        model = observations.YearlyMeasurement
+        period = sqlalchemy.literal(_YEARLY_SERIES_PERIOD)
+        year = model.year
+        # postgres does not accept grouping by a constant
+        group_by = []
+    else:
+        raise RuntimeError(f"aggregation type {aggregation_type} is not supported")
+    availability = observations.StationVariableAvailability
+    filters = []
+    availability_filters = [availability.aggregation_type == aggregation_type]
+    if station_id is not None:
+        filters.append(model.station_id == station_id)
+        availability_filters.append(availability.station_id == station_id)
+    if variable_id is not None:
+        filters.append(model.variable_id == variable_id)
+        availability_filters.append(availability.variable_id == variable_id)
+    summary = (
+        sqlmodel.select(
+            model.station_id,
+            model.variable_id,
+            sqlalchemy.literal(aggregation_type.name).cast(
+                availability.__table__.c.aggregation_type.type
+            ),
+            period,
+            func.min(year),
+            func.max(year),
+            func.count(),
+        )
+        .where(*filters)
+        .group_by(model.station_id, model.variable_id, *group_by)
+    )
+    session.execute(sqlalchemy.delete(availability).where(*availability_filters))
+    result = session.execute(
+        sqlalchemy.insert(availability).from_select(
+            [
+                "station_id",
+                "variable_id",
+                "aggregation_type",
+                "period",
+                "first_year",
+                "last_year",
+                "value_count",
+            ],
+            summary,
+        )
+    )
+    # station lists are filtered by data availability
+    bump_data_generations(session, [datagenerations.STATIONS_DOMAIN])
+    if commit:
+        session.commit()
+    return result.rowcount
+
+
+def list_station_variable_availabilities(
+    session: sqlmodel.Session,
+    *,
+    limit: int = 20,
+    offset: int = 0,
+    station_id_filter: Optional[uuid.UUID] = None,
+    variable_id_filter: Optional[uuid.UUID] = None,
+    aggregation_type_filter: Optional[base.ObservationAggregationType] = None,
+    include_total: bool = False,
+) -> tuple[Sequence[observations.StationVariableAvailability], Optional[int]]:
+    """List the summary of available measurements."""
+    availability = observations.StationVariableAvailability
+    statement = sqlmodel.select(availability).order_by(
+        availability.station_id,
+        availability.variable_id,
+        availability.aggregation_type,
+        availability.period,
+    )
+    if station_id_filter is not None:
+        statement = statement.where(availability.station_id == station_id_filter)
+    if variable_id_filter is not None:
+        statement = statement.where(availability.variable_id == variable_id_filter)
+    if aggregation_type_filter is not None:
+        statement = statement.where(
+            availability.aggregation_type == aggregation_type_filter
+        )
+    items = session.exec(statement.offset(offset).limit(limit)).all()
+    num_items = _get_total_num_records(session, statement) if include_total else None
+    return items, num_items
+
+
+def collect_all_measurement_series(
+    session: sqlmodel.Session,
+    *,
+    aggregation_type_filter: Optional[base.ObservationAggregationType] = None,
+    station_id_filter: Optional[uuid.UUID] = None,
+    variable_id_filter: Optional[uuid.UUID] = None,
+    period_filter: Optional[str] = None,
+) -> Sequence[observations.MeasurementSeries]:
+    statement = sqlmodel.select(observations.MeasurementSeries)
+    if aggregation_type_filter is not None:
+        statement = statement.where(
+            observations.MeasurementSeries.aggregation_type == aggregation_type_filter
+        )
+    if station_id_filter is not None:
+        statement = statement.where(
+            observations.MeasurementSeries.station_id == station_id_filter
+        )
+    if variable_id_filter is not None:
+        statement = statement.where(
+            observations.MeasurementSeries.variable_id == variable_id_filter
+        )
+    if period_filter is not None:
+        statement = statement.where(
+            observations.MeasurementSeries.period == period_filter
+        )
+    return session.exec(statement).all()
+
+
+def replace_measurement_statistics(
+    session: sqlmodel.Session,
+    aggregation_type: base.ObservationAggregationType,
+    trends: Sequence[observations.MeasurementTrend],
+    decade_means: Sequence[observations.MeasurementDecadeMean],
+    *,
+    station_id: Optional[uuid.UUID] = None,
+    variable_id: Optional[uuid.UUID] = None,
+) -> None:
+    """Replace the precomputed statistics of measurement series.
+
+    Existing statistics that match the input aggregation type, station and
+    variable are deleted before the new ones are stored.
+    """
+    delete_measurement_statistics(
+        session,
+        aggregation_type,
+        station_id=station_id,
+        variable_id=variable_id,
+        commit=False,
+    )
+    for model, instances in (
+        (observations.MeasurementTrend, trends),
+        (observations.MeasurementDecadeMean, decade_means),
+    ):
+        rows = [instance.model_dump() for instance in instances]
+        for batch_start in range(0, len(rows), 1000):
+            session.execute(
+                postgresql.insert(model).values(rows[batch_start : batch_start + 1000])
+            )
+    session.commit()
+
+
+def delete_measurement_statistics(
+    session: sqlmodel.Session,
+    aggregation_type: base.ObservationAggregationType,
+    *,
+    station_id: Optional[uuid.UUID] = None,
+    variable_id: Optional[uuid.UUID] = None,
+    commit: bool = True,
+) -> None:
+    """Delete the precomputed statistics of measurement series.
+
+    This is meant to be called whenever measurements change, so that stale
+    statistics are never served.
+    """
+    for model in (observations.MeasurementTrend, observations.MeasurementDecadeMean):
+        filters = [model.aggregation_type == aggregation_type]
+        if station_id is not None:
+            filters.append(model.station_id == station_id)
+        if variable_id is not None:
+            filters.append(model.variable_id == variable_id)
+        session.execute(sqlalchemy.delete(model).where(*filters))
+    if commit:
+        session.commit()
+
+
+def collect_all_measurement_trends(
+    session: sqlmodel.Session,
+    *,
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    window: str,
+    aggregation_type_filter: Optional[base.ObservationAggregationType] = None,
+) -> Sequence[observations.MeasurementTrend]:
+    statement = sqlmodel.select(observations.MeasurementTrend).where(
+        observations.MeasurementTrend.station_id == station_id,
+        observations.MeasurementTrend.variable_id == variable_id,
+        observations.MeasurementTrend.window == window,
+    )
+    if aggregation_type_filter is not None:
+        statement = statement.where(
+            observations.MeasurementTrend.aggregation_type == aggregation_type_filter
+        )
+    return session.exec(statement).all()
+
+
+def collect_all_period_measurement_trends(
+    session: sqlmodel.Session,
+    *,
+    variable_id: uuid.UUID,
+    aggregation_type: base.ObservationAggregationType,
+    period: str,
+    window: str,
+) -> Sequence[observations.MeasurementTrend]:
+    """Collect the precomputed trends of all stations for a variable and period."""
+    statement = sqlmodel.select(observations.MeasurementTrend).where(
+        observations.MeasurementTrend.variable_id == variable_id,
+        observations.MeasurementTrend.aggregation_type == aggregation_type,
+        observations.MeasurementTrend.period == period,
+        observations.MeasurementTrend.window == window,
+    )
+    return session.exec(statement).all()
+
+
+def collect_all_measurement_decade_means(
+    session: sqlmodel.Session,
+    *,
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    aggregation_type_filter: Optional[base.ObservationAggregationType] = None,
+) -> Sequence[observations.MeasurementDecadeMean]:
+    """Collect precomputed decade means, sorted by decade."""
+    statement = (
+        sqlmodel.select(observations.MeasurementDecadeMean)
+        .where(
+            observations.MeasurementDecadeMean.station_id == station_id,
+            observations.MeasurementDecadeMean.variable_id == variable_id,
+        )
+        .order_by(observations.MeasurementDecadeMean.decade)
+    )
+    if aggregation_type_filter is not None:
+        statement = statement.where(
+            observations.MeasurementDecadeMean.aggregation_type
+            == aggregation_type_filter
+        )
+    return session.exec(statement).all()
+
+
+def _get_measurement_series_month_offset(
+    aggregation_type: base.ObservationAggregationType, period: str
+) -> int:
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        result = int(period) - 1
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        result = _SEASON_MONTH_OFFSETS[base.Season(period)]
+    else:
+        result = 0
+    return result
+
+
+def _get_measurement_series_from_measurements(
+    session: sqlmodel.Session,
+    *,
+    station_id: uuid.UUID,
+    variable_id: uuid.UUID,
+    aggregation_type: base.ObservationAggregationType,
+    month_filter: Optional[int] = None,
+    season_filter: Optional[base.Season] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        model = observations.MonthlyMeasurement
+        statement = sqlmodel.select(model.date, model.value).order_by(model.date)
+        if month_filter is not None:
+            statement = statement.where(
+                func.extract("MONTH", model.date) == month_filter
+            )
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        model = observations.SeasonalMeasurement
+        statement = sqlmodel.select(model.year, model.season, model.value).order_by(
+            model.year, model.season
+        )
+        if season_filter is not None:
+            statement = statement.where(model.season == season_filter)
+    elif aggregation_type == base.ObservationAggregationType.YEARLY:
+        model = observations.YearlyMeasurement
+        statement = sqlmodel.select(model.year, model.value).order_by(model.year)
+    else:
+        raise RuntimeError(f"aggregation type {aggregation_type} is not supported")
+    statement = statement.where(
+        model.station_id == station_id, model.variable_id == variable_id
+    )
+    columns = list(zip(*session.exec(statement)))
+    if len(columns) == 0:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+    values = np.array(columns[-1], dtype=float)
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        times = np.array(columns[0], dtype="datetime64[D]")
+    else:
+        years = np.array(columns[0], dtype=np.int64)
+        if aggregation_type == base.ObservationAggregationType.SEASONAL:
+            month_offsets = np.array(
+                [_SEASON_MONTH_OFFSETS[season] for season in columns[1]],
+                dtype=np.int64,
+            )
+        else:
+            month_offsets = 0
+        times = (
+            ((years - 1970) * 12 + month_offsets)
+            .astype("datetime64[M]")
+            .astype("datetime64[D]")
+        )
+        # seasons are not sorted chronologically by their database ordering
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        values = values[order]
+    return times, values
+
+
 def get_configuration_parameter_value(
     session: sqlmodel.Session, configuration_parameter_value_id: uuid.UUID
 ) -> Optional[coverages.ConfigurationParameterValue]:
@@ -785,6 +1762,7 @@ def create_configuration_parameter_value(
         **parameter_value.model_dump()
     )
     session.add(db_param_value)
+    bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
     session.commit()
     session.refresh(db_param_value)
     return db_param_value
@@ -814,6 +1792,7 @@ def create_configuration_parameter(
         db_configuration_parameter.allowed_values.append(db_conf_param_value)
         to_refresh.append(db_conf_param_value)
     session.add(db_configuration_parameter)
+    bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
     session.commit()
     for item in to_refresh:
         session.refresh(item)
@@ -861,12 +1840,28 @@ def update_configuration_parameter(
         setattr(db_configuration_parameter, key, value)
     session.add(db_configuration_parameter)
     to_refresh.append(db_configuration_parameter)
+    bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
     session.commit()
     for item in to_refresh:
         session.refresh(item)
     return db_configuration_parameter
 
 
+def delete_configuration_parameter(
+    session: sqlmodel.Session, configuration_parameter_id: uuid.UUID
+) -> None:
+    """Delete a configuration parameter."""
+    db_configuration_parameter = get_configuration_parameter(
+        session, configuration_parameter_id
+    )
+    if db_configuration_parameter is not None:
+        session.delete(db_configuration_parameter)
+        bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
+        session.commit()
+    else:
+        raise RuntimeError("Configuration parameter not found")
+
+
 def get_coverage_configuration(
     session: sqlmodel.Session, coverage_configuration_id: uuid.UUID
 ) -> Optional[coverages.CoverageConfiguration]:
@@ -1074,6 +2069,7 @@ def create_coverage_configuration(
                 f"Configuration parameter value with id "
                 f"{possible.configuration_parameter_value_id} does not exist"
             )
+    bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
     session.commit()
     for item in to_refresh:
         session.refresh(item)
@@ -1149,12 +2145,28 @@ def update_coverage_configuration(
         setattr(db_coverage_configuration, key, value)
     session.add(db_coverage_configuration)
     to_refresh.append(db_coverage_configuration)
+    bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
     session.commit()
     for item in to_refresh:
         session.refresh(item)
     return db_coverage_configuration
 
 
+def delete_coverage_configuration(
+    session: sqlmodel.Session, coverage_configuration_id: uuid.UUID
+) -> None:
+    """Delete a coverage configuration."""
+    db_coverage_configuration = get_coverage_configuration(
+        session, coverage_configuration_id
+    )
+    if db_coverage_configuration is not None:
+        session.delete(db_coverage_configuration)
+        bump_data_generations(session, [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN])
+        session.commit()
+    else:
+        raise RuntimeError("Coverage configuration not found")
+
+
 def generate_coverage_identifiers(
     coverage_configuration: coverages.CoverageConfiguration,
     configuration_parameter_values_filter: Optional[
@@ -1207,18 +2219,37 @@ def list_municipalities(
     name_filter: Optional[str] = None,
     province_name_filter: Optional[str] = None,
     region_name_filter: Optional[str] = None,
+    id_filter: Optional[Sequence[uuid.UUID]] = None,
+    geometry_column: Optional[str] = "geom",
 ) -> Optional[municipalities.Municipality]:
     """List existing municipalities.
 
     Both ``polygon_intersection_filter`` and ``point_filter`` parameters are expected
     to be a geometries in the EPSG:4326 CRS.
+
+    Only the geometry column named by ``geometry_column`` is loaded, or none at
+    all if it is ``None``. Accessing the other geometry columns of the returned
+    municipalities raises an error.
     """
-    statement = sqlmodel.select(municipalities.Municipality).order_by(
-        municipalities.Municipality.name
+    statement = (
+        sqlmodel.select(municipalities.Municipality)
+        .options(
+            *(
+                sqlalchemy.orm.defer(
+                    getattr(municipalities.Municipality, name), raiseload=True
+                )
+                for name in municipalities.GEOMETRY_COLUMN_NAMES
+                if name != geometry_column
+            )
+        )
+        .order_by(municipalities.Municipality.name)
     )
     if name_filter is not None:
-        statement = _add_substring_filter(
-            statement, name_filter, municipalities.Municipality.name
+        # uses the trigram index on the normalized name
+        statement = statement.where(
+            municipalities.Municipality.search_name.contains(
+                municipalities.normalize_search_name(name_filter), autoescape=True
+            )
         )
     if province_name_filter is not None:
         statement = _add_substring_filter(
@@ -1228,6 +2259,10 @@ def list_municipalities(
         statement = _add_substring_filter(
             statement, region_name_filter, municipalities.Municipality.region_name
         )
+    if id_filter is not None:
+        statement = statement.where(
+            municipalities.Municipality.id.in_(id_filter)  # type: ignore[attr-defined]
+        )
     if polygon_intersection_filter is not None:
         statement = statement.where(
             func.ST_Intersects(
@@ -1249,6 +2284,53 @@ def list_municipalities(
     return items, num_items
 
 
+def search_municipalities(
+    session: sqlmodel.Session,
+    query: str,
+    *,
+    limit: int = 10,
+) -> list[municipalities.Municipality]:
+    """Search municipalities by name, for autocompletion.
+
+    Both the query and the names are compared after being normalized, which makes
+    the search insensitive to case and accents. Names that contain the query
+    are matched, as well as names that have a word similar to it, which allows
+    for typos. Names that start with the query are ranked first, followed by the
+    ones that are most similar to it.
+
+    Only the centroid geometry of the returned municipalities is loaded.
+    """
+    model = municipalities.Municipality
+    search_name = municipalities.normalize_search_name(query)
+    if search_name == "":
+        return []
+    statement = (
+        sqlmodel.select(model)
+        .options(
+            *(
+                sqlalchemy.orm.defer(getattr(model, name), raiseload=True)
+                for name in municipalities.GEOMETRY_COLUMN_NAMES
+                if name != "centroid"
+            )
+        )
+        .where(
+            sqlalchemy.or_(
+                model.search_name.contains(search_name, autoescape=True),
+                # word similarity operator of pg_trgm, which is supported by
+                # the trigram index when the column is on its left
+                model.search_name.op("%>")(search_name),
+            )
+        )
+        .order_by(
+            model.search_name.startswith(search_name, autoescape=True).desc(),
+            func.word_similarity(search_name, model.search_name).desc(),
+            model.name,
+        )
+        .limit(limit)
+    )
+    return session.exec(statement).all()
+
+
 def create_many_municipalities(
     session: sqlmodel.Session,
     municipalities_to_create: Sequence[municipalities.MunicipalityCreate],
@@ -1261,9 +2343,13 @@ def create_many_municipalities(
         db_mun = municipalities.Municipality(
             **mun_create.model_dump(exclude={"geom"}),
             geom=wkbelement,
+            search_name=municipalities.normalize_search_name(mun_create.name),
         )
         db_records.append(db_mun)
         session.add(db_mun)
+    session.flush()
+    update_municipality_derived_geometries(session, [r.id for r in db_records])
+    bump_data_generations(session, [datagenerations.MUNICIPALITIES_DOMAIN])
     try:
         session.commit()
     except sqlalchemy.exc.DBAPIError:
@@ -1274,6 +2360,36 @@ def create_many_municipalities(
         return db_records
 
 
+def update_municipality_derived_geometries(
+    session: sqlmodel.Session,
+    municipality_ids: Optional[Sequence[uuid.UUID]] = None,
+) -> None:
+    """Compute the simplified geometries, centroid and bbox of municipalities.
+
+    Simplification preserves the topology of each municipality. If
+    ``municipality_ids`` is ``None``, all municipalities are updated. This does
+    not commit the session.
+    """
+    model = municipalities.Municipality
+    statement = sqlalchemy.update(model).values(
+        {
+            simplification.column_name: func.ST_Multi(
+                func.ST_SimplifyPreserveTopology(model.geom, simplification.tolerance)
+            )
+            for simplification in municipalities.MunicipalityGeometrySimplification
+            if simplification.tolerance is not None
+        }
+        | {
+            "centroid": func.ST_Centroid(model.geom),
+            "bbox": func.ST_Envelope(model.geom),
+        }
+    )
+    if municipality_ids is not None:
+        statement = statement.where(model.id.in_(municipality_ids))  # type: ignore[attr-defined]
+    # the updated municipalities are refreshed by the caller, if needed
+    session.execute(statement.execution_options(synchronize_session=False))
+
+
 def list_coverage_identifiers(
     session: sqlmodel.Session,
     *,
@@ -1383,6 +2499,121 @@ def ensure_uncertainty_type_configuration_parameters_exist(
     return lower_bound_value, upper_bound_value
 
 
+def bump_data_generations(session: sqlmodel.Session, domains: Iterable[str]) -> None:
+    """Increment the generation counter of the input data domains.
+
+    This also broadcasts the new generations, together with the time they were
+    stored, with a Postgres NOTIFY. It does not
+    commit the session - it is meant to be called from within the same transaction
+    that modifies the data, so that both the counter increment and the
+    notification only take effect if the transaction is committed.
+    """
+    # sorting the domains ensures concurrent transactions lock rows in the same order
+    for domain in sorted(set(domains)):
+        insert_statement = postgresql.insert(datagenerations.DataGeneration).values(
+            domain=domain, generation=1, updated_at=func.now()
+        )
+        generation, updated_at = session.execute(
+            insert_statement.on_conflict_do_update(
+                index_elements=[datagenerations.DataGeneration.domain],
+                set_={
+                    "generation": datagenerations.DataGeneration.generation + 1,
+                    "updated_at": func.now(),
+                },
+            ).returning(
+                datagenerations.DataGeneration.generation,
+                datagenerations.DataGeneration.updated_at,
+            )
+        ).one()
+        session.execute(
+            sqlmodel.select(
+                func.pg_notify(
+                    datagenerations.NOTIFICATION_CHANNEL,
+                    datagenerations.build_notification_payload(
+                        domain, generation, updated_at
+                    ),
+                )
+            )
+        )
+
+
+def get_data_generations(
+    session: sqlmodel.Session, domains: Optional[Iterable[str]] = None
+) -> dict[str, int]:
+    """Get the current generation of data domains.
+
+    Domains that have never been modified are reported as being at generation 0.
+    """
+    statement = sqlmodel.select(
+        datagenerations.DataGeneration.domain,
+        datagenerations.DataGeneration.generation,
+    )
+    if domains is not None:
+        domains = list(domains)
+        statement = statement.where(
+            datagenerations.DataGeneration.domain.in_(domains)  # type: ignore[attr-defined]
+        )
+        result = {domain: 0 for domain in domains}
+    else:
+        result = {}
+    result.update(
+        {domain: generation for domain, generation in session.exec(statement)}
+    )
+    return result
+
+
+def list_data_generations(
+    session: sqlmodel.Session, domains: Iterable[str]
+) -> list[datagenerations.DataGeneration]:
+    """List the generation records of data domains.
+
+    Domains that have never been modified have no record.
+    """
+    statement = sqlmodel.select(datagenerations.DataGeneration).where(
+        datagenerations.DataGeneration.domain.in_(list(domains))  # type: ignore[attr-defined]
+    )
+    return session.exec(statement).all()
+
+
+def _bump_measurements_data_generations(
+    session: sqlmodel.Session,
+    db_measurements: Iterable[
+        observations.MonthlyMeasurement
+        | observations.SeasonalMeasurement
+        | observations.YearlyMeasurement
+    ],
+) -> None:
+    bump_data_generations(
+        session,
+        {
+            datagenerations.get_measurements_domain(m.variable_id)
+            for m in db_measurements
+        },
+    )
+
+
+def _refresh_derived_data_of_measurements(
+    session: sqlmodel.Session,
+    aggregation_type: base.ObservationAggregationType,
+    db_measurements: Iterable[
+        observations.MonthlyMeasurement
+        | observations.SeasonalMeasurement
+        | observations.YearlyMeasurement
+    ],
+) -> None:
+    """Refresh the derived data of each station and variable of the measurements."""
+    for station_id, variable_id in sorted(
+        {(m.station_id, m.variable_id) for m in db_measurements}
+    ):
+        refresh_derived_measurement_data(
+            session,
+            aggregation_type,
+            station_id=station_id,
+            variable_id=variable_id,
+            commit=False,
+        )
+
+
 def _get_total_num_records(session: sqlmodel.Session, statement):
     return session.exec(
         sqlmodel.select(sqlmodel.func.count()).select_from(statement)
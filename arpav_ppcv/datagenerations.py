@@ -0,0 +1,319 @@
+"""Tracking of data generations and generation-aware response caching.
+
+Whenever data is modified through the `database` module, the generation of the
+affected data domain is incremented and broadcast with a Postgres NOTIFY (check
+`database.bump_data_generations()`). Each web worker process runs a
+`DataGenerationTracker`, which listens for these notifications in a background
+thread and evicts the affected entries of its `ResponseCache` instances.
+
+Cache entries also record the generations of the domains they depend on at the
+time they were stored, and are only served if those are still current, as known
+by the tracker. The tracker reloads all generations from the database whenever
+the listener reconnects, and also periodically, so a missed notification results
+in stale entries being served for at most `resync_interval_seconds`.
+"""
+
+import collections
+import dataclasses
+import datetime as dt
+import logging
+import select
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+)
+
+import sqlalchemy
+import sqlmodel
+
+from . import database
+from .schemas import datagenerations
+
+logger = logging.getLogger(__name__)
+
+
+class DataGenerationTracker:
+    """Keep an up-to-date view of the generation of data domains."""
+
+    def __init__(
+        self,
+        engine: sqlalchemy.Engine,
+        poll_timeout_seconds: float = 5,
+        reconnect_delay_seconds: float = 5,
+        resync_interval_seconds: float = 60,
+    ):
+        self.engine = engine
+        self.poll_timeout_seconds = poll_timeout_seconds
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.resync_interval_seconds = resync_interval_seconds
+        self._generations: dict[str, int] = {}
+        self._updated_at: dict[str, dt.datetime] = {}
+        self._listeners: list[Callable[[str, int], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._caches: dict[str, "ResponseCache"] = {}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen, name="data-generation-listener", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def add_listener(self, listener: Callable[[str, int], None]) -> None:
+        """Register a callable to be notified with each changed domain and generation."""
+        self._listeners.append(listener)
+
+    def get_cache(self, name: str, **kwargs) -> "ResponseCache":
+        """Get the named response cache, creating it if needed."""
+        with self._lock:
+            if (cache := self._caches.get(name)) is None:
+                cache = ResponseCache(self, **kwargs)
+                self._caches[name] = cache
+        return cache
+
+    def get_generations(self, domains: Iterable[str]) -> dict[str, int]:
+        domains = list(domains)
+        with self._lock:
+            missing = [d for d in domains if d not in self._generations]
+        if len(missing) > 0:
+            with sqlmodel.Session(self.engine) as session:
+                loaded = database.list_data_generations(session, missing)
+            with self._lock:
+                for db_generation in loaded:
+                    if db_generation.domain not in self._generations:
+                        self._generations[
+                            db_generation.domain
+                        ] = db_generation.generation
+                        self._updated_at[
+                            db_generation.domain
+                        ] = db_generation.updated_at
+                # domains that have never been modified are at generation 0
+                for domain in missing:
+                    self._generations.setdefault(domain, 0)
+        with self._lock:
+            return {d: self._generations[d] for d in domains}
+
+    def get_last_modified(self, domains: Iterable[str]) -> Optional[dt.datetime]:
+        """Return when any of the input domains was last modified, if known.
+
+        This is the time the change was stored in the database, so that all web
+        workers report the same value.
+        """
+        domains = list(domains)
+        self.get_generations(domains)
+        with self._lock:
+            timestamps = [self._updated_at[d] for d in domains if d in self._updated_at]
+        return max(timestamps, default=None)
+
+    def handle_notification(self, payload: str) -> None:
+        try:
+            domain, generation, updated_at = datagenerations.parse_notification_payload(
+                payload
+            )
+        except ValueError:
+            logger.warning(f"Ignoring invalid data generation notification {payload!r}")
+        else:
+            self._update(domain, generation, updated_at)
+
+    def _update(
+        self, domain: str, generation: int, updated_at: Optional[dt.datetime]
+    ) -> None:
+        with self._lock:
+            # generations only go back if the database has been reset, in which
+            # case cached data is stale as well
+            if self._generations.get(domain) == generation:
+                return
+            self._generations[domain] = generation
+            if updated_at is not None:
+                self._updated_at[domain] = updated_at
+            else:
+                self._updated_at.pop(domain, None)
+        for listener in self._listeners:
+            try:
+                listener(domain, generation)
+            except Exception:
+                logger.exception(f"Data generation listener {listener!r} failed")
+
+    def _resync(self) -> None:
+        with self._lock:
+            known = list(self._generations)
+        with sqlmodel.Session(self.engine) as session:
+            current = {
+                db_generation.domain: db_generation
+                for db_generation in database.list_data_generations(session, known)
+            }
+        for domain in known:
+            if (db_generation := current.get(domain)) is not None:
+                self._update(domain, db_generation.generation, db_generation.updated_at)
+            else:
+                self._update(domain, 0, None)
+
+    def _listen(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                raw_connection = self.engine.raw_connection()
+                try:
+                    dbapi_connection = raw_connection.driver_connection
+                    dbapi_connection.autocommit = True
+                    with dbapi_connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {datagenerations.NOTIFICATION_CHANNEL}")
+                    # notifications may have been missed while not listening
+                    self._resync()
+                    last_resync = time.monotonic()
+                    while not self._stop_event.is_set():
+                        # notifications are not guaranteed to be delivered, so
+                        # generations are also reloaded periodically
+                        if (
+                            time.monotonic() - last_resync
+                            >= self.resync_interval_seconds
+                        ):
+                            self._resync()
+                            last_resync = time.monotonic()
+                        ready, _, _ = select.select(
+                            [dbapi_connection], [], [], self.poll_timeout_seconds
+                        )
+                        if ready:
+                            dbapi_connection.poll()
+                            while dbapi_connection.notifies:
+                                notification = dbapi_connection.notifies.pop(0)
+                                self.handle_notification(notification.payload)
+                finally:
+                    raw_connection.invalidate()
+            except Exception:
+                logger.exception(
+                    f"Data generation listener failed, reconnecting in "
+                    f"{self.reconnect_delay_seconds}s..."
+                )
+                self._stop_event.wait(self.reconnect_delay_seconds)
+
+
+@dataclasses.dataclass(frozen=True)
+class _CacheEntry:
+    value: Any
+    generations: dict[str, int]
+    expires_at: float
+
+
+class ResponseCache:
+    """A bounded, generation-aware in-memory cache.
+
+    Each entry declares the data domains it depends on. It is evicted as soon as
+    the tracker learns that any of them changed, so it is safe to use long TTLs.
+    """
+
+    def __init__(
+        self,
+        tracker: DataGenerationTracker,
+        max_entries: int = 1024,
+        ttl_seconds: float = 60 * 60 * 24,
+    ):
+        self.tracker = tracker
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: collections.OrderedDict[
+            Hashable, _CacheEntry
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        tracker.add_listener(self.evict_domain)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        is_current = entry.expires_at > time.monotonic() and (
+            self.tracker.get_generations(entry.generations) == entry.generations
+        )
+        with self._lock:
+            if is_current:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                return entry.value
+            self._entries.pop(key, None)
+        return None
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        domains: Iterable[str],
+        generations: Optional[dict[str, int]] = None,
+    ) -> None:
+        """Store a value.
+
+        Pass the `generations` of the domains read before computing the value, if
+        known, so that a concurrent change results in the entry being stale.
+        """
+        if generations is None:
+            generations = self.tracker.get_generations(domains)
+        self._store(key, value, generations)
+
+    def get_or_set(
+        self, key: Hashable, domains: Iterable[str], factory: Callable[[], Any]
+    ) -> Any:
+        if (value := self.get(key)) is None:
+            # generations are read before computing the value, so that a concurrent
+            # change results in the new entry being considered stale
+            generations = self.tracker.get_generations(domains)
+            value = factory()
+            self._store(key, value, generations)
+        return value
+
+    def evict_domain(self, domain: str, generation: int) -> None:
+        with self._lock:
+            stale_keys = [
+                key
+                for key, entry in self._entries.items()
+                if entry.generations.get(domain, generation) != generation
+            ]
+            for key in stale_keys:
+                del self._entries[key]
+        if len(stale_keys) > 0:
+            logger.debug(
+                f"Evicted {len(stale_keys)} cache entries after {domain!r} changed"
+            )
+
+    def _store(self, key: Hashable, value: Any, generations: dict[str, int]) -> None:
+        entry = _CacheEntry(
+            value=value,
+            generations=generations,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_trackers: dict[str, DataGenerationTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(engine: sqlalchemy.Engine) -> DataGenerationTracker:
+    """Get the started tracker for the database of the input engine.
+
+    There is a single tracker per database in each process.
+    """
+    key = engine.url.render_as_string(hide_password=False)
+    with _trackers_lock:
+        if (tracker := _trackers.get(key)) is None:
+            tracker = DataGenerationTracker(engine)
+            tracker.start()
+            _trackers[key] = tracker
+    return tracker
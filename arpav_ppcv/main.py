@@ -27,6 +27,7 @@ from rich.panel import Panel
 from . import (
     config,
     database,
+    queryplans,
 )
 from .cliapp.app import app as cli_app
 from .bootstrapper.cliapp import app as bootstrapper_app
@@ -93,6 +94,70 @@ def upgrade_db(ctx: typer.Context, revision_identifier: Optional[str] = None) ->
     print("Done!")
 
 
+@db_app.command(name="explain")
+def explain_queries(
+    ctx: typer.Context,
+    num_stations: Annotated[
+        int, typer.Option(help="Number of synthetic stations to create.")
+    ] = 50,
+    num_variables: Annotated[
+        int, typer.Option(help="Number of synthetic variables to create.")
+    ] = 5,
+    start_year: Annotated[
+        int, typer.Option(help="First year of synthetic measurements.")
+    ] = 1950,
+    end_year: Annotated[
+        int, typer.Option(help="Last year of synthetic measurements.")
+    ] = 2020,
+    fail_on_sequential_scan: Annotated[
+        bool,
+        typer.Option(
+            help=(
+                "Exit with an error if any query reads a measurement table with "
+                "a sequential scan."
+            )
+        ),
+    ] = True,
+) -> None:
+    """Run EXPLAIN ANALYZE on the main observation queries.
+
+    Queries are run against a synthetic dataset, which is created in a
+    transaction that is rolled back at the end, so the database is left as it
+    was.
+    """
+    with sqlmodel.Session(ctx.obj["engine"]) as session:
+        try:
+            print("Creating synthetic dataset...")
+            dataset = queryplans.create_synthetic_dataset(
+                session,
+                num_stations=num_stations,
+                num_variables=num_variables,
+                start_year=start_year,
+                end_year=end_year,
+            )
+            plans = queryplans.explain_query_shapes(session, dataset)
+        finally:
+            session.rollback()
+    regressions = []
+    for query_plan in plans:
+        print(
+            Panel(
+                "\n".join(query_plan.plan),
+                title=query_plan.name,
+                expand=False,
+            )
+        )
+        if len(seq_scans := query_plan.sequential_scans) > 0:
+            regressions.append(f"{query_plan.name}: {', '.join(seq_scans)}")
+    if len(regressions) > 0:
+        print("[red]Sequential scans on measurement tables found:[/red]")
+        for regression in regressions:
+            print(f"- {regression}")
+        if fail_on_sequential_scan:
+            raise typer.Exit(code=1)
+    print("Done!")
+
+
 @app.command()
 def run_server(ctx: typer.Context):
     """Run the uvicorn server.
@@ -1,25 +1,41 @@
+import contextlib
+import json
+import logging
+import signal
+
 import httpx
 import sqlmodel
 import typer
 from rich import print
 from typing import (
     Annotated,
+    Iterator,
     Literal,
 )
 
 from .. import database
-from . import operations
+from .. import operations as base_operations
+from ..schemas.base import ObservationAggregationType
+from . import (
+    operations,
+    scheduler,
+)
+
+logger = logging.getLogger(__name__)
 
 app = typer.Typer()
 
 
 @app.command()
 def refresh_stations(ctx: typer.Context) -> None:
-    client = httpx.Client()
-    with sqlmodel.Session(ctx.obj["engine"]) as session:
-        created = operations.refresh_stations(client, session)
-        print(f"Created {len(created)} stations:")
-        print("\n".join(s.code for s in created))
+    with (
+        _job_lock(ctx, scheduler.STATIONS_JOB_NAME),
+        _get_http_client(ctx) as client,
+        sqlmodel.Session(ctx.obj["engine"]) as session,
+    ):
+        upserted = operations.refresh_stations(client, session)
+        print(f"Created or updated {len(upserted)} stations:")
+        print("\n".join(s.code for s in upserted))
 
 
 @app.command()
@@ -45,8 +61,14 @@ def refresh_monthly_measurements(
         ),
     ] = None,
 ) -> None:
-    client = httpx.Client()
-    with sqlmodel.Session(ctx.obj["engine"]) as session:
+    with (
+        _job_lock(
+            ctx,
+            scheduler.get_measurements_job_name(ObservationAggregationType.MONTHLY),
+        ),
+        _get_http_client(ctx) as client,
+        sqlmodel.Session(ctx.obj["engine"]) as session,
+    ):
         for station_code in station:
             print(f"Processing station: {station_code!r}...")
             created = _refresh_measurements(
@@ -84,8 +106,14 @@ def refresh_seasonal_measurements(
         ),
     ] = None,
 ) -> None:
-    client = httpx.Client()
-    with sqlmodel.Session(ctx.obj["engine"]) as session:
+    with (
+        _job_lock(
+            ctx,
+            scheduler.get_measurements_job_name(ObservationAggregationType.SEASONAL),
+        ),
+        _get_http_client(ctx) as client,
+        sqlmodel.Session(ctx.obj["engine"]) as session,
+    ):
         if len(station) > 0:
             for station_code in station:
                 print(f"Processing station {station_code!r}...")
@@ -123,8 +151,14 @@ def refresh_yearly_measurements(
         ),
     ] = None,
 ) -> None:
-    client = httpx.Client()
-    with sqlmodel.Session(ctx.obj["engine"]) as session:
+    with (
+        _job_lock(
+            ctx,
+            scheduler.get_measurements_job_name(ObservationAggregationType.YEARLY),
+        ),
+        _get_http_client(ctx) as client,
+        sqlmodel.Session(ctx.obj["engine"]) as session,
+    ):
         if len(station) > 0:
             for station_code in station:
                 print(f"Processing station {station_code!r}...")
@@ -139,6 +173,158 @@ def refresh_yearly_measurements(
         )
 
 
+@app.command()
+def rebuild_measurement_series(
+    ctx: typer.Context,
+    aggregation_type: Annotated[
+        list[ObservationAggregationType],
+        typer.Option(
+            default_factory=list,
+            help=(
+                "Temporal aggregation type of the series to rebuild. If not "
+                "provided, all aggregation types are processed."
+            ),
+        ),
+    ],
+) -> None:
+    """Rebuild the compact representation of measurement series."""
+    with sqlmodel.Session(ctx.obj["engine"]) as session:
+        for type_ in aggregation_type or list(ObservationAggregationType):
+            with _job_lock(ctx, scheduler.get_measurements_job_name(type_)):
+                num_series = database.rebuild_measurement_series(session, type_)
+            print(f"Rebuilt {num_series} {type_.value.lower()} series")
+
+
+@app.command()
+def refresh_station_variable_availability(
+    ctx: typer.Context,
+    aggregation_type: Annotated[
+        list[ObservationAggregationType],
+        typer.Option(
+            default_factory=list,
+            help=(
+                "Temporal aggregation type of the measurements to summarize. If "
+                "not provided, all aggregation types are processed."
+            ),
+        ),
+    ],
+) -> None:
+    """Refresh the summary of measurements available for each station and variable."""
+    with sqlmodel.Session(ctx.obj["engine"]) as session:
+        for type_ in aggregation_type or list(ObservationAggregationType):
+            with _job_lock(ctx, scheduler.get_measurements_job_name(type_)):
+                num_records = database.refresh_station_variable_availability(
+                    session, type_
+                )
+            print(f"Stored {num_records} {type_.value.lower()} availability records")
+
+
+@app.command()
+def refresh_measurement_statistics(
+    ctx: typer.Context,
+    aggregation_type: Annotated[
+        list[ObservationAggregationType],
+        typer.Option(
+            default_factory=list,
+            help=(
+                "Temporal aggregation type of the series to process. If not "
+                "provided, all aggregation types are processed."
+            ),
+        ),
+    ],
+) -> None:
+    """Precompute Mann-Kendall trends and decade means of measurement series.
+
+    Trends are computed for each of the windows configured in the
+    `observations_harvester.mann_kendall_windows` setting.
+    """
+    windows = scheduler.get_mann_kendall_windows(
+        ctx.obj["settings"].observations_harvester
+    )
+    with sqlmodel.Session(ctx.obj["engine"]) as session:
+        for type_ in aggregation_type or list(ObservationAggregationType):
+            with _job_lock(ctx, scheduler.get_measurements_job_name(type_)):
+                num_series = base_operations.refresh_measurement_statistics(
+                    session, windows, aggregation_type_filter=type_
+                )
+            print(f"Refreshed statistics of {num_series} {type_.value.lower()} series")
+
+
+@app.command()
+def daemon(
+    ctx: typer.Context,
+    run_once: Annotated[
+        bool,
+        typer.Option(
+            help="Run all jobs a single time and exit instead of looping forever."
+        ),
+    ] = False,
+) -> None:
+    """Run the harvesting jobs periodically, according to the configured intervals."""
+    settings = ctx.obj["settings"]
+    with scheduler.build_http_client(settings) as client:
+        harvest_scheduler = scheduler.HarvestScheduler(
+            jobs=scheduler.build_default_jobs(settings.observations_harvester),
+            engine=ctx.obj["engine"],
+            http_client=client,
+            stats_file=settings.observations_harvester.stats_file,
+        )
+        if run_once:
+            for stats in harvest_scheduler.run_pending():
+                print(
+                    f"{stats.job_name}: processed {stats.num_processed} items in "
+                    f"{stats.duration_seconds:.2f}s"
+                    + (" (skipped)" if stats.skipped else "")
+                    + (f" (failed: {stats.error})" if stats.error else "")
+                )
+        else:
+
+            def handle_signal(signum, frame):
+                logger.info(f"Received signal {signum}, stopping...")
+                harvest_scheduler.stop()
+
+            signal.signal(signal.SIGTERM, handle_signal)
+            signal.signal(signal.SIGINT, handle_signal)
+            harvest_scheduler.run_forever()
+
+
+@app.command()
+def stats(ctx: typer.Context) -> None:
+    """Show the last run of each job, as written by the daemon."""
+    stats_file = ctx.obj["settings"].observations_harvester.stats_file
+    if stats_file is None:
+        raise SystemExit("The observations_harvester.stats_file setting is not set")
+    try:
+        contents = json.loads(stats_file.read_text())
+    except FileNotFoundError:
+        raise SystemExit(f"No harvest stats have been written to {stats_file} yet")
+    for job_name, last_run in contents["last_runs"].items():
+        if last_run is None:
+            print(f"{job_name}: not run yet")
+        else:
+            print(
+                f"{job_name}: last run at {last_run['started_at']} processed "
+                f"{last_run['num_processed']} items in "
+                f"{last_run['duration_seconds']:.2f}s "
+                f"({last_run['throughput']:.2f} items/s)"
+                + (" (skipped)" if last_run["skipped"] else "")
+                + (f" (failed: {last_run['error']})" if last_run["error"] else "")
+            )
+
+
+def _get_http_client(ctx: typer.Context) -> httpx.Client:
+    return scheduler.build_http_client(ctx.obj["settings"])
+
+
+@contextlib.contextmanager
+def _job_lock(ctx: typer.Context, job_name: str) -> Iterator[None]:
+    """Prevent running concurrently with the daemon job of the same name."""
+    with scheduler.advisory_lock(ctx.obj["engine"], job_name) as acquired:
+        if not acquired:
+            raise SystemExit(f"Another {job_name!r} run is in progress, try later")
+        yield
+
+
 def _refresh_measurements(
     db_session: sqlmodel.Session,
     client: httpx.Client,
@@ -1,14 +1,16 @@
+import concurrent.futures
 import datetime as dt
+import functools
 import logging
 import uuid
 from typing import Optional
 
 import geojson_pydantic
 import httpx
+import numpy as np
 import pyproj
-import shapely
-import shapely.ops
 import sqlmodel
+from geoalchemy2.shape import to_shape
 
 from .. import (
     database,
@@ -20,76 +22,112 @@ logger = logging.getLogger(__name__)
 
 
 def harvest_stations(
-    client: httpx.Client, db_session: sqlmodel.Session
+    client: httpx.Client,
+    db_session: sqlmodel.Session,
+    max_workers: int = 4,
 ) -> list[observations.StationCreate]:
-    existing_stations = {s.code: s for s in database.collect_all_stations(db_session)}
-    stations_create = {}
-    coord_converter = pyproj.Transformer.from_crs(
-        pyproj.CRS("epsg:4258"), pyproj.CRS("epsg:4326"), always_xy=True
-    ).transform
+    """Discover new and modified stations.
+
+    Active stations are fetched for all known variables concurrently and then merged
+    together. The coordinates of all discovered stations are reprojected from
+    EPSG:4258 to EPSG:4326 in a single vectorized operation.
+
+    The result includes both stations that do not exist yet and existing stations
+    whose location, name, type, altitude or validity dates have changed. It is meant
+    to be fed into `database.upsert_many_stations()`.
+    """
     existing_variables = database.collect_all_variables(db_session)
-    for idx, variable in enumerate(existing_variables):
-        logger.info(
-            f"({idx+1}/{len(existing_variables)}) Processing stations for "
-            f"variable {variable.name!r}..."
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = executor.map(
+            functools.partial(_fetch_variable_stations, client),
+            existing_variables,
         )
-        response = client.get(
-            "https://api.arpa.veneto.it/REST/v1/clima_indicatori/staz_attive",
-            params={"indicatore": variable.name},
+        raw_stations = {}
+        for variable_raw_stations in responses:
+            for raw_station in variable_raw_stations:
+                raw_stations.setdefault(str(raw_station["statcd"]), raw_station)
+    if len(raw_stations) == 0:
+        return []
+    coord_transformer = pyproj.Transformer.from_crs(
+        pyproj.CRS("epsg:4258"), pyproj.CRS("epsg:4326"), always_xy=True
+    )
+    lons, lats = coord_transformer.transform(
+        np.array([s["EPSG4258_LON"] for s in raw_stations.values()], dtype=float),
+        np.array([s["EPSG4258_LAT"] for s in raw_stations.values()], dtype=float),
+    )
+    existing_stations = {s.code: s for s in database.collect_all_stations(db_session)}
+    to_upsert = []
+    for station_code, raw_station, lon, lat in zip(
+        raw_stations.keys(), raw_stations.values(), lons, lats
+    ):
+        station_create = observations.StationCreate(
+            code=station_code,
+            geom=geojson_pydantic.Point(type="Point", coordinates=(lon, lat)),
+            altitude_m=raw_station["altitude"],
+            name=raw_station["statnm"],
+            type_=raw_station["stattype"].lower().replace(" ", "_"),
+            active_since=_parse_date(raw_station.get("iniziovalidita")),
+            active_until=_parse_date(raw_station.get("finevalidita")),
         )
-        response.raise_for_status()
-        for raw_station in response.json().get("data", []):
-            station_code = str(raw_station["statcd"])
-            if raw_start := raw_station.get("iniziovalidita"):
-                try:
-                    active_since = dt.date(*(int(i) for i in raw_start.split("-")))
-                except TypeError:
-                    logger.warning(
-                        f"Could not extract a valid date from the input {raw_start!r}"
-                    )
-                    active_since = None
-            else:
-                active_since = None
-            if raw_end := raw_station.get("finevalidita"):
-                try:
-                    active_until = dt.date(*raw_end.split("-"))
-                except TypeError:
-                    logger.warning(
-                        f"Could not extract a valid date from the input {raw_end!r}"
-                    )
-                    active_until = None
-            else:
-                active_until = None
-            if (
-                station_code not in existing_stations
-                and station_code not in stations_create
-            ):
-                pt_4258 = shapely.Point(
-                    raw_station["EPSG4258_LON"], raw_station["EPSG4258_LAT"]
-                )
-                pt_4326 = shapely.ops.transform(coord_converter, pt_4258)
-                station_create = observations.StationCreate(
-                    code=station_code,
-                    geom=geojson_pydantic.Point(
-                        type="Point", coordinates=(pt_4326.x, pt_4326.y)
-                    ),
-                    altitude_m=raw_station["altitude"],
-                    name=raw_station["statnm"],
-                    type_=raw_station["stattype"].lower().replace(" ", "_"),
-                    active_since=active_since,
-                    active_until=active_until,
-                )
-                stations_create[station_create.code] = station_create
-    return list(stations_create.values())
+        db_station = existing_stations.get(station_code)
+        if db_station is None or _station_has_changed(db_station, station_create):
+            to_upsert.append(station_create)
+    return to_upsert
 
 
 def refresh_stations(
     client: httpx.Client, db_session: sqlmodel.Session
 ) -> list[observations.Station]:
-    to_create = harvest_stations(client, db_session)
-    logger.info(f"About to create {len(to_create)} stations...")
-    created_variables = database.create_many_stations(db_session, to_create)
-    return created_variables
+    to_upsert = harvest_stations(client, db_session)
+    logger.info(f"About to create or update {len(to_upsert)} stations...")
+    upserted_stations = database.upsert_many_stations(db_session, to_upsert)
+    return upserted_stations
+
+
+def _fetch_variable_stations(
+    client: httpx.Client, variable: observations.Variable
+) -> list[dict]:
+    logger.info(f"Processing stations for variable {variable.name!r}...")
+    response = client.get(
+        "https://api.arpa.veneto.it/REST/v1/clima_indicatori/staz_attive",
+        params={"indicatore": variable.name},
+    )
+    response.raise_for_status()
+    return response.json().get("data", [])
+
+
+def _parse_date(raw_date: Optional[str]) -> Optional[dt.date]:
+    if raw_date:
+        try:
+            result = dt.date(*(int(i) for i in raw_date.split("-")))
+        except (TypeError, ValueError):
+            logger.warning(
+                f"Could not extract a valid date from the input {raw_date!r}"
+            )
+            result = None
+    else:
+        result = None
+    return result
+
+
+def _station_has_changed(
+    db_station: observations.Station,
+    station_create: observations.StationCreate,
+    coordinate_tolerance: float = 1e-7,
+) -> bool:
+    db_point = to_shape(db_station.geom)
+    new_lon, new_lat = station_create.geom.coordinates
+    return any(
+        (
+            abs(db_point.x - new_lon) > coordinate_tolerance,
+            abs(db_point.y - new_lat) > coordinate_tolerance,
+            db_station.name != station_create.name,
+            db_station.type_ != station_create.type_,
+            db_station.altitude_m != station_create.altitude_m,
+            db_station.active_since != station_create.active_since,
+            db_station.active_until != station_create.active_until,
+        )
+    )
 
 
 def harvest_monthly_measurements(
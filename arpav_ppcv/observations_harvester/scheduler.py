@@ -0,0 +1,338 @@
+"""Long-running scheduler for periodic observation harvesting.
+
+The scheduler keeps a single pooled HTTP client and a single database engine for
+its whole lifetime and runs each harvesting job on its own interval. Independent
+variables are processed in parallel, each worker with its own database session.
+
+Overlapping runs, either from another daemon instance or from a manual CLI
+invocation, are prevented by means of Postgres session-level advisory locks. The
+CLI refresh commands take the same locks as the corresponding jobs.
+
+The duration and throughput of recent runs are optionally written to a JSON file
+after each run, so that they can be picked up by monitoring tools.
+"""
+
+import concurrent.futures
+import contextlib
+import dataclasses
+import datetime as dt
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import (
+    Callable,
+    Iterator,
+    Optional,
+)
+
+import httpx
+import sqlalchemy
+import sqlmodel
+
+from .. import (
+    config,
+    database,
+    replay,
+)
+from .. import operations as base_operations
+from ..schemas.base import (
+    MannKendallParameters,
+    ObservationAggregationType,
+)
+from . import operations
+
+logger = logging.getLogger(__name__)
+
+_ADVISORY_LOCK_NAMESPACE = "arpav_ppcv.observations_harvester"
+STATIONS_JOB_NAME = "stations"
+
+
+@dataclasses.dataclass
+class HarvestRunStats:
+    job_name: str
+    started_at: dt.datetime
+    duration_seconds: float
+    num_processed: int
+    skipped: bool = False
+    error: Optional[str] = None
+
+    @property
+    def throughput(self) -> float:
+        """Number of processed items per second."""
+        return (
+            self.num_processed / self.duration_seconds
+            if self.duration_seconds > 0
+            else 0.0
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            **dataclasses.asdict(self),
+            "started_at": self.started_at.isoformat(),
+            "throughput": self.throughput,
+        }
+
+
+@dataclasses.dataclass
+class HarvestJob:
+    name: str
+    interval_seconds: int
+    handler: Callable[[httpx.Client, sqlalchemy.Engine], int]
+    next_run_at: float = 0.0
+    last_run: Optional[HarvestRunStats] = None
+
+    def is_due(self, now: float) -> bool:
+        return now >= self.next_run_at
+
+
+class HarvestScheduler:
+    def __init__(
+        self,
+        jobs: list[HarvestJob],
+        engine: sqlalchemy.Engine,
+        http_client: httpx.Client,
+        stats_history_size: int = 100,
+        stats_file: Optional[Path] = None,
+    ):
+        self.jobs = jobs
+        self.engine = engine
+        self.http_client = http_client
+        self.stats_history_size = stats_history_size
+        self.stats_file = stats_file
+        self.stats: list[HarvestRunStats] = []
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run_forever(self) -> None:
+        logger.info(
+            f"Starting harvest scheduler with jobs "
+            f"{', '.join(j.name for j in self.jobs)}..."
+        )
+        while not self._stop_event.is_set():
+            self.run_pending()
+            self._stop_event.wait(timeout=self.seconds_until_next_run())
+        logger.info("Harvest scheduler stopped")
+
+    def run_pending(self, now: Optional[float] = None) -> list[HarvestRunStats]:
+        now = now if now is not None else time.monotonic()
+        result = []
+        for job in self.jobs:
+            if self._stop_event.is_set():
+                break
+            if job.is_due(now):
+                result.append(self.run_job(job))
+        return result
+
+    def seconds_until_next_run(self, now: Optional[float] = None) -> float:
+        now = now if now is not None else time.monotonic()
+        return max(0.0, min(j.next_run_at for j in self.jobs) - now)
+
+    def run_job(self, job: HarvestJob) -> HarvestRunStats:
+        started_at = dt.datetime.now(dt.timezone.utc)
+        start = time.perf_counter()
+        num_processed = 0
+        skipped = False
+        error = None
+        with advisory_lock(self.engine, job.name) as acquired:
+            if acquired:
+                logger.info(f"Running harvest job {job.name!r}...")
+                try:
+                    num_processed = job.handler(self.http_client, self.engine)
+                except Exception as err:
+                    logger.exception(f"Harvest job {job.name!r} failed")
+                    error = str(err)
+            else:
+                logger.info(
+                    f"Skipping harvest job {job.name!r} - another run is in progress"
+                )
+                skipped = True
+        stats = HarvestRunStats(
+            job_name=job.name,
+            started_at=started_at,
+            duration_seconds=time.perf_counter() - start,
+            num_processed=num_processed,
+            skipped=skipped,
+            error=error,
+        )
+        job.last_run = stats
+        job.next_run_at = time.monotonic() + job.interval_seconds
+        self.stats = [*self.stats, stats][-self.stats_history_size :]
+        if not skipped:
+            logger.info(
+                f"Harvest job {job.name!r} processed {stats.num_processed} items in "
+                f"{stats.duration_seconds:.2f}s ({stats.throughput:.2f} items/s)"
+            )
+        if self.stats_file is not None:
+            self.write_stats(self.stats_file)
+        return stats
+
+    def write_stats(self, path: Path) -> None:
+        """Write the last run of each job and the recent run history to a JSON file.
+
+        The file is replaced atomically, so readers never see a partial write.
+        """
+        contents = {
+            "last_runs": {
+                job.name: job.last_run.to_dict() if job.last_run else None
+                for job in self.jobs
+            },
+            "history": [stats.to_dict() for stats in self.stats],
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle, temporary_path = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(handle, "w") as fh:
+                json.dump(contents, fh, indent=2)
+            os.replace(temporary_path, path)
+        except OSError:
+            logger.exception(f"Could not write harvest stats to {path}")
+
+
+def build_http_client(settings: config.ArpavPpcvSettings) -> httpx.Client:
+    """Build an HTTP client suitable for being shared by harvesting jobs.
+
+    When replay is enabled the connection limits are not used, as the replay
+    transport does not open any connections.
+    """
+    harvester_settings = settings.observations_harvester
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=harvester_settings.http_max_connections,
+            max_keepalive_connections=(
+                harvester_settings.http_max_keepalive_connections
+            ),
+        ),
+        timeout=harvester_settings.http_timeout_seconds,
+        transport=replay.build_transport(settings.http_replay),
+    )
+
+
+def build_default_jobs(
+    settings: config.ObservationsHarvesterSettings,
+) -> list[HarvestJob]:
+    return [
+        HarvestJob(
+            name=STATIONS_JOB_NAME,
+            interval_seconds=settings.stations_refresh_interval_seconds,
+            handler=_refresh_stations,
+        ),
+        HarvestJob(
+            name=get_measurements_job_name(ObservationAggregationType.MONTHLY),
+            interval_seconds=settings.monthly_measurements_refresh_interval_seconds,
+            handler=_build_measurements_handler(
+                operations.refresh_monthly_measurements,
+                ObservationAggregationType.MONTHLY,
+                settings,
+            ),
+        ),
+        HarvestJob(
+            name=get_measurements_job_name(ObservationAggregationType.SEASONAL),
+            interval_seconds=settings.seasonal_measurements_refresh_interval_seconds,
+            handler=_build_measurements_handler(
+                operations.refresh_seasonal_measurements,
+                ObservationAggregationType.SEASONAL,
+                settings,
+            ),
+        ),
+        HarvestJob(
+            name=get_measurements_job_name(ObservationAggregationType.YEARLY),
+            interval_seconds=settings.yearly_measurements_refresh_interval_seconds,
+            handler=_build_measurements_handler(
+                operations.refresh_yearly_measurements,
+                ObservationAggregationType.YEARLY,
+                settings,
+            ),
+        ),
+    ]
+
+
+@contextlib.contextmanager
+def advisory_lock(engine: sqlalchemy.Engine, name: str) -> Iterator[bool]:
+    """Try to acquire a Postgres session-level advisory lock.
+
+    Yields whether the lock was acquired. The lock is held on a dedicated
+    connection and is released on exit.
+    """
+    lock_key = get_advisory_lock_key(name)
+    with engine.connect() as connection:
+        acquired = connection.execute(
+            sqlalchemy.select(sqlalchemy.func.pg_try_advisory_lock(lock_key))
+        ).scalar_one()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(
+                    sqlalchemy.select(sqlalchemy.func.pg_advisory_unlock(lock_key))
+                )
+
+
+def get_measurements_job_name(aggregation_type: ObservationAggregationType) -> str:
+    return f"{aggregation_type.value.lower()}-measurements"
+
+
+def get_advisory_lock_key(name: str) -> int:
+    """Build a stable advisory lock key for the input job name."""
+    return zlib.crc32(f"{_ADVISORY_LOCK_NAMESPACE}.{name}".encode("utf-8"))
+
+
+def _refresh_stations(client: httpx.Client, engine: sqlalchemy.Engine) -> int:
+    with sqlmodel.Session(engine) as session:
+        return len(operations.refresh_stations(client, session))
+
+
+def _build_measurements_handler(
+    refresher: Callable[..., list],
+    aggregation_type: ObservationAggregationType,
+    settings: config.ObservationsHarvesterSettings,
+) -> Callable[[httpx.Client, sqlalchemy.Engine], int]:
+    def handler(client: httpx.Client, engine: sqlalchemy.Engine) -> int:
+        with sqlmodel.Session(engine) as session:
+            variable_ids = [v.id for v in database.collect_all_variables(session)]
+
+        def refresh_variable(variable_id) -> int:
+            # sessions are not thread-safe, so each worker gets its own
+            with sqlmodel.Session(engine) as variable_session:
+                return len(refresher(client, variable_session, variable_id=variable_id))
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=settings.max_parallel_variables
+        ) as executor:
+            num_created = dict(
+                zip(variable_ids, executor.map(refresh_variable, variable_ids))
+            )
+        # only the statistics of variables with new measurements are recomputed
+        changed_variable_ids = [id_ for id_, num in num_created.items() if num > 0]
+        if len(changed_variable_ids) > 0:
+            num_series = 0
+            with sqlmodel.Session(engine) as session:
+                for variable_id in changed_variable_ids:
+                    num_series += base_operations.refresh_measurement_statistics(
+                        session,
+                        get_mann_kendall_windows(settings),
+                        aggregation_type_filter=aggregation_type,
+                        variable_id_filter=variable_id,
+                    )
+            logger.info(
+                f"Refreshed statistics of {num_series} "
+                f"{aggregation_type.value.lower()} series"
+            )
+        return sum(num_created.values())
+
+    return handler
+
+
+def get_mann_kendall_windows(
+    settings: config.ObservationsHarvesterSettings,
+) -> list[MannKendallParameters]:
+    return [
+        MannKendallParameters(**window.model_dump())
+        for window in settings.mann_kendall_windows
+    ]
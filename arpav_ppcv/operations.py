@@ -1,9 +1,13 @@
+import dataclasses
 import datetime as dt
 import functools
 import io
 import logging
-import warnings
-from typing import Optional
+import uuid
+from typing import (
+    Optional,
+    Sequence,
+)
 
 import anyio
 import cftime
@@ -11,19 +15,21 @@ import httpx
 import netCDF4
 import numpy as np
 import pandas as pd
-import pyloess
-import pymannkendall as mk
 import pyproj
 import shapely
 import shapely.io
 import sqlmodel
 from anyio.from_thread import start_blocking_portal
 from dateutil.parser import isoparse
-from geoalchemy2.shape import to_shape
 from pyproj.enums import TransformDirection
 from shapely.ops import transform
 
-from . import database
+from . import (
+    database,
+    processpool,
+    smoothing,
+    trends,
+)
 from .config import ArpavPpcvSettings
 from .schemas import (
     base,
@@ -34,6 +40,17 @@ from .thredds import ncss
 
 logger = logging.getLogger(__name__)
 
+_MIN_YEARS_PER_DECADE = 7
+
+# seasonal measurement times use the first month of the season, as returned by
+# `database.get_measurement_series()`
+_SEASONS_BY_MONTH_INDEX = {
+    0: base.Season.WINTER,
+    3: base.Season.SPRING,
+    6: base.Season.SUMMER,
+    9: base.Season.AUTUMN,
+}
+
 
 def get_climate_barometer_time_series(
     settings: ArpavPpcvSettings,
@@ -43,6 +60,7 @@ def get_climate_barometer_time_series(
         base.CoverageDataSmoothingStrategy.NO_SMOOTHING
     ],
     include_uncertainty: bool = False,
+    process_pool: Optional[processpool.ProcessPool] = None,
 ) -> dict[
     tuple[coverages.CoverageInternal, base.CoverageDataSmoothingStrategy], pd.Series
 ]:
@@ -64,19 +82,78 @@ def get_climate_barometer_time_series(
         for ss in smoothing_strategies
         if ss != base.CoverageDataSmoothingStrategy.NO_SMOOTHING
     ]
+    all_series = [df[cov.identifier] for cov, df in dfs]
+    all_smoothed = processpool.run(
+        process_pool,
+        _smooth_coverage_series,
+        all_series,
+        additional_smoothing_strategies,
+    )
     result = {}
-    for cov, df in dfs:
-        result[(cov, base.CoverageDataSmoothingStrategy.NO_SMOOTHING)] = df[
-            cov.identifier
-        ].squeeze()
-        for strategy in additional_smoothing_strategies:
-            df, smoothed_col = process_coverage_smoothing_strategy(
-                df, cov.identifier, strategy
-            )
-            result[(cov, strategy)] = df[smoothed_col].squeeze()
+    for (cov, _), series, smoothed in zip(dfs, all_series, all_smoothed):
+        result[(cov, base.CoverageDataSmoothingStrategy.NO_SMOOTHING)] = series
+        for strategy, smoothed_series in smoothed.items():
+            result[(cov, strategy)] = smoothed_series
     return result
 
 
+def _smooth_coverage_series(
+    all_series: Sequence[pd.Series],
+    smoothing_strategies: Sequence[base.CoverageDataSmoothingStrategy],
+) -> list[dict[base.CoverageDataSmoothingStrategy, pd.Series]]:
+    """Smooth yearly coverage series with each of the input strategies.
+
+    Series with the same years, such as a coverage and its uncertainty bounds, are
+    stacked and smoothed together. Smoothed series are named after the input
+    series and the strategy.
+    """
+    result = [{} for _ in all_series]
+    series_indexes_by_years = {}
+    for series_index, series in enumerate(all_series):
+        series_indexes_by_years.setdefault(
+            series.index.year.to_numpy().tobytes(), []
+        ).append(series_index)
+    for series_indexes in series_indexes_by_years.values():
+        years = all_series[series_indexes[0]].index.year.to_numpy()
+        values = np.vstack(
+            [all_series[i].to_numpy(dtype=float) for i in series_indexes]
+        )
+        for strategy in smoothing_strategies:
+            smoothed = process_coverage_smoothing_strategy_many(years, values, strategy)
+            for series_index, smoothed_values in zip(series_indexes, smoothed):
+                series = all_series[series_index]
+                result[series_index][strategy] = pd.Series(
+                    smoothed_values,
+                    index=series.index,
+                    name="__".join((str(series.name), strategy.value)),
+                )
+    return result
+
+
+def _process_ncss_datasets(
+    datasets: Sequence[tuple[str, str, str]],
+    time_start: dt.datetime | None,
+    time_end: dt.datetime | None,
+    smoothing_strategies: Sequence[base.CoverageDataSmoothingStrategy],
+) -> list[dict[base.CoverageDataSmoothingStrategy, pd.Series]]:
+    """Parse NCSS responses and smooth their main series together.
+
+    Datasets are given as tuples of the raw response, the name of its main
+    dataset and the name of the resulting series.
+    """
+    all_series = [
+        _parse_ncss_dataset(
+            raw_data, source_main_ds_name, time_start, time_end, target_main_ds_name
+        )[target_main_ds_name]
+        for raw_data, source_main_ds_name, target_main_ds_name in datasets
+    ]
+    all_smoothed = _smooth_coverage_series(all_series, smoothing_strategies)
+    return [
+        {base.CoverageDataSmoothingStrategy.NO_SMOOTHING: series, **smoothed}
+        for series, smoothed in zip(all_series, all_smoothed)
+    ]
+
+
 def _get_climate_barometer_data(
     settings: ArpavPpcvSettings,
     coverage: coverages.CoverageInternal,
@@ -110,88 +187,241 @@ def _get_climate_barometer_data(
     return df
 
 
-def get_station_data(
+def get_mann_kendall_trend(
+    series: pd.Series,
+    parameters: base.MannKendallParameters,
+) -> tuple[pd.Series, dict[str, str | int | float]]:
+    """Compute the Mann-Kendall trend of a yearly series.
+
+    Returns the trend line, named after the input series, and the trend
+    statistics.
+    """
+    mk_start, mk_end = _get_mann_kendall_years(series, parameters)
+    if mk_end - mk_start >= 27:
+        info = trends.mann_kendall_test(
+            series[str(mk_start) : str(mk_end)].to_numpy()
+        ).to_info()
+        trend_line = _get_mann_kendall_trend_line(
+            series, parameters, info["slope"], info["intercept"]
+        )
+        return trend_line, info
+    else:
+        raise ValueError("Mann-Kendall start and end year must span at least 27 years")
+
+
+def _get_mann_kendall_years(
+    series: pd.Series, parameters: base.MannKendallParameters
+) -> tuple[int, int]:
+    return (
+        parameters.start_year or series.index[0].year,
+        parameters.end_year or series.index[-1].year,
+    )
+
+
+def _get_mann_kendall_trend_line(
+    series: pd.Series,
+    parameters: base.MannKendallParameters,
+    slope: float,
+    intercept: float,
+) -> pd.Series:
+    mk_start, mk_end = _get_mann_kendall_years(series, parameters)
+    window = series[str(mk_start) : str(mk_end)]
+    return pd.Series(
+        slope * (window.index.year - window.index.year.min()) + intercept,
+        index=window.index,
+        name=series.name,
+        dtype=float,
+    )
+
+
+def refresh_measurement_statistics(
+    session: sqlmodel.Session,
+    trend_windows: Sequence[base.MannKendallParameters],
+    *,
+    aggregation_type_filter: Optional[base.ObservationAggregationType] = None,
+    station_id_filter: Optional[uuid.UUID] = None,
+    variable_id_filter: Optional[uuid.UUID] = None,
+) -> int:
+    """Precompute Mann-Kendall trends and decade means of measurement series.
+
+    Statistics are computed from the compact measurement series, which must have
+    been rebuilt beforehand. Trends are computed for each of the input temporal
+    windows, skipping the series that do not span enough years.
+
+    Returns the number of series that were processed.
+    """
+    if aggregation_type_filter is not None:
+        aggregation_types = [aggregation_type_filter]
+    else:
+        aggregation_types = list(base.ObservationAggregationType)
+    num_processed = 0
+    for aggregation_type in aggregation_types:
+        all_series = database.collect_all_measurement_series(
+            session,
+            aggregation_type_filter=aggregation_type,
+            station_id_filter=station_id_filter,
+            variable_id_filter=variable_id_filter,
+        )
+        identified_series = []
+        decade_means = []
+        for db_series in all_series:
+            series = _get_yearly_series(db_series)
+            if len(series) == 0:
+                continue
+            identity = _get_series_identity(db_series)
+            for decade, mean_value, value_count in zip(*_get_decade_statistics(series)):
+                decade_means.append(
+                    observations.MeasurementDecadeMean(
+                        **identity,
+                        decade=int(decade),
+                        mean_value=float(mean_value),
+                        value_count=int(value_count),
+                    )
+                )
+            identified_series.append((identity, series))
+            num_processed += 1
+        measurement_trends = []
+        for trend_window in trend_windows:
+            measurement_trends.extend(
+                _get_measurement_trends(identified_series, trend_window)
+            )
+        database.replace_measurement_statistics(
+            session,
+            aggregation_type,
+            measurement_trends,
+            decade_means,
+            station_id=station_id_filter,
+            variable_id=variable_id_filter,
+        )
+    return num_processed
+
+
+def get_station_trends(
     session: sqlmodel.Session,
     variable: observations.Variable,
-    station: observations.Station,
-    month: int,
-    temporal_range: tuple[dt.datetime | None, dt.datetime | None],
-) -> Optional[pd.DataFrame]:
-    raw_measurements = database.collect_all_monthly_measurements(
-        session=session,
-        station_id_filter=station.id,
+    aggregation_type: base.ObservationAggregationType,
+    period: str,
+    mann_kendall_parameters: base.MannKendallParameters,
+) -> list[tuple[observations.Station, observations.MeasurementTrend]]:
+    """Get the Mann-Kendall trend of all stations for a variable and period.
+
+    The period is the month number for monthly series, the season name for
+    seasonal series and `YEAR` for yearly series. Precomputed trends are used for
+    the requested temporal window where they exist. The trends of the remaining
+    stations, for example those whose statistics were deleted by a harvest and not
+    yet recomputed, are computed together, in a single batch.
+    """
+    _validate_series_period(aggregation_type, period)
+    measurement_trends = list(
+        database.collect_all_period_measurement_trends(
+            session,
+            variable_id=variable.id,
+            aggregation_type=aggregation_type,
+            period=period,
+            window=mann_kendall_parameters.window,
+        )
+    )
+    precomputed_station_ids = {t.station_id for t in measurement_trends}
+    identified_series = []
+    for db_series in database.collect_all_measurement_series(
+        session,
+        aggregation_type_filter=aggregation_type,
         variable_id_filter=variable.id,
-        month_filter=month,
+        period_filter=period,
+    ):
+        if db_series.station_id in precomputed_station_ids:
+            continue
+        if len(series := _get_yearly_series(db_series)) > 0:
+            identified_series.append((_get_series_identity(db_series), series))
+    measurement_trends.extend(
+        _get_measurement_trends(identified_series, mann_kendall_parameters)
     )
-    df = pd.DataFrame(m.model_dump() for m in raw_measurements)
-    if not df.empty:
-        df = df.rename(columns={"value": variable.name})
-        df["time"] = pd.to_datetime(df["date"], utc=True)
-        df = df[["time", variable.name]]
-        df.set_index("time", inplace=True)
-        start, end = temporal_range
-        if start is not None:
-            df = df[start:]
-        if end is not None:
-            df = df[:end]
-        return df
+    stations = {s.id: s for s in database.collect_all_stations(session)}
+    return [
+        (stations[t.station_id], t)
+        for t in measurement_trends
+        if t.station_id in stations
+    ]
+
+
+def _validate_series_period(
+    aggregation_type: base.ObservationAggregationType, period: str
+) -> None:
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        is_valid = period in {str(month) for month in range(1, 13)}
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        is_valid = period in {season.value for season in base.Season}
     else:
-        logger.info(
-            f"Station {station.id!r} has no measurements for month {month!r} and "
-            f"variable {variable.id!r}"
+        is_valid = period == "YEAR"
+    if not is_valid:
+        raise ValueError(
+            f"Invalid period {period!r} for {aggregation_type.value} series"
         )
 
 
-def aggregate_decade_data(
-    variable: observations.Variable, measurements: pd.DataFrame
-) -> pd.DataFrame:
-    # group values by climatological decade, which starts at year 1 and ends at year 10
-    decade_grouper = measurements.groupby(((measurements.index.year - 1) // 10) * 10)
-
-    mean_column_name = variable.name
-    decade_df = decade_grouper.agg(
-        num_values=(variable.name, "size"),
-        **{mean_column_name: (variable.name, "mean")},
+def _get_yearly_series(db_series: observations.MeasurementSeries) -> pd.Series:
+    """Convert a compact measurement series to a pandas series, skipping gaps."""
+    values = np.array(db_series.measurement_values, dtype=float)
+    years = db_series.start_year + np.arange(len(values))
+    present = ~np.isnan(values)
+    return pd.Series(
+        values[present],
+        index=pd.DatetimeIndex(
+            pd.to_datetime([str(y) for y in years[present]], utc=True),
+            name="time",
+        ),
+        dtype=float,
     )
-    # discard decades where there are less than 7 years
-    decade_df = decade_df[decade_df.num_values >= 7]
-    decade_df = decade_df.drop(columns=["num_values"])
-    decade_df["time"] = pd.to_datetime(decade_df.index.astype(str), utc=True)
-    decade_df.set_index("time", inplace=True)
-    return decade_df
 
 
-def generate_mann_kendall_data(
-    variable: observations.Variable,
-    measurements: pd.DataFrame,
-    parameters: base.MannKendallParameters,
-) -> tuple[pd.DataFrame, dict[str, str | int | float]]:
-    mk_col = f"{variable.name}__MANN_KENDALL"
-    mk_start = parameters.start_year or measurements.index[0].year
-    mk_end = parameters.end_year or measurements.index[-1].year
-    if mk_end - mk_start >= 27:
-        mk_df = measurements[str(mk_start) : str(mk_end)].copy()
-        mk_result = mk.original_test(mk_df[variable.name])
-        mk_df[mk_col] = (
-            mk_result.slope * (mk_df.index.year - mk_df.index.year.min())
-            + mk_result.intercept
+def _get_series_identity(db_series: observations.MeasurementSeries) -> dict:
+    return {
+        "station_id": db_series.station_id,
+        "variable_id": db_series.variable_id,
+        "aggregation_type": db_series.aggregation_type,
+        "period": db_series.period,
+    }
+
+
+def _get_measurement_trends(
+    identified_series: Sequence[tuple[dict, pd.Series]],
+    trend_window: base.MannKendallParameters,
+) -> list[observations.MeasurementTrend]:
+    """Compute the trends of many series over the same temporal window.
+
+    All series are tested in a single call to `trends.mann_kendall_test_many()`,
+    with their values right-padded with NaN up to the length of the longest one.
+    """
+    eligible = []
+    for identity, series in identified_series:
+        mk_start, mk_end = _get_mann_kendall_years(series, trend_window)
+        if mk_end - mk_start >= 27:
+            window_values = series[str(mk_start) : str(mk_end)].to_numpy()
+            eligible.append((identity, mk_start, mk_end, window_values))
+        else:
+            logger.debug(
+                f"Series {identity} does not span enough years for "
+                f"computing its trend over {trend_window.window!r}"
+            )
+    if len(eligible) == 0:
+        return []
+    padded = np.full((len(eligible), max(len(e[3]) for e in eligible)), np.nan)
+    for index, (*_, window_values) in enumerate(eligible):
+        padded[index, : len(window_values)] = window_values
+    result = []
+    for (identity, mk_start, mk_end, _), mk_result in zip(
+        eligible, trends.mann_kendall_test_many(padded)
+    ):
+        result.append(
+            observations.MeasurementTrend(
+                **identity,
+                window=trend_window.window,
+                start_year=mk_start,
+                end_year=mk_end,
+                **mk_result.to_info(),
+            )
         )
-        # mk_df = mk_df[["time", mk_col]].rename(columns={mk_col: variable.name})
-        mk_df = mk_df[[mk_col]].rename(columns={mk_col: variable.name})
-        info = {
-            "trend": mk_result.trend,
-            "h": bool(mk_result.h),
-            "p": mk_result.p,
-            "z": mk_result.z,
-            "tau": mk_result.Tau,
-            "s": mk_result.s,
-            "var_s": mk_result.var_s,
-            "slope": mk_result.slope,
-            "intercept": mk_result.intercept,
-        }
-        return mk_df, info
-    else:
-        raise ValueError("Mann-Kendall start and end year must span at least 27 years")
+    return result
 
 
 def get_observation_time_series(
@@ -205,54 +435,382 @@ def get_observation_time_series(
     ],
     include_decade_data: bool = False,
     mann_kendall_parameters: base.MannKendallParameters | None = None,
+    process_pool: Optional[processpool.ProcessPool] = None,
+) -> Optional[
+    dict[
+        tuple[
+            base.ObservationDataSmoothingStrategy,
+            Optional[base.ObservationDerivedSeries],
+        ],
+        tuple[pd.Series, Optional[dict]],
+    ]
+]:
+    """Get monthly observation measurements.
+
+    Filtering by time, smoothing and decade aggregation are performed by the
+    database, which returns the results as plain arrays.
+    """
+    start, end = _parse_temporal_range(temporal_range)
+    start_date, end_date = _get_date_bounds(start, end)
+    dates, values, moving_averages = database.get_monthly_measurement_time_series(
+        session,
+        station_id=station.id,
+        variable_id=variable.id,
+        month=month,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    if len(dates) == 0:
+        logger.info(
+            f"Station {station.id!r} has no measurements for month {month!r} and "
+            f"variable {variable.id!r}"
+        )
+        return None
+    index = pd.DatetimeIndex(pd.to_datetime(dates, utc=True), name="time")
+    series = pd.Series(values, index=index, name=variable.name, dtype=float)
+    result = {
+        (base.ObservationDataSmoothingStrategy.NO_SMOOTHING, None): (series, None)
+    }
+    for smoothing_strategy in smoothing_strategies:
+        if smoothing_strategy == base.ObservationDataSmoothingStrategy.NO_SMOOTHING:
+            continue
+        elif (
+            smoothing_strategy
+            == base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS
+        ):
+            result[(smoothing_strategy, None)] = (
+                pd.Series(
+                    moving_averages,
+                    index=index,
+                    name="__".join((variable.name, smoothing_strategy.value)),
+                    dtype=float,
+                ),
+                None,
+            )
+        else:
+            raise NotImplementedError(
+                f"smoothing strategy {smoothing_strategy!r} is not implemented"
+            )
+    # precomputed statistics cover the whole series, so they can only be used when
+    # there is no temporal filter
+    statistics = (
+        _get_precomputed_statistics(
+            session,
+            station,
+            variable,
+            base.ObservationAggregationType.MONTHLY,
+            include_decade_data,
+            mann_kendall_parameters,
+        )
+        if start is None and end is None
+        else _PrecomputedStatistics()
+    )
+    if include_decade_data:
+        decade_series = statistics.get_decade_means(str(month), variable.name)
+        if decade_series is None:
+            decades, decade_means = database.get_monthly_measurement_decade_means(
+                session,
+                station_id=station.id,
+                variable_id=variable.id,
+                month=month,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            decade_series = pd.Series(
+                decade_means,
+                index=pd.DatetimeIndex(
+                    pd.to_datetime([str(d) for d in decades], utc=True), name="time"
+                ),
+                name=variable.name,
+                dtype=float,
+            )
+        result[
+            (
+                base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+                base.ObservationDerivedSeries.DECADE_SERIES,
+            )
+        ] = (decade_series, None)
+    if mann_kendall_parameters is not None:
+        result[
+            (
+                base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+                base.ObservationDerivedSeries.MANN_KENDALL_SERIES,
+            )
+        ] = statistics.get_mann_kendall_trend(
+            str(month), series, mann_kendall_parameters, process_pool
+        )
+    return result
+
+
+def get_observation_time_series_collection(
+    session: sqlmodel.Session,
+    variable: observations.Variable,
+    station: observations.Station,
+    temporal_range: str,
+    aggregation_types: Sequence[base.ObservationAggregationType] = (
+        base.ObservationAggregationType.MONTHLY,
+    ),
+    smoothing_strategies: list[base.ObservationDataSmoothingStrategy] = [  # noqa
+        base.ObservationDataSmoothingStrategy.NO_SMOOTHING
+    ],
+    include_decade_data: bool = False,
+    mann_kendall_parameters: base.MannKendallParameters | None = None,
+    process_pool: Optional[processpool.ProcessPool] = None,
 ) -> dict[
     tuple[
-        base.ObservationDataSmoothingStrategy, Optional[base.ObservationDerivedSeries]
+        base.ObservationAggregationType,
+        str,
+        base.ObservationDataSmoothingStrategy,
+        Optional[base.ObservationDerivedSeries],
     ],
     tuple[pd.Series, Optional[dict]],
 ]:
-    """Get monthly observation measurements."""
+    """Get observation measurements for all the periods of a station and variable.
+
+    Each aggregation type is retrieved with a single measurement fetch and then
+    split into its periods - months, seasons or the year. Results are keyed by
+    aggregation type, period, smoothing strategy and derived series, with the
+    period being identified in the same way as in `MeasurementSeries`.
+    """
     start, end = _parse_temporal_range(temporal_range)
-    df = get_station_data(session, variable, station, month, (start, end))
-    if df is not None:
-        result = {
-            (base.ObservationDataSmoothingStrategy.NO_SMOOTHING, None): (
-                df[variable.name].squeeze(),
-                None,
+    start_date, end_date = _get_date_bounds(start, end)
+    result = {}
+    for aggregation_type in aggregation_types:
+        times, values = database.get_measurement_series(
+            session,
+            station_id=station.id,
+            variable_id=variable.id,
+            aggregation_type=aggregation_type,
+        )
+        mask = np.ones(len(times), dtype=bool)
+        if start_date is not None:
+            mask &= times >= np.datetime64(start_date, "D")
+        if end_date is not None:
+            mask &= times <= np.datetime64(end_date, "D")
+        times = times[mask]
+        values = values[mask]
+        # sorting by month of year is stable, so each period remains sorted by time
+        month_indexes = times.astype("datetime64[M]").astype(np.int64) % 12
+        order = np.argsort(month_indexes, kind="stable")
+        times = times[order]
+        values = values[order]
+        month_indexes = month_indexes[order]
+        moving_averages = None
+        if (
+            base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS
+            in smoothing_strategies
+        ):
+            moving_averages = smoothing.grouped_centered_moving_average(
+                values, month_indexes, window=5
             )
-        }
-        additional_strategies = [
-            ss
-            for ss in smoothing_strategies
-            if ss != base.ObservationDataSmoothingStrategy.NO_SMOOTHING
-        ]
-        for smoothing_strategy in additional_strategies:
-            smoothed_df, smoothed_column_name = process_station_data_smoothing_strategy(
-                df, variable.name, smoothing_strategy
+        statistics = (
+            _get_precomputed_statistics(
+                session,
+                station,
+                variable,
+                aggregation_type,
+                include_decade_data,
+                mann_kendall_parameters,
             )
-            result[(smoothing_strategy, None)] = (
-                smoothed_df[smoothed_column_name].squeeze(),
-                None,
+            if start is None and end is None
+            else _PrecomputedStatistics()
+        )
+        period_indexes, period_starts, period_sizes = np.unique(
+            month_indexes, return_index=True, return_counts=True
+        )
+        for month_index, period_start, period_size in zip(
+            period_indexes, period_starts, period_sizes
+        ):
+            period = _get_series_period(aggregation_type, int(month_index))
+            period_slice = slice(period_start, period_start + period_size)
+            index = pd.DatetimeIndex(
+                pd.to_datetime(times[period_slice], utc=True), name="time"
             )
-        if include_decade_data:
-            decade_df = aggregate_decade_data(variable, df)
-            result[
-                (
-                    base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
-                    base.ObservationDerivedSeries.DECADE_SERIES,
-                )
-            ] = (decade_df[variable.name].squeeze(), None)
-        if mann_kendall_parameters is not None:
-            mk_df, mk_info = generate_mann_kendall_data(
-                variable, df, mann_kendall_parameters
+            series = pd.Series(
+                values[period_slice], index=index, name=variable.name, dtype=float
             )
             result[
                 (
+                    aggregation_type,
+                    period,
                     base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
-                    base.ObservationDerivedSeries.MANN_KENDALL_SERIES,
+                    None,
+                )
+            ] = (series, None)
+            for smoothing_strategy in smoothing_strategies:
+                if (
+                    smoothing_strategy
+                    == base.ObservationDataSmoothingStrategy.NO_SMOOTHING
+                ):
+                    continue
+                elif (
+                    smoothing_strategy
+                    == base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS
+                ):
+                    result[(aggregation_type, period, smoothing_strategy, None)] = (
+                        pd.Series(
+                            moving_averages[period_slice],
+                            index=index,
+                            name="__".join((variable.name, smoothing_strategy.value)),
+                            dtype=float,
+                        ),
+                        None,
+                    )
+                else:
+                    raise NotImplementedError(
+                        f"smoothing strategy {smoothing_strategy!r} is not implemented"
+                    )
+            if include_decade_data:
+                decade_series = statistics.get_decade_means(period, variable.name)
+                result[
+                    (
+                        aggregation_type,
+                        period,
+                        base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+                        base.ObservationDerivedSeries.DECADE_SERIES,
+                    )
+                ] = (
+                    (
+                        decade_series
+                        if decade_series is not None
+                        else _get_decade_means(series)
+                    ),
+                    None,
+                )
+            if mann_kendall_parameters is not None:
+                result[
+                    (
+                        aggregation_type,
+                        period,
+                        base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+                        base.ObservationDerivedSeries.MANN_KENDALL_SERIES,
+                    )
+                ] = statistics.get_mann_kendall_trend(
+                    period, series, mann_kendall_parameters, process_pool
                 )
-            ] = (mk_df[variable.name].squeeze(), {"mann-kendall": mk_info})
-        return result
+    return result
+
+
+def _get_series_period(
+    aggregation_type: base.ObservationAggregationType, month_index: int
+) -> str:
+    if aggregation_type == base.ObservationAggregationType.MONTHLY:
+        result = str(month_index + 1)
+    elif aggregation_type == base.ObservationAggregationType.SEASONAL:
+        result = _SEASONS_BY_MONTH_INDEX[month_index].value
+    else:
+        result = "YEAR"
+    return result
+
+
+def _get_decade_means(
+    series: pd.Series, min_years_per_decade: int = _MIN_YEARS_PER_DECADE
+) -> pd.Series:
+    """Compute the mean of each climatological decade of a yearly series.
+
+    This follows the same rules as `database.get_monthly_measurement_decade_means()`.
+    """
+    decades, means, counts = _get_decade_statistics(series)
+    valid = counts >= min_years_per_decade
+    return _build_decade_series(decades[valid], means[valid], series.name)
+
+
+def _get_decade_statistics(
+    series: pd.Series,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the decades of a yearly series, with their mean and number of values."""
+    decades = (series.index.year.to_numpy() - 1) // 10 * 10
+    unique_decades, inverse = np.unique(decades, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique_decades))
+    sums = np.bincount(
+        inverse, weights=series.to_numpy(), minlength=len(unique_decades)
+    )
+    return unique_decades, sums / counts, counts
+
+
+def _build_decade_series(
+    decades: Sequence[int], means: Sequence[float], name: Optional[str]
+) -> pd.Series:
+    return pd.Series(
+        means,
+        index=pd.DatetimeIndex(
+            pd.to_datetime([str(d) for d in decades], utc=True), name="time"
+        ),
+        name=name,
+        dtype=float,
+    )
+
+
+@dataclasses.dataclass
+class _PrecomputedStatistics:
+    """Precomputed statistics of the series of a station, variable and aggregation.
+
+    Statistics that have not been precomputed are computed on the fly.
+    """
+
+    trends: dict[str, observations.MeasurementTrend] = dataclasses.field(
+        default_factory=dict
+    )
+    decade_means: dict[
+        str, list[observations.MeasurementDecadeMean]
+    ] = dataclasses.field(default_factory=dict)
+
+    def get_decade_means(self, period: str, name: str) -> Optional[pd.Series]:
+        if (period_decade_means := self.decade_means.get(period)) is None:
+            return None
+        valid = [
+            d for d in period_decade_means if d.value_count >= _MIN_YEARS_PER_DECADE
+        ]
+        return _build_decade_series(
+            [d.decade for d in valid], [d.mean_value for d in valid], name
+        )
+
+    def get_mann_kendall_trend(
+        self,
+        period: str,
+        series: pd.Series,
+        parameters: base.MannKendallParameters,
+        process_pool: Optional[processpool.ProcessPool] = None,
+    ) -> tuple[pd.Series, dict]:
+        if (trend := self.trends.get(period)) is not None:
+            trend_line = _get_mann_kendall_trend_line(
+                series, parameters, trend.slope, trend.intercept
+            )
+            info = trend.get_info()
+        else:
+            trend_line, info = processpool.run(
+                process_pool, get_mann_kendall_trend, series, parameters
+            )
+        return trend_line, {"mann-kendall": info}
+
+
+def _get_precomputed_statistics(
+    session: sqlmodel.Session,
+    station: observations.Station,
+    variable: observations.Variable,
+    aggregation_type: base.ObservationAggregationType,
+    include_decade_data: bool,
+    mann_kendall_parameters: Optional[base.MannKendallParameters],
+) -> _PrecomputedStatistics:
+    result = _PrecomputedStatistics()
+    if mann_kendall_parameters is not None:
+        for trend in database.collect_all_measurement_trends(
+            session,
+            station_id=station.id,
+            variable_id=variable.id,
+            window=mann_kendall_parameters.window,
+            aggregation_type_filter=aggregation_type,
+        ):
+            result.trends[trend.period] = trend
+    if include_decade_data:
+        for decade_mean in database.collect_all_measurement_decade_means(
+            session,
+            station_id=station.id,
+            variable_id=variable.id,
+            aggregation_type_filter=aggregation_type,
+        ):
+            result.decade_means.setdefault(decade_mean.period, []).append(decade_mean)
+    return result
 
 
 def old_get_observation_time_series(
@@ -320,27 +878,13 @@ def old_get_observation_time_series(
         mk_end = mann_kendall_parameters.end_year or df.index[-1].year
         if mk_end - mk_start >= 27:
             mk_df = df[str(mk_start) : str(mk_end)].copy()
-            mk_result = mk.original_test(mk_df[base_name])
+            mk_result = trends.mann_kendall_test(mk_df[base_name].to_numpy())
             mk_df[mk_col] = (
                 mk_result.slope * (mk_df.index.year - mk_df.index.year.min())
                 + mk_result.intercept
             )
             mk_df = mk_df.drop(columns=[base_name, unsmoothed_col_name])
-            info.update(
-                {
-                    "mann_kendall": {
-                        "trend": mk_result.trend,
-                        "h": mk_result.h,
-                        "p": mk_result.p,
-                        "z": mk_result.z,
-                        "tau": mk_result.Tau,
-                        "s": mk_result.s,
-                        "var_s": mk_result.var_s,
-                        "slope": mk_result.slope,
-                        "intercept": mk_result.intercept,
-                    }
-                }
-            )
+            info.update({"mann_kendall": mk_result.to_info()})
         else:
             raise ValueError(
                 "Mann-Kendall start and end year must span at least 27 years"
@@ -445,38 +989,44 @@ def _parse_ncss_dataset(
 
 
 def process_coverage_smoothing_strategy(
-    df: pd.DataFrame,
-    column_to_smooth: str,
-    strategy: base.CoverageDataSmoothingStrategy,
-    ignore_warnings: bool = True,
-) -> tuple[pd.DataFrame, str]:
-    smoothed_column_name = "__".join((column_to_smooth, strategy.value))
+    years: np.ndarray, values: np.ndarray, strategy: base.CoverageDataSmoothingStrategy
+) -> np.ndarray:
+    """Smooth a yearly coverage series, returning an array of the same length."""
+    return process_coverage_smoothing_strategy_many(
+        years,
+        np.asarray(values, dtype=float)[np.newaxis],
+        strategy,
+    )[0]
+
+
+def process_coverage_smoothing_strategy_many(
+    years: np.ndarray, values: np.ndarray, strategy: base.CoverageDataSmoothingStrategy
+) -> np.ndarray:
+    """Smooth yearly coverage series which share the same years.
+
+    Series are the rows of a 2-D array, and the result has the same shape.
+    """
     if strategy == base.CoverageDataSmoothingStrategy.LOESS_SMOOTHING:
-        df[smoothed_column_name] = _apply_loess_smoothing(
-            df, column_to_smooth, ignore_warnings=ignore_warnings
-        )
+        result = np.empty(values.shape)
+        for row_index, row in enumerate(values):
+            result[row_index] = _apply_loess_smoothing(years, row)
     elif strategy == base.CoverageDataSmoothingStrategy.MOVING_AVERAGE_11_YEARS:
-        df[smoothed_column_name] = (
-            df[column_to_smooth].rolling(center=True, window=11).mean()
-        )
+        result = smoothing.centered_moving_average_many(values, window=11)
     else:
         raise NotImplementedError(f"smoothing strategy {strategy!r} is not implemented")
-    return df, smoothed_column_name
+    return result
 
 
 def process_station_data_smoothing_strategy(
-    df: pd.DataFrame,
-    column_to_smooth: str,
+    values: np.ndarray,
     strategy: base.ObservationDataSmoothingStrategy,
-) -> tuple[pd.DataFrame, str]:
-    smoothed_column_name = "__".join((column_to_smooth, strategy.value))
+) -> np.ndarray:
+    """Smooth a yearly station series, returning an array of the same length."""
     if strategy == base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS:
-        df[smoothed_column_name] = (
-            df[column_to_smooth].rolling(window=5, center=True).mean()
-        )
+        result = smoothing.centered_moving_average(values, window=5)
     else:
         raise NotImplementedError(f"smoothing strategy {strategy!r} is not implemented")
-    return df, smoothed_column_name
+    return result
 
 
 def get_related_uncertainty_coverage_configurations(
@@ -573,6 +1123,7 @@ def get_coverage_time_series(
     include_observation_data: bool = False,
     include_coverage_uncertainty: bool = False,
     include_coverage_related_data: bool = False,
+    process_pool: Optional[processpool.ProcessPool] = None,
 ) -> tuple[
     dict[
         tuple[coverages.CoverageInternal, base.CoverageDataSmoothingStrategy], pd.Series
@@ -613,25 +1164,21 @@ def get_coverage_time_series(
         if ss != base.CoverageDataSmoothingStrategy.NO_SMOOTHING
     ]
 
-    for cov, data_ in raw_data.items():
-        df = _parse_ncss_dataset(
-            data_,
-            cov.configuration.netcdf_main_dataset_name,
-            start,
-            end,
-            cov.identifier,
-        )
-        coverage_result[(cov, base.CoverageDataSmoothingStrategy.NO_SMOOTHING)] = df[
-            cov.identifier
-        ].squeeze()
-        for smoothing_strategy in additional_coverage_smoothing_strategies:
-            df, smoothed_column = process_coverage_smoothing_strategy(
-                df,
-                cov.identifier,
-                smoothing_strategy,
-                ignore_warnings=(not settings.debug),
-            )
-            coverage_result[(cov, smoothing_strategy)] = df[smoothed_column].squeeze()
+    # the coverage and its uncertainty and related coverages are smoothed together
+    all_processed = processpool.run(
+        process_pool,
+        _process_ncss_datasets,
+        [
+            (data_, cov.configuration.netcdf_main_dataset_name, cov.identifier)
+            for cov, data_ in raw_data.items()
+        ],
+        start,
+        end,
+        additional_coverage_smoothing_strategies,
+    )
+    for cov, processed in zip(raw_data.keys(), all_processed):
+        for smoothing_strategy, series in processed.items():
+            coverage_result[(cov, smoothing_strategy)] = series
 
     if not include_coverage_data:
         del coverage_result[(coverage, base.CoverageDataSmoothingStrategy.NO_SMOOTHING)]
@@ -656,29 +1203,21 @@ def get_coverage_time_series(
             )
             if station_data is not None:
                 observation_result = {}
-                raw_station_data, station = station_data
-                station_df = _process_station_data(
-                    raw_station_data,
-                    start,
-                    end,
-                    variable.name,
-                    aggregation_type=(
-                        coverage.configuration.observation_variable_aggregation_type
-                    ),
+                station_times, station_values, station = station_data
+                station_series = _process_station_data(
+                    station_times, station_values, start, end, variable.name
                 )
                 observation_result[
                     (variable, base.ObservationDataSmoothingStrategy.NO_SMOOTHING)
-                ] = station_df[variable.name].squeeze()
+                ] = station_series
                 for smoothing_strategy in additional_observation_smoothing_strategies:
-                    (
-                        station_df,
-                        smoothed_column,
-                    ) = process_station_data_smoothing_strategy(
-                        station_df, variable.name, smoothing_strategy
+                    observation_result[(variable, smoothing_strategy)] = pd.Series(
+                        process_station_data_smoothing_strategy(
+                            station_series.to_numpy(), smoothing_strategy
+                        ),
+                        index=station_series.index,
+                        name="__".join((variable.name, smoothing_strategy.value)),
                     )
-                    observation_result[(variable, smoothing_strategy)] = station_df[
-                        smoothed_column
-                    ].squeeze()
             else:
                 logger.info("No station data found, skipping...")
         else:
@@ -695,126 +1234,92 @@ def extract_nearby_station_data(
     point_geom: shapely.Point,
     coverage_configuration: coverages.CoverageConfiguration,
     coverage_identifier: str,
-) -> Optional[
-    tuple[
-        list[
-            observations.MonthlyMeasurement
-            | observations.SeasonalMeasurement
-            | observations.YearlyMeasurement
-        ],
-        observations.Station,
-    ]
-]:
+) -> Optional[tuple[np.ndarray, np.ndarray, observations.Station]]:
+    """Get the measurement series of the nearest station that has data.
+
+    Returns arrays of times and values, as returned by
+    `database.get_measurement_series()`, together with the station.
+    """
     point_buffer_geom = _get_spatial_buffer(
         point_geom, settings.nearest_station_radius_meters
     )
-    nearby_stations = database.collect_all_stations(
-        session, polygon_intersection_filter=point_buffer_geom
+    aggregation_type = coverage_configuration.observation_variable_aggregation_type
+    if aggregation_type == base.ObservationAggregationType.SEASONAL:
+        season_filter = coverage_configuration.get_seasonal_aggregation_query_filter(
+            coverage_identifier
+        )
+    else:
+        season_filter = None
+    # stations are filtered by their data availability and sorted by distance in
+    # the database, which means the first one is the one to use
+    nearby_stations = database.collect_all_nearby_stations_with_data(
+        session,
+        point_geom=point_geom,
+        polygon_intersection_filter=point_buffer_geom,
+        variable_id=coverage_configuration.observation_variable_id,
+        aggregation_type=aggregation_type,
+        period_filter=season_filter.value if season_filter is not None else None,
     )
-    if len(nearby_stations) > 0:
-        retriever_kwargs = {
-            "variable_id_filter": coverage_configuration.observation_variable_id
-        }
-        aggregation_type = coverage_configuration.observation_variable_aggregation_type
-        if aggregation_type == base.ObservationAggregationType.MONTHLY:
-            retriever = functools.partial(
-                database.collect_all_monthly_measurements,
-                session,
-                **retriever_kwargs,
-                month_filter=None,
-            )
-        elif aggregation_type == base.ObservationAggregationType.SEASONAL:
-            retriever = functools.partial(
-                database.collect_all_seasonal_measurements,
-                session,
-                **retriever_kwargs,
-                season_filter=coverage_configuration.get_seasonal_aggregation_query_filter(
-                    coverage_identifier
-                ),
-            )
-        else:  # ANNUAL
-            retriever = functools.partial(
-                database.collect_all_yearly_measurements,
-                session,
-                **retriever_kwargs,
-            )
-        sorted_stations = sorted(
-            nearby_stations, key=lambda s: to_shape(s.geom).distance(point_geom)
+    for station in nearby_stations:
+        logger.debug(f"Processing station {station.id}...")
+        times, values = database.get_measurement_series(
+            session,
+            station_id=station.id,
+            variable_id=coverage_configuration.observation_variable_id,
+            aggregation_type=aggregation_type,
+            season_filter=season_filter,
         )
-        # order nearby stations by distance and then iterate through them in order to
-        # try to get measurements for the relevant variable and temporal aggregation
-        for station in sorted_stations:
-            logger.debug(f"Processing station {station.id}...")
-            raw_station_data = retriever(station_id_filter=station.id)
-            if len(raw_station_data) > 0:
-                # stop with the first station that has data
-                result = (raw_station_data, station)
-                break
-        else:
-            result = None
-            logger.info("Nearby stations do not have data")
+        if len(times) > 0:
+            result = (times, values, station)
+            break
     else:
         logger.info(
-            f"There are no nearby stations from {shapely.io.to_wkt(point_geom)}"
+            f"There are no nearby stations with data from "
+            f"{shapely.io.to_wkt(point_geom)}"
         )
         result = None
     return result
 
 
 def _process_station_data(
-    raw_data: list[observations.SeasonalMeasurement],
+    times: np.ndarray,
+    values: np.ndarray,
     time_start: Optional[dt.datetime],
     time_end: Optional[dt.datetime],
     base_name: str,
-    aggregation_type: base.ObservationAggregationType,
-):
-    df = pd.DataFrame([i.model_dump() for i in raw_data])
-    df = df.rename(columns={"value": base_name})
-    if aggregation_type == base.ObservationAggregationType.SEASONAL:
-        df["season_month"] = (
-            df["season"]
-            .astype("string")
-            .replace(
-                {
-                    "Season.WINTER": "01",
-                    "Season.SPRING": "04",
-                    "Season.SUMMER": "07",
-                    "Season.AUTUMN": "10",
-                }
-            )
-        )
-        df["time"] = pd.to_datetime(
-            df["year"].astype("string") + "-" + df["season_month"] + "-01", utc=True
-        )
-    elif aggregation_type == base.ObservationAggregationType.YEARLY:
-        df["time"] = pd.to_datetime(df["year"].astype("string"), utc=True)
-    else:
-        raise RuntimeError(
-            f"Unable to process station data with aggregation type {aggregation_type}"
-        )
-
-    df = df[[base_name, "time"]]
-    df.set_index("time", inplace=True)
+) -> pd.Series:
+    mask = np.ones(len(times), dtype=bool)
     if time_start is not None:
-        df = df[time_start:]
+        mask &= times >= _to_naive_utc_datetime64(time_start)
     if time_end is not None:
-        df = df[:time_end]
-    return df
+        mask &= times <= _to_naive_utc_datetime64(time_end)
+    index = pd.DatetimeIndex(times[mask], name="time").tz_localize(dt.timezone.utc)
+    return pd.Series(values[mask], index=index, name=base_name, dtype=float)
 
 
-def _apply_loess_smoothing(
-    df: pd.DataFrame, source_column_name: str, ignore_warnings: bool = True
-) -> np.ndarray:
-    with warnings.catch_warnings():
-        if ignore_warnings:
-            warnings.simplefilter("ignore")
-        loess_smoothed = pyloess.loess(
-            df.index.year.astype("int").values,
-            df[source_column_name],
-            span=0.75,
-            degree=2,
-        )
-    return loess_smoothed[:, 1]
+def _to_naive_utc_datetime64(value: dt.datetime) -> np.datetime64:
+    return np.datetime64(value.astimezone(dt.timezone.utc).replace(tzinfo=None), "us")
+
+
+def _apply_loess_smoothing(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return smoothing.loess(years.astype("int"), values, span=0.75, degree=2)
+
+
+def _get_date_bounds(
+    start: Optional[dt.datetime], end: Optional[dt.datetime]
+) -> tuple[Optional[dt.date], Optional[dt.date]]:
+    """Convert a UTC temporal range into the equivalent inclusive range of dates.
+
+    Dates are taken to represent midnight UTC of the respective day.
+    """
+    if start is not None:
+        start_date = start.date()
+        if start.timetz().replace(tzinfo=None) != dt.time():
+            start_date += dt.timedelta(days=1)
+    else:
+        start_date = None
+    end_date = end.date() if end is not None else None
+    return start_date, end_date
 
 
 def _parse_temporal_range(
@@ -0,0 +1,104 @@
+"""Optional process pool for the CPU-bound steps of time series processing.
+
+Smoothing, trend computation and parsing of time series hold the GIL, which
+means that, when run in the web application's threadpool, they stall other
+requests. When enabled, these steps are sent to a pool of worker processes.
+
+Tasks are submitted as plain top-level functions, with their inputs and outputs
+being NumPy arrays or pandas objects, which are pickled as contiguous buffers.
+When all workers are busy and the pool already has its maximum number of
+pending tasks, a task is run in the calling thread instead of waiting.
+
+Workers are separate processes, so in-process memos, such as the one of
+`smoothing.loess()`, are split between them and the web worker itself. With the
+pool enabled these memos mostly miss, as consecutive requests for the same series
+are usually handled by different workers.
+"""
+
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from typing import (
+    Any,
+    Callable,
+    Optional,
+)
+
+from .config import ProcessPoolSettings
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPool:
+    def __init__(self, max_workers: int, max_pending_tasks: int):
+        self.max_workers = max_workers
+        self.max_pending_tasks = max_pending_tasks
+        self._slots = threading.BoundedSemaphore(max_pending_tasks)
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        # forking a multi-threaded web worker is not safe, hence the spawn context
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a function in the pool, or in the calling thread if it is saturated."""
+        if not self._slots.acquire(blocking=False):
+            logger.debug(f"Process pool is saturated, running {func.__name__} inline")
+            return func(*args, **kwargs)
+        try:
+            with self._lock:
+                executor = self._executor
+            try:
+                return executor.submit(func, *args, **kwargs).result()
+            except BrokenProcessPool:
+                logger.exception("Process pool is broken, restarting it...")
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = self._create_executor()
+                return func(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run(pool: Optional[ProcessPool], func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a function in the input pool, if there is one, or in the calling thread."""
+    if pool is None:
+        return func(*args, **kwargs)
+    return pool.run(func, *args, **kwargs)
+
+
+_pool: Optional[ProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(settings: ProcessPoolSettings) -> Optional[ProcessPool]:
+    """Get the process pool, if enabled.
+
+    There is a single pool in each process, which is created on first use.
+    """
+    global _pool
+    if not settings.enabled:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPool(settings.max_workers, settings.max_pending_tasks)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Shut down the process pool, if it has been created."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,277 @@
+"""Inspection of the query plans of the main observation query shapes.
+
+The statements are captured from calls to the functions of the `database`
+module, so that their plans are always the ones of the real queries. They are
+run against a synthetic dataset which is created inside a transaction that is
+rolled back afterwards, leaving the database untouched.
+"""
+
+import dataclasses
+import datetime as dt
+import logging
+import re
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Optional,
+)
+
+import sqlalchemy
+import sqlmodel
+
+from . import database
+from .schemas import base
+
+logger = logging.getLogger(__name__)
+
+MEASUREMENT_TABLES = (
+    "monthlymeasurement",
+    "seasonalmeasurement",
+    "yearlymeasurement",
+)
+
+_SEQ_SCAN_PATTERN = re.compile(r"Seq Scan on (?P<table>\w+)")
+
+
+@dataclasses.dataclass
+class QueryPlan:
+    name: str
+    statement: str
+    plan: list[str]
+
+    @property
+    def sequential_scans(self) -> list[str]:
+        """Return the measurement tables which are read with a sequential scan."""
+        result = []
+        for line in self.plan:
+            if (match := _SEQ_SCAN_PATTERN.search(line)) is not None:
+                if (table := match.group("table")) in MEASUREMENT_TABLES:
+                    result.append(table)
+        return result
+
+
+@dataclasses.dataclass(frozen=True)
+class SyntheticDataset:
+    station_ids: list[uuid.UUID]
+    variable_ids: list[uuid.UUID]
+    start_year: int
+    end_year: int
+
+
+def create_synthetic_dataset(
+    session: sqlmodel.Session,
+    *,
+    num_stations: int = 50,
+    num_variables: int = 5,
+    start_year: int = 1950,
+    end_year: int = 2020,
+) -> SyntheticDataset:
+    """Insert synthetic stations, variables and measurements.
+
+    Data is inserted with set-based SQL statements and is not committed, which
+    means the caller is responsible for rolling back the session's transaction.
+    Table statistics are refreshed afterwards, so that the planner sees the
+    synthetic data.
+    """
+    connection = session.connection()
+    station_ids = list(
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO station (id, geom, code, name, type_, altitude_m) "
+                "SELECT gen_random_uuid(), "
+                "ST_SetSRID(ST_MakePoint(11 + random(), 45 + random()), 4326), "
+                "'synthetic-' || i, 'synthetic station ' || i, 'synthetic', "
+                "random() * 2000 "
+                "FROM generate_series(1, :num_stations) AS i "
+                "RETURNING id"
+            ),
+            {"num_stations": num_stations},
+        ).scalars()
+    )
+    variable_ids = list(
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO variable (id, name) "
+                "SELECT gen_random_uuid(), 'synthetic-' || i "
+                "FROM generate_series(1, :num_variables) AS i "
+                "RETURNING id"
+            ),
+            {"num_variables": num_variables},
+        ).scalars()
+    )
+    params = {
+        "station_ids": [str(id_) for id_ in station_ids],
+        "variable_ids": [str(id_) for id_ in variable_ids],
+        "start_year": start_year,
+        "end_year": end_year,
+        "start_date": dt.date(start_year, 1, 1),
+        "end_date": dt.date(end_year, 12, 1),
+    }
+    connection.execute(
+        sqlalchemy.text(
+            "INSERT INTO monthlymeasurement (id, station_id, variable_id, value, date) "
+            "SELECT gen_random_uuid(), s.id, v.id, random() * 30, CAST(d AS date) "
+            "FROM unnest(CAST(:station_ids AS uuid[])) AS s(id) "
+            "CROSS JOIN unnest(CAST(:variable_ids AS uuid[])) AS v(id) "
+            "CROSS JOIN generate_series("
+            "CAST(:start_date AS date), CAST(:end_date AS date), interval '1 month'"
+            ") AS d"
+        ),
+        params,
+    )
+    connection.execute(
+        sqlalchemy.text(
+            "INSERT INTO seasonalmeasurement "
+            "(id, station_id, variable_id, value, year, season) "
+            "SELECT gen_random_uuid(), s.id, v.id, random() * 30, y, season "
+            "FROM unnest(CAST(:station_ids AS uuid[])) AS s(id) "
+            "CROSS JOIN unnest(CAST(:variable_ids AS uuid[])) AS v(id) "
+            "CROSS JOIN generate_series(:start_year, :end_year) AS y "
+            "CROSS JOIN unnest(enum_range(CAST(NULL AS season))) AS season"
+        ),
+        params,
+    )
+    connection.execute(
+        sqlalchemy.text(
+            "INSERT INTO yearlymeasurement (id, station_id, variable_id, value, year) "
+            "SELECT gen_random_uuid(), s.id, v.id, random() * 30, y "
+            "FROM unnest(CAST(:station_ids AS uuid[])) AS s(id) "
+            "CROSS JOIN unnest(CAST(:variable_ids AS uuid[])) AS v(id) "
+            "CROSS JOIN generate_series(:start_year, :end_year) AS y"
+        ),
+        params,
+    )
+    for table_name in ("station", "variable") + MEASUREMENT_TABLES:
+        connection.execute(sqlalchemy.text(f"ANALYZE {table_name}"))
+    return SyntheticDataset(
+        station_ids=station_ids,
+        variable_ids=variable_ids,
+        start_year=start_year,
+        end_year=end_year,
+    )
+
+
+def get_query_shapes(
+    dataset: SyntheticDataset,
+) -> dict[str, Callable[[sqlmodel.Session], Any]]:
+    """Return the main observation queries, as performed by the web application."""
+    station_id = dataset.station_ids[0]
+    variable_id = dataset.variable_ids[0]
+    return {
+        "monthly measurements for month": lambda session: (
+            database.list_monthly_measurements(
+                session,
+                station_id_filter=station_id,
+                variable_id_filter=variable_id,
+                month_filter=1,
+                include_total=True,
+            )
+        ),
+        "seasonal measurements for season": lambda session: (
+            database.list_seasonal_measurements(
+                session,
+                station_id_filter=station_id,
+                variable_id_filter=variable_id,
+                season_filter=base.Season.WINTER,
+                include_total=True,
+            )
+        ),
+        "yearly measurements": lambda session: (
+            database.list_yearly_measurements(
+                session,
+                station_id_filter=station_id,
+                variable_id_filter=variable_id,
+                include_total=True,
+            )
+        ),
+        "stations with monthly variable": lambda session: database.list_stations(
+            session,
+            variable_id_filter=variable_id,
+            variable_aggregation_type=base.ObservationAggregationType.MONTHLY,
+            include_total=True,
+        ),
+        "stations with seasonal variable": lambda session: database.list_stations(
+            session,
+            variable_id_filter=variable_id,
+            variable_aggregation_type=base.ObservationAggregationType.SEASONAL,
+            include_total=True,
+        ),
+        "stations with yearly variable": lambda session: database.list_stations(
+            session,
+            variable_id_filter=variable_id,
+            variable_aggregation_type=base.ObservationAggregationType.YEARLY,
+            include_total=True,
+        ),
+        "monthly time series": lambda session: (
+            database.get_monthly_measurement_time_series(
+                session,
+                station_id=station_id,
+                variable_id=variable_id,
+                month=1,
+            )
+        ),
+        "monthly decade means": lambda session: (
+            database.get_monthly_measurement_decade_means(
+                session,
+                station_id=station_id,
+                variable_id=variable_id,
+                month=1,
+            )
+        ),
+        "monthly measurement series": lambda session: (
+            database.get_measurement_series(
+                session,
+                station_id=station_id,
+                variable_id=variable_id,
+                aggregation_type=base.ObservationAggregationType.MONTHLY,
+                month_filter=1,
+            )
+        ),
+    }
+
+
+def capture_statements(
+    session: sqlmodel.Session, query: Callable[[sqlmodel.Session], Any]
+) -> list[tuple[str, Any]]:
+    """Run the input query and return the SQL statements it has emitted."""
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    connection = session.connection()
+    sqlalchemy.event.listen(connection, "before_cursor_execute", _capture)
+    try:
+        query(session)
+    finally:
+        sqlalchemy.event.remove(connection, "before_cursor_execute", _capture)
+    return captured
+
+
+def explain(
+    session: sqlmodel.Session, statement: str, parameters: Optional[Any] = None
+) -> list[str]:
+    """Run EXPLAIN ANALYZE on the input SQL statement and return the plan lines."""
+    result = session.connection().exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters or {}
+    )
+    return [row[0] for row in result]
+
+
+def explain_query_shapes(
+    session: sqlmodel.Session, dataset: SyntheticDataset
+) -> list[QueryPlan]:
+    plans = []
+    for name, query in get_query_shapes(dataset).items():
+        statements = capture_statements(session, query)
+        for index, (statement, parameters) in enumerate(statements):
+            plan_name = name if len(statements) == 1 else f"{name} ({index + 1})"
+            plans.append(
+                QueryPlan(
+                    name=plan_name,
+                    statement=statement,
+                    plan=explain(session, statement, parameters),
+                )
+            )
+    return plans
@@ -0,0 +1,231 @@
+"""Replay of recorded HTTP responses, as a stand-in for upstream services.
+
+This allows running the observations harvester and the THREDDS (NCSS and WMS)
+related code paths without network access, for example when benchmarking.
+
+Each fixture is described by a JSON file in the fixtures directory, with
+the following keys:
+
+- `method` - HTTP method, defaults to `GET`
+- `path` - URL path to match, e.g. `/REST/v1/clima_indicatori/staz_attive`
+- `query` - optional mapping of query parameters that must be present in the
+  request. When multiple fixtures match a request, the one with more query
+  parameters is used
+- `status_code` - defaults to `200`
+- `headers` - optional mapping of response headers
+- `body` (text), `json` (JSON content) or `body_file` (path of a file with the
+  raw response body, relative to the fixtures directory)
+
+Fixtures are loaded once per combination of replay settings and the resulting
+transport is shared by all clients, so that loading them does not distort
+benchmarks. Since the transport does not open connections, the connection
+`limits` of clients that use it have no effect.
+"""
+
+import dataclasses
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import anyio
+import httpx
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordedResponse:
+    method: str
+    path: str
+    query: dict[str, str]
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+
+    def matches(self, request: httpx.Request) -> bool:
+        return (
+            request.method == self.method
+            and request.url.path.rstrip("/") == self.path.rstrip("/")
+            and all(
+                request.url.params.get(name) == value
+                for name, value in self.query.items()
+            )
+        )
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """An httpx transport that replays recorded responses.
+
+    It can be used by both sync and async httpx clients. Requests that do not
+    match any recorded response get a `404 Not Found` response.
+    """
+
+    def __init__(
+        self,
+        recorded: list[RecordedResponse],
+        latency_seconds: float = 0,
+        latency_jitter_seconds: float = 0,
+        error_rate: float = 0,
+        error_status_code: int = 503,
+        random_seed: Optional[int] = None,
+    ):
+        self.recorded = sorted(recorded, key=lambda r: len(r.query), reverse=True)
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.error_rate = error_rate
+        self.error_status_code = error_status_code
+        self._random = random.Random(random_seed)
+        self._random_lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, fixtures_dir: Path, **kwargs) -> "ReplayTransport":
+        return cls(load_recorded_responses(fixtures_dir), **kwargs)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay, inject_error = self._roll()
+        if delay > 0:
+            time.sleep(delay)
+        return self._build_response(request, inject_error)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay, inject_error = self._roll()
+        if delay > 0:
+            await anyio.sleep(delay)
+        return self._build_response(request, inject_error)
+
+    def _roll(self) -> tuple[float, bool]:
+        with self._random_lock:
+            jitter = (
+                self._random.uniform(
+                    -self.latency_jitter_seconds, self.latency_jitter_seconds
+                )
+                if self.latency_jitter_seconds > 0
+                else 0
+            )
+            inject_error = (
+                self.error_rate > 0 and self._random.random() < self.error_rate
+            )
+        return max(0.0, self.latency_seconds + jitter), inject_error
+
+    def _build_response(
+        self, request: httpx.Request, inject_error: bool
+    ) -> httpx.Response:
+        if inject_error:
+            logger.debug(f"Injecting error response for {request.url}")
+            return httpx.Response(
+                self.error_status_code, request=request, text="Injected error"
+            )
+        for recorded in self.recorded:
+            if recorded.matches(request):
+                return httpx.Response(
+                    recorded.status_code,
+                    headers=recorded.headers,
+                    content=recorded.content,
+                    request=request,
+                )
+        logger.warning(f"No recorded response for {request.method} {request.url}")
+        return httpx.Response(404, request=request, text="No recorded response")
+
+
+def load_recorded_responses(fixtures_dir: Path) -> list[RecordedResponse]:
+    result = []
+    for fixture_path in sorted(fixtures_dir.glob("*.json")):
+        fixture = json.loads(fixture_path.read_text())
+        if (body_file := fixture.get("body_file")) is not None:
+            content = (fixtures_dir / body_file).read_bytes()
+        elif (json_content := fixture.get("json")) is not None:
+            content = json.dumps(json_content).encode("utf-8")
+        else:
+            content = fixture.get("body", "").encode("utf-8")
+        result.append(
+            RecordedResponse(
+                method=fixture.get("method", "GET").upper(),
+                path=fixture["path"],
+                query={k: str(v) for k, v in fixture.get("query", {}).items()},
+                status_code=fixture.get("status_code", 200),
+                headers=fixture.get("headers", {}),
+                content=content,
+            )
+        )
+    return result
+
+
+def write_recorded_response(
+    fixtures_dir: Path,
+    name: str,
+    path: str,
+    content: str | bytes,
+    *,
+    method: str = "GET",
+    query: Optional[dict[str, str]] = None,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None,
+    body_file_suffix: str = ".txt",
+) -> Path:
+    """Write a fixture to the fixtures directory, in the format expected for replay."""
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    body_file = f"{name}{body_file_suffix}"
+    raw_content = content.encode("utf-8") if isinstance(content, str) else content
+    (fixtures_dir / body_file).write_bytes(raw_content)
+    fixture_path = fixtures_dir / f"{name}.json"
+    fixture_path.write_text(
+        json.dumps(
+            {
+                "method": method,
+                "path": path,
+                "query": query or {},
+                "status_code": status_code,
+                "headers": headers or {},
+                "body_file": body_file,
+            },
+            indent=2,
+        )
+    )
+    return fixture_path
+
+
+def build_transport(
+    settings: config.ReplaySettings,
+) -> Optional[ReplayTransport]:
+    """Get the replay transport, if replaying is enabled in the settings.
+
+    The transport is built on first use and then reused for the same settings.
+    """
+    if settings.enabled:
+        if settings.fixtures_dir is None:
+            raise RuntimeError("Replay is enabled but no fixtures_dir is configured")
+        return _get_cached_transport(
+            settings.fixtures_dir,
+            settings.latency_seconds,
+            settings.latency_jitter_seconds,
+            settings.error_rate,
+            settings.error_status_code,
+            settings.random_seed,
+        )
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def _get_cached_transport(
+    fixtures_dir: Path,
+    latency_seconds: float,
+    latency_jitter_seconds: float,
+    error_rate: float,
+    error_status_code: int,
+    random_seed: Optional[int],
+) -> ReplayTransport:
+    return ReplayTransport.from_directory(
+        fixtures_dir,
+        latency_seconds=latency_seconds,
+        latency_jitter_seconds=latency_jitter_seconds,
+        error_rate=error_rate,
+        error_status_code=error_status_code,
+        random_seed=random_seed,
+    )
@@ -153,6 +153,13 @@ class MannKendallParameters(pydantic.BaseModel):
                 )
         return self
 
+    @property
+    def window(self) -> str:
+        """Identify the parameters' temporal window, using `..` for open ends."""
+        start = str(self.start_year) if self.start_year is not None else ".."
+        end = str(self.end_year) if self.end_year is not None else ".."
+        return f"{start}/{end}"
+
 
 class ResourceList(pydantic.BaseModel):
     items: list[sqlmodel.SQLModel]
@@ -0,0 +1,58 @@
+"""Generation counters for the data domains that are served by the API.
+
+A domain's generation is incremented whenever its data changes. This allows
+caches to know whether an entry is still current without having to inspect the
+underlying data.
+"""
+
+import datetime as dt
+import uuid
+from typing import Optional
+
+import sqlalchemy
+import sqlmodel
+
+NOTIFICATION_CHANNEL = "arpav_ppcv_data_generations"
+
+STATIONS_DOMAIN = "stations"
+VARIABLES_DOMAIN = "variables"
+COVERAGE_CONFIGURATIONS_DOMAIN = "coverage-configurations"
+MUNICIPALITIES_DOMAIN = "municipalities"
+_MEASUREMENTS_DOMAIN_PREFIX = "measurements:"
+
+
+def get_measurements_domain(variable_id: uuid.UUID) -> str:
+    """Return the name of the domain with the measurements of a variable."""
+    return f"{_MEASUREMENTS_DOMAIN_PREFIX}{variable_id}"
+
+
+def build_notification_payload(
+    domain: str, generation: int, updated_at: dt.datetime
+) -> str:
+    """Build the payload of the notification of a new generation of a domain."""
+    return f"{domain}={generation}@{updated_at.isoformat()}"
+
+
+def parse_notification_payload(
+    payload: str,
+) -> tuple[str, int, Optional[dt.datetime]]:
+    """Parse the domain, generation and update time of a notification payload.
+
+    The update time is optional. Raises `ValueError` for invalid payloads.
+    """
+    domain, _, raw_generation = payload.rpartition("=")
+    raw_generation, _, raw_updated_at = raw_generation.partition("@")
+    updated_at = dt.datetime.fromisoformat(raw_updated_at) if raw_updated_at else None
+    return domain, int(raw_generation), updated_at
+
+
+class DataGeneration(sqlmodel.SQLModel, table=True):
+    domain: str = sqlmodel.Field(primary_key=True)
+    generation: int = 0
+    updated_at: dt.datetime = sqlmodel.Field(
+        sa_column=sqlalchemy.Column(
+            sqlalchemy.DateTime(timezone=True),
+            server_default=sqlalchemy.func.now(),
+            nullable=False,
+        )
+    )
@@ -1,3 +1,6 @@
+import enum
+import typing
+import unicodedata
 import uuid
 
 import geoalchemy2
@@ -9,8 +12,81 @@ import sqlmodel
 from . import fields
 
 
+class MunicipalityGeometryType(enum.Enum):
+    FULL = "full"
+    CENTROID = "centroid"
+    BBOX = "bbox"
+    NONE = "none"
+
+
+class MunicipalityGeometrySimplification(enum.Enum):
+    NONE = "none"
+    FINE = "fine"
+    MEDIUM = "medium"
+    COARSE = "coarse"
+
+    @property
+    def tolerance(self) -> typing.Optional[float]:
+        """Simplification tolerance, in degrees."""
+        return {
+            MunicipalityGeometrySimplification.NONE: None,
+            MunicipalityGeometrySimplification.FINE: 0.0005,
+            MunicipalityGeometrySimplification.MEDIUM: 0.002,
+            MunicipalityGeometrySimplification.COARSE: 0.008,
+        }[self]
+
+    @property
+    def column_name(self) -> str:
+        return {
+            MunicipalityGeometrySimplification.NONE: "geom",
+            MunicipalityGeometrySimplification.FINE: "geom_fine",
+            MunicipalityGeometrySimplification.MEDIUM: "geom_medium",
+            MunicipalityGeometrySimplification.COARSE: "geom_coarse",
+        }[self]
+
+    @classmethod
+    def from_zoom(cls, zoom: int) -> "MunicipalityGeometrySimplification":
+        """Return the coarsest simplification that is not visible at a zoom level.
+
+        The simplification error must be smaller than the size of a pixel of a
+        web mercator tile of 256 pixels, at the input zoom level.
+        """
+        pixel_size = 360 / (256 * 2**zoom)
+        for simplification in (cls.COARSE, cls.MEDIUM, cls.FINE):
+            if simplification.tolerance <= pixel_size:
+                return simplification
+        return cls.NONE
+
+
+def _get_geometry_column(geometry_type: str) -> sqlalchemy.Column:
+    return sqlalchemy.Column(
+        geoalchemy2.Geometry(
+            srid=4326,
+            geometry_type=geometry_type,
+            spatial_index=False,
+        )
+    )
+
+
+def normalize_search_name(name: str) -> str:
+    """Normalize a name for searching, ignoring case, accents and spacing."""
+    decomposed = unicodedata.normalize("NFKD", name.replace("\u2019", "'"))
+    unaccented = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(unaccented.casefold().split())
+
+
 class Municipality(sqlmodel.SQLModel, table=True):
     model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    __table_args__ = (
+        # supports substring and word similarity searches on names, which
+        # require the `pg_trgm` extension
+        sqlalchemy.Index(
+            "ix_municipality_search_name_trgm",
+            "search_name",
+            postgresql_using="gin",
+            postgresql_ops={"search_name": "gin_trgm_ops"},
+        ),
+    )
 
     id: pydantic.UUID4 = sqlmodel.Field(default_factory=uuid.uuid4, primary_key=True)
     geom: fields.WkbElement = sqlmodel.Field(
@@ -22,11 +98,40 @@ class Municipality(sqlmodel.SQLModel, table=True):
             )
         )
     )
+    # derived geometries, which are computed by the database when
+    # municipalities are created
+    geom_fine: typing.Optional[fields.WkbElement] = sqlmodel.Field(
+        default=None, sa_column=_get_geometry_column("MULTIPOLYGON")
+    )
+    geom_medium: typing.Optional[fields.WkbElement] = sqlmodel.Field(
+        default=None, sa_column=_get_geometry_column("MULTIPOLYGON")
+    )
+    geom_coarse: typing.Optional[fields.WkbElement] = sqlmodel.Field(
+        default=None, sa_column=_get_geometry_column("MULTIPOLYGON")
+    )
+    centroid: typing.Optional[fields.WkbElement] = sqlmodel.Field(
+        default=None, sa_column=_get_geometry_column("POINT")
+    )
+    bbox: typing.Optional[fields.WkbElement] = sqlmodel.Field(
+        default=None, sa_column=_get_geometry_column("POLYGON")
+    )
     name: str
+    # the name, as normalized by `normalize_search_name()`
+    search_name: str = ""
     province_name: str
     region_name: str
 
 
+GEOMETRY_COLUMN_NAMES = (
+    "geom",
+    "geom_fine",
+    "geom_medium",
+    "geom_coarse",
+    "centroid",
+    "bbox",
+)
+
+
 class MunicipalityCreate(sqlmodel.SQLModel):
     geom: geojson_pydantic.MultiPolygon
     name: str
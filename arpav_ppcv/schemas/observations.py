@@ -245,6 +245,15 @@ class MonthlyMeasurement(MonthlyMeasurementBase, table=True):
             onupdate="CASCADE",
             ondelete="CASCADE",  # i.e. delete a monthly measurement if its related station is deleted
         ),
+        # matches the filters used when retrieving a station's measurements for
+        # a given month, which are also sorted by date
+        sqlalchemy.Index(
+            "ix_monthlymeasurement_station_variable_month_date",
+            "station_id",
+            "variable_id",
+            sqlalchemy.text("EXTRACT(MONTH FROM date)"),
+            "date",
+        ),
     )
     id: pydantic.UUID4 = sqlmodel.Field(default_factory=uuid.uuid4, primary_key=True)
     station_id: pydantic.UUID4
@@ -304,6 +313,15 @@ class SeasonalMeasurement(sqlmodel.SQLModel, table=True):
             onupdate="CASCADE",
             ondelete="CASCADE",  # i.e. delete a measurement if its related station is deleted
         ),
+        # matches the filters used when retrieving a station's measurements for
+        # a given season, which are also sorted by year
+        sqlalchemy.Index(
+            "ix_seasonalmeasurement_station_variable_season_year",
+            "station_id",
+            "variable_id",
+            "season",
+            "year",
+        ),
     )
     id: pydantic.UUID4 = sqlmodel.Field(default_factory=uuid.uuid4, primary_key=True)
     station_id: pydantic.UUID4
@@ -368,6 +386,14 @@ class YearlyMeasurement(sqlmodel.SQLModel, table=True):
             onupdate="CASCADE",
             ondelete="CASCADE",  # i.e. delete a measurement if its related station is deleted
         ),
+        # matches the filters used when retrieving a station's measurements for
+        # a variable, which are also sorted by year
+        sqlalchemy.Index(
+            "ix_yearlymeasurement_station_variable_year",
+            "station_id",
+            "variable_id",
+            "year",
+        ),
     )
     id: pydantic.UUID4 = sqlmodel.Field(default_factory=uuid.uuid4, primary_key=True)
     station_id: pydantic.UUID4
@@ -405,3 +431,226 @@ class YearlyMeasurementCreate(sqlmodel.SQLModel):
 class YearlyMeasurementUpdate(sqlmodel.SQLModel):
     value: Optional[float] = None
     year: Optional[int] = None
+
+
+class MeasurementSeries(sqlmodel.SQLModel, table=True):
+    """Compact representation of a series of measurements.
+
+    Each row holds all measurements of a station and variable, for a temporal
+    aggregation type and period, with one value per year. Years without a
+    measurement are stored as NULL. The period is the month number for monthly
+    measurements, the season name for seasonal measurements and `YEAR` for yearly
+    measurements.
+
+    This table is derived from the measurement tables and is rebuilt by the
+    harvester after each refresh.
+    """
+
+    __table_args__ = (
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "station_id",
+            ],
+            [
+                "station.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a series if its related station is deleted
+        ),
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "variable_id",
+            ],
+            [
+                "variable.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a series if its related variable is deleted
+        ),
+    )
+    station_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    variable_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    aggregation_type: base.ObservationAggregationType = sqlmodel.Field(primary_key=True)
+    period: str = sqlmodel.Field(primary_key=True)
+    start_year: int
+    measurement_values: list[Optional[float]] = sqlmodel.Field(
+        sa_column=sqlalchemy.Column(sqlalchemy.ARRAY(sqlalchemy.Float), nullable=False)
+    )
+
+
+class StationVariableAvailability(sqlmodel.SQLModel, table=True):
+    """Summary of the measurements available for a station and variable.
+
+    There is one row for each temporal aggregation type and period, using the
+    same period values as `MeasurementSeries`.
+
+    This table is derived from the measurement tables and is refreshed whenever
+    measurements are created or deleted. It allows finding which stations have data
+    without scanning the measurement tables.
+    """
+
+    __table_args__ = (
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "station_id",
+            ],
+            [
+                "station.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a row if its related station is deleted
+        ),
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "variable_id",
+            ],
+            [
+                "variable.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a row if its related variable is deleted
+        ),
+        # matches the lookup of the stations that have data for a variable
+        sqlalchemy.Index(
+            "ix_stationvariableavailability_variable_aggregation_type",
+            "variable_id",
+            "aggregation_type",
+        ),
+    )
+    station_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    variable_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    aggregation_type: base.ObservationAggregationType = sqlmodel.Field(primary_key=True)
+    period: str = sqlmodel.Field(primary_key=True)
+    first_year: int
+    last_year: int
+    value_count: int
+
+    station: Station = sqlmodel.Relationship(
+        sa_relationship_kwargs={
+            "lazy": "joined",
+            "viewonly": True,
+        },
+    )
+    variable: Variable = sqlmodel.Relationship(
+        sa_relationship_kwargs={
+            "lazy": "joined",
+            "viewonly": True,
+        },
+    )
+
+
+class MeasurementTrend(sqlmodel.SQLModel, table=True):
+    """Precomputed Mann-Kendall trend of a measurement series.
+
+    Trends are computed for each station, variable, aggregation type and period
+    (using the same period values as `MeasurementSeries`) and for each of the
+    configured temporal windows. The window is identified as in
+    `MannKendallParameters.window` while `start_year` and `end_year` hold the
+    years that were actually used.
+
+    This table is derived from `MeasurementSeries` and is refreshed by the
+    harvester after each harvest.
+    """
+
+    __table_args__ = (
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "station_id",
+            ],
+            [
+                "station.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a trend if its related station is deleted
+        ),
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "variable_id",
+            ],
+            [
+                "variable.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a trend if its related variable is deleted
+        ),
+        # matches the lookup of the trends of all stations, as used by trend maps
+        sqlalchemy.Index(
+            "ix_measurementtrend_variable_aggregation_type_period_window",
+            "variable_id",
+            "aggregation_type",
+            "period",
+            "window",
+        ),
+    )
+    station_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    variable_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    aggregation_type: base.ObservationAggregationType = sqlmodel.Field(primary_key=True)
+    period: str = sqlmodel.Field(primary_key=True)
+    window: str = sqlmodel.Field(primary_key=True)
+    start_year: int
+    end_year: int
+    trend: str
+    h: bool
+    p: float
+    z: float
+    tau: float
+    s: float
+    var_s: float
+    slope: float
+    intercept: float
+
+    def get_info(self) -> dict[str, str | int | float]:
+        """Return the trend statistics, as reported by the API."""
+        return {
+            "trend": self.trend,
+            "h": self.h,
+            "p": self.p,
+            "z": self.z,
+            "tau": self.tau,
+            "s": self.s,
+            "var_s": self.var_s,
+            "slope": self.slope,
+            "intercept": self.intercept,
+        }
+
+
+class MeasurementDecadeMean(sqlmodel.SQLModel, table=True):
+    """Precomputed climatological decade mean of a measurement series.
+
+    Decades are identified by the year that precedes their start (_i.e._ 1990
+    stands for 1991-2000). All decades are stored, including the ones that do not
+    have enough values for their mean to be reported.
+
+    This table is derived from `MeasurementSeries` and is refreshed by the
+    harvester after each harvest.
+    """
+
+    __table_args__ = (
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "station_id",
+            ],
+            [
+                "station.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a decade mean if its related station is deleted
+        ),
+        sqlalchemy.ForeignKeyConstraint(
+            [
+                "variable_id",
+            ],
+            [
+                "variable.id",
+            ],
+            onupdate="CASCADE",
+            ondelete="CASCADE",  # i.e. delete a decade mean if its related variable is deleted
+        ),
+    )
+    station_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    variable_id: pydantic.UUID4 = sqlmodel.Field(primary_key=True)
+    aggregation_type: base.ObservationAggregationType = sqlmodel.Field(primary_key=True)
+    period: str = sqlmodel.Field(primary_key=True)
+    decade: int = sqlmodel.Field(primary_key=True)
+    mean_value: float
+    value_count: int
@@ -0,0 +1,163 @@
+"""Smoothing of evenly-spaced series, working directly on NumPy arrays.
+
+Moving averages are computed from cumulative sums, which makes their cost
+independent of the window size and avoids the overhead of pandas for the short
+series that are served by the API.
+
+LOESS smoothing is linear in the smoothed values, which means it can be written
+as the product of a hat matrix, which only depends on the positions of the
+values, and the values themselves. Hat matrices of evenly-spaced series only
+depend on the series length, so they are computed once and reused. Smoothed
+results are memoized as well, keyed by a hash of the input series.
+"""
+
+import collections
+import functools
+import hashlib
+import threading
+
+import numpy as np
+
+_LOESS_MEMO_MAX_ENTRIES = 1024
+
+_loess_memo: collections.OrderedDict[bytes, np.ndarray] = collections.OrderedDict()
+_loess_memo_lock = threading.Lock()
+
+
+def centered_moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Compute the centered moving average of a series.
+
+    This gives the same results as pandas' `Series.rolling(window, center=True)
+    .mean()`: positions whose window is not complete, or that include a missing
+    value, are returned as NaN.
+    """
+    return centered_moving_average_many(
+        np.asarray(values, dtype=float)[np.newaxis], window
+    )[0]
+
+
+def centered_moving_average_many(values: np.ndarray, window: int) -> np.ndarray:
+    """Compute the centered moving average of each row of a 2-D array."""
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2-D array, with one series per row")
+    result = np.full(values.shape, np.nan)
+    num_values = values.shape[1]
+    if num_values >= window:
+        sums, nan_counts = _get_window_sums(values, window)
+        centers = np.arange(num_values - window + 1) + window // 2
+        result[:, centers] = np.where(nan_counts == 0, sums / window, np.nan)
+    return result
+
+
+def grouped_centered_moving_average(
+    values: np.ndarray, groups: np.ndarray, window: int
+) -> np.ndarray:
+    """Compute the centered moving average of consecutive groups of values.
+
+    Values must be sorted by group. Positions whose window is not complete, would
+    span more than one group, or include a missing value are returned as NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums, nan_counts = _get_window_sums(values[np.newaxis], window)
+        first = np.arange(len(values) - window + 1)
+        last = first + window - 1
+        is_valid = (groups[first] == groups[last]) & (nan_counts[0] == 0)
+        result[(first + window // 2)[is_valid]] = sums[0][is_valid] / window
+    return result
+
+
+def _get_window_sums(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the sum and the number of missing values of each complete window.
+
+    Missing values count as zero in the sums.
+    """
+    is_missing = np.isnan(values)
+    padding = np.zeros((values.shape[0], 1))
+    cumulative = np.concatenate(
+        (padding, np.cumsum(np.where(is_missing, 0.0, values), axis=1)), axis=1
+    )
+    missing_cumulative = np.concatenate(
+        (padding, np.cumsum(is_missing, axis=1)), axis=1
+    )
+    return (
+        cumulative[:, window:] - cumulative[:, :-window],
+        missing_cumulative[:, window:] - missing_cumulative[:, :-window],
+    )
+
+
+def loess(
+    x: np.ndarray, y: np.ndarray, span: float = 0.75, degree: int = 2
+) -> np.ndarray:
+    """Smooth a series with LOESS, evaluating the fit at each of its positions.
+
+    This follows the same algorithm as `pyloess.loess()`, with the local
+    polynomial regressions being centered on each position for better numerical
+    stability. Positions must be sorted in ascending order.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    key = hashlib.blake2b(
+        b"".join((x.tobytes(), y.tobytes(), repr((span, degree)).encode())),
+        digest_size=16,
+    ).digest()
+    with _loess_memo_lock:
+        if (memoized := _loess_memo.get(key)) is not None:
+            _loess_memo.move_to_end(key)
+            return memoized.copy()
+    steps = np.diff(x)
+    if len(x) > 1 and np.all(steps == steps[0]):
+        hat_matrix = _get_evenly_spaced_loess_hat_matrix(len(x), span, degree)
+    else:
+        hat_matrix = _get_loess_hat_matrix(x, span, degree)
+    result = hat_matrix @ y
+    with _loess_memo_lock:
+        _loess_memo[key] = result.copy()
+        while len(_loess_memo) > _LOESS_MEMO_MAX_ENTRIES:
+            _loess_memo.popitem(last=False)
+    return result
+
+
+def clear_loess_memo() -> None:
+    with _loess_memo_lock:
+        _loess_memo.clear()
+    _get_evenly_spaced_loess_hat_matrix.cache_clear()
+
+
+@functools.lru_cache(maxsize=128)
+def _get_evenly_spaced_loess_hat_matrix(
+    num_values: int, span: float, degree: int
+) -> np.ndarray:
+    """Get the LOESS hat matrix of any evenly-spaced series of the input length.
+
+    Local polynomial regressions do not change when positions are shifted or
+    scaled, which means consecutive integers can stand for any evenly-spaced
+    positions.
+    """
+    result = _get_loess_hat_matrix(np.arange(num_values), span, degree)
+    result.setflags(write=False)
+    return result
+
+
+def _get_loess_hat_matrix(x: np.ndarray, span: float, degree: int) -> np.ndarray:
+    num_values = len(x)
+    distances = np.abs(x[:, np.newaxis] - x)
+    neighbours = np.argsort(distances, axis=1)[:, : int(np.ceil(span * num_values))]
+    rows = np.arange(num_values)[:, np.newaxis]
+    neighbour_distances = distances[rows, neighbours]
+    # tricube weights
+    normed_distances = neighbour_distances / np.max(
+        neighbour_distances, axis=1, keepdims=True
+    )
+    weights = np.clip((1 - normed_distances**3) ** 3, 0, 1)
+    offsets = (x[neighbours] - x[:, np.newaxis]).astype(float)
+    basis = np.stack([offsets**power for power in range(degree + 1)], axis=-1)
+    weighted_basis = basis.transpose(0, 2, 1) * weights[:, np.newaxis, :]
+    # the polynomials are centered on each position, so the fitted value is the
+    # constant coefficient
+    coefficients = np.linalg.solve(weighted_basis @ basis, weighted_basis)
+    result = np.zeros((num_values, num_values))
+    result[rows, neighbours] = coefficients[:, 0, :]
+    return result
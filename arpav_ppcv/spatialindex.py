@@ -0,0 +1,122 @@
+"""In-memory spatial index of municipalities, for locating points.
+
+The index holds the municipalities' geometries in a shapely `STRtree`, which
+finds candidates by bounding box, and tests the candidates against prepared
+geometries. It is built on first use and kept in a cache of the data generation
+tracker, which rebuilds it after municipalities are modified.
+"""
+
+import dataclasses
+import logging
+import threading
+import uuid
+from typing import (
+    Optional,
+    Sequence,
+)
+
+import numpy as np
+import shapely
+import sqlmodel
+
+from . import datagenerations
+from .schemas import (
+    datagenerations as datagenerations_schemas,
+    municipalities,
+)
+
+logger = logging.getLogger(__name__)
+
+_CACHE_NAME = "municipality-index"
+_CACHE_KEY = "index"
+_build_lock = threading.Lock()
+
+
+@dataclasses.dataclass(frozen=True)
+class MunicipalityLocation:
+    id: uuid.UUID
+    name: str
+    province_name: str
+    region_name: str
+
+
+class MunicipalityIndex:
+    """Locate points in municipalities, without querying the database."""
+
+    def __init__(
+        self,
+        locations: Sequence[MunicipalityLocation],
+        geometries: Sequence[shapely.Geometry],
+    ):
+        self._locations = list(locations)
+        self._geometries = np.asarray(geometries, dtype=object)
+        shapely.prepare(self._geometries)
+        self._tree = shapely.STRtree(self._geometries)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    @classmethod
+    def from_db(cls, session: sqlmodel.Session) -> "MunicipalityIndex":
+        model = municipalities.Municipality
+        rows = session.exec(
+            sqlmodel.select(
+                model.id,
+                model.name,
+                model.province_name,
+                model.region_name,
+                model.geom,
+            ).order_by(model.name)
+        ).all()
+        return cls(
+            [MunicipalityLocation(*row[:4]) for row in rows],
+            shapely.from_wkb([bytes(row[4].data) for row in rows]),
+        )
+
+    def locate(
+        self, points: Sequence[shapely.Point]
+    ) -> list[Optional[MunicipalityLocation]]:
+        """Return the municipality of each point, or `None` if it is outside all.
+
+        Points on the border of several municipalities are located in the first
+        one, by name.
+        """
+        points = np.asarray(points, dtype=object)
+        result: list[Optional[MunicipalityLocation]] = [None] * len(points)
+        if len(points) == 0 or len(self._locations) == 0:
+            return result
+        point_indexes, candidate_indexes = self._tree.query(points)
+        is_hit = shapely.intersects(
+            self._geometries[candidate_indexes], points[point_indexes]
+        )
+        point_indexes = point_indexes[is_hit]
+        candidate_indexes = candidate_indexes[is_hit]
+        # municipalities are ordered by name, so the first candidate is kept
+        for position in np.lexsort((candidate_indexes, point_indexes))[::-1]:
+            result[point_indexes[position]] = self._locations[
+                candidate_indexes[position]
+            ]
+        return result
+
+
+def get_municipality_index(
+    tracker: datagenerations.DataGenerationTracker,
+) -> MunicipalityIndex:
+    """Get the municipality index, building it if it is missing or stale."""
+    cache = tracker.get_cache(_CACHE_NAME, max_entries=1)
+    if (index := cache.get(_CACHE_KEY)) is None:
+        # the index is only built once, even if requested concurrently
+        with _build_lock:
+            index = cache.get_or_set(
+                _CACHE_KEY,
+                (datagenerations_schemas.MUNICIPALITIES_DOMAIN,),
+                lambda: _build_index(tracker),
+            )
+    return index
+
+
+def _build_index(tracker: datagenerations.DataGenerationTracker) -> MunicipalityIndex:
+    with sqlmodel.Session(tracker.engine) as session:
+        index = MunicipalityIndex.from_db(session)
+    logger.info(f"Built municipality index with {len(index)} municipalities")
+    return index
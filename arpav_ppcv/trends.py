@@ -0,0 +1,141 @@
+"""Vectorized Mann-Kendall trend test and Sen's slope.
+
+This reimplements `pymannkendall.original_test()` with NumPy array operations
+instead of Python loops, giving the same results. Many series can be tested at
+once by passing a 2-D array, with one series per row. Series with different
+lengths can be tested together by padding them with trailing NaN values, which
+are skipped just like any other missing value.
+
+The S statistic is the sum of the signs of each series' pairwise differences and
+Sen's slope is the median of all pairwise slopes, so both are computed from the
+same array of differences, in a single vectorized pass. This is O(n²) in the
+length of the series, in both time and memory, which is why many series are
+processed in chunks. An O(n log n) S statistic, by counting inversions with a
+merge sort, would not lower the overall cost, since Sen's slope still needs all
+pairwise slopes. The tie-corrected variance only needs the sorted values.
+"""
+
+import dataclasses
+import typing
+import warnings
+
+import numpy as np
+from scipy.stats import norm
+
+# maximum number of pairwise differences that are kept in memory at once when
+# testing many series
+_MAX_PAIRS_PER_CHUNK = 5_000_000
+
+
+@dataclasses.dataclass(frozen=True)
+class MannKendallResult:
+    trend: str
+    h: bool
+    p: float
+    z: float
+    tau: float
+    s: float
+    var_s: float
+    slope: float
+    intercept: float
+
+    def to_info(self) -> dict[str, str | bool | float]:
+        return dataclasses.asdict(self)
+
+
+def mann_kendall_test(
+    values: typing.Sequence[float] | np.ndarray, alpha: float = 0.05
+) -> MannKendallResult:
+    """Perform the original Mann-Kendall test on a single series."""
+    return mann_kendall_test_many(np.asarray(values, dtype=float)[np.newaxis], alpha)[0]
+
+
+def mann_kendall_test_many(
+    values: np.ndarray, alpha: float = 0.05
+) -> list[MannKendallResult]:
+    """Perform the original Mann-Kendall test on each row of a 2-D array."""
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2-D array, with one series per row")
+    num_series, num_values = values.shape
+    first, second = np.triu_indices(num_values, k=1)
+    chunk_size = max(1, _MAX_PAIRS_PER_CHUNK // max(1, len(first)))
+    s = np.empty(num_series)
+    slope = np.empty(num_series)
+    for chunk_start in range(0, num_series, chunk_size):
+        chunk = values[chunk_start : chunk_start + chunk_size]
+        differences = chunk[:, second] - chunk[:, first]
+        # differences involving missing values are NaN, which is the same as
+        # skipping the missing values
+        s[chunk_start : chunk_start + chunk_size] = np.nansum(
+            np.sign(differences), axis=1
+        )
+        slope[chunk_start : chunk_start + chunk_size] = _nanmedian(
+            differences / (second - first), axis=1
+        )
+    is_present = ~np.isnan(values)
+    n = is_present.sum(axis=1).astype(float)
+    var_s = (n * (n - 1) * (2 * n + 5) - _get_tie_correction(values)) / 18
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau = s / (0.5 * n * (n - 1))
+        z = np.where(
+            s > 0,
+            (s - 1) / np.sqrt(var_s),
+            np.where(s < 0, (s + 1) / np.sqrt(var_s), 0.0),
+        )
+    p = 2 * (1 - norm.cdf(np.abs(z)))
+    h = np.abs(z) > norm.ppf(1 - alpha / 2)
+    positions = np.where(is_present, np.arange(num_values, dtype=float), np.nan)
+    intercept = _nanmedian(values, axis=1) - _nanmedian(positions, axis=1) * slope
+    result = []
+    for index in range(num_series):
+        if z[index] < 0 and h[index]:
+            trend = "decreasing"
+        elif z[index] > 0 and h[index]:
+            trend = "increasing"
+        else:
+            trend = "no trend"
+        result.append(
+            MannKendallResult(
+                trend=trend,
+                h=bool(h[index]),
+                p=float(p[index]),
+                z=float(z[index]),
+                tau=float(tau[index]),
+                s=float(s[index]),
+                var_s=float(var_s[index]),
+                slope=float(slope[index]),
+                intercept=float(intercept[index]),
+            )
+        )
+    return result
+
+
+def _get_tie_correction(values: np.ndarray) -> np.ndarray:
+    """Compute the variance correction for tied values of each row.
+
+    This is the sum of `t * (t - 1) * (2 * t + 5)` over each group of `t` tied
+    values. Missing values are sorted last and are not counted.
+    """
+    num_series, num_values = values.shape
+    if num_values == 0:
+        return np.zeros(num_series)
+    sorted_values = np.sort(values, axis=1)
+    starts_group = np.ones(sorted_values.shape, dtype=bool)
+    starts_group[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+    group_ids = np.cumsum(starts_group, axis=1) - 1
+    flat_group_ids = (group_ids + np.arange(num_series)[:, np.newaxis] * num_values)[
+        ~np.isnan(sorted_values)
+    ]
+    group_sizes = np.bincount(flat_group_ids, minlength=num_series * num_values)
+    group_terms = group_sizes * (group_sizes - 1) * (2 * group_sizes + 5)
+    return group_terms.reshape(num_series, num_values).sum(axis=1).astype(float)
+
+
+def _nanmedian(values: np.ndarray, axis: int) -> np.ndarray:
+    """Compute the median along an axis, ignoring NaN and all-NaN slices."""
+    if values.shape[axis] == 0:
+        return np.full(values.shape[:axis] + values.shape[axis + 1 :], np.nan)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "All-NaN slice encountered", RuntimeWarning)
+        return np.nanmedian(values, axis=axis)
@@ -80,6 +80,9 @@ def create_admin(settings: config.ArpavPpcvSettings) -> ArpavPpcvAdmin:
                 observations_views.YearlyMeasurementView(
                     observations.YearlyMeasurement
                 ),
+                observations_views.StationVariableAvailabilityView(
+                    observations.StationVariableAvailability
+                ),
             ],
         )
     )
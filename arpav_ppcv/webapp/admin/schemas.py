@@ -120,3 +120,15 @@ class YearlyMeasurementRead(sqlmodel.SQLModel):
     variable: str
     year: int
     value: float
+
+
+class StationVariableAvailabilityRead(sqlmodel.SQLModel):
+    station_id: uuid.UUID
+    variable_id: uuid.UUID
+    station: str
+    variable: str
+    aggregation_type: ObservationAggregationType
+    period: str
+    first_year: int
+    last_year: int
+    value_count: int
@@ -32,6 +32,7 @@ from .. import (
     fields,
     schemas as read_schemas,
 )
+from .observations import delete_through_database
 
 
 logger = logging.getLogger(__name__)
@@ -129,6 +130,11 @@ class ConfigurationParameterView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-solid fa-quote-left"
 
+    async def delete(self, request: Request, pks: List[Any]) -> Optional[int]:
+        return await delete_through_database(
+            request, pks, database.delete_configuration_parameter
+        )
+
     async def get_pk_value(self, request: Request, obj: Any) -> Any:
         # note: we need to cast the value, which is a uuid.UUID, to a string
         # because starlette_admin just assumes that the value of a model's
@@ -356,6 +362,11 @@ class CoverageConfigurationView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-solid fa-map"
 
+    async def delete(self, request: Request, pks: List[Any]) -> Optional[int]:
+        return await delete_through_database(
+            request, pks, database.delete_coverage_configuration
+        )
+
     async def get_pk_value(self, request: Request, obj: Any) -> Any:
         # note: we need to cast the value, which is a uuid.UUID, to a string
         # because starlette_admin just assumes that the value of a model's
@@ -1,7 +1,9 @@
 import functools
 import logging
+import uuid
 from typing import (
     Any,
+    Callable,
     Optional,
     Sequence,
     Union,
@@ -27,6 +29,21 @@ from .. import schemas as read_schemas
 logger = logging.getLogger(__name__)
 
 
+async def delete_through_database(
+    request: Request, pks: list[Any], delete_function: Callable[..., None]
+) -> int:
+    """Delete items with the respective function of the `database` module.
+
+    Unlike the default `ModelView.delete()`, this ensures that data generations
+    are bumped and that derived data is refreshed.
+    """
+    for pk in pks:
+        await anyio.to_thread.run_sync(
+            delete_function, request.state.session, uuid.UUID(str(pk))
+        )
+    return len(pks)
+
+
 class MonthlyMeasurementView(ModelView):
     identity = "monthly measurements"
     name = "Monthly Measurements"
@@ -44,6 +61,11 @@ class MonthlyMeasurementView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-regular fa-calendar-days"
 
+    async def delete(self, request: Request, pks: list[Any]) -> Optional[int]:
+        return await delete_through_database(
+            request, pks, db.delete_monthly_measurement
+        )
+
     def can_create(self, request: Request) -> bool:
         return False
 
@@ -102,6 +124,11 @@ class SeasonalMeasurementView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-regular fa-calendar-days"
 
+    async def delete(self, request: Request, pks: list[Any]) -> Optional[int]:
+        return await delete_through_database(
+            request, pks, db.delete_seasonal_measurement
+        )
+
     def can_create(self, request: Request) -> bool:
         return False
 
@@ -159,6 +186,9 @@ class YearlyMeasurementView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-regular fa-calendar-days"
 
+    async def delete(self, request: Request, pks: list[Any]) -> Optional[int]:
+        return await delete_through_database(request, pks, db.delete_yearly_measurement)
+
     def can_create(self, request: Request) -> bool:
         return False
 
@@ -198,6 +228,69 @@ class YearlyMeasurementView(ModelView):
         return [self._serialize_instance(item) for item in db_measurements]
 
 
+class StationVariableAvailabilityView(ModelView):
+    identity = "station variable availability"
+    name = "Data Availability"
+    label = "Data Availability"
+
+    fields = (
+        starlette_admin.StringField("station", required=True),
+        starlette_admin.StringField("variable", required=True),
+        starlette_admin.EnumField(
+            "aggregation_type", enum=base.ObservationAggregationType, required=True
+        ),
+        starlette_admin.StringField("period", required=True),
+        starlette_admin.IntegerField("first_year", required=True),
+        starlette_admin.IntegerField("last_year", required=True),
+        starlette_admin.IntegerField("value_count", required=True),
+    )
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.icon = "fa-solid fa-table-list"
+
+    def can_create(self, request: Request) -> bool:
+        return False
+
+    def can_edit(self, request: Request) -> bool:
+        return False
+
+    def can_delete(self, request: Request) -> bool:
+        return False
+
+    def can_view_details(self, request: Request) -> bool:
+        return False
+
+    @staticmethod
+    def _serialize_instance(
+        instance: observations.StationVariableAvailability,
+    ) -> read_schemas.StationVariableAvailabilityRead:
+        return read_schemas.StationVariableAvailabilityRead(
+            **instance.model_dump(),
+            station=instance.station.code,
+            variable=instance.variable.name,
+        )
+
+    async def find_all(
+        self,
+        request: Request,
+        skip: int = 0,
+        limit: int = 100,
+        where: Union[dict[str, Any], str, None] = None,
+        order_by: Optional[list[str]] = None,
+    ) -> Sequence[read_schemas.StationVariableAvailabilityRead]:
+        list_availabilities = functools.partial(
+            db.list_station_variable_availabilities,
+            limit=limit,
+            offset=skip,
+            include_total=False,
+        )
+        db_availabilities, _ = await anyio.to_thread.run_sync(
+            list_availabilities, request.state.session
+        )
+        return [self._serialize_instance(item) for item in db_availabilities]
+
+
 class VariableView(ModelView):
     identity = "variables"
     name = "Variable"
@@ -231,6 +324,9 @@ class VariableView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-solid fa-cloud-sun-rain"
 
+    async def delete(self, request: Request, pks: list[Any]) -> Optional[int]:
+        return await delete_through_database(request, pks, db.delete_variable)
+
     @staticmethod
     def _serialize_instance(
         instance: observations.Variable,
@@ -332,6 +428,9 @@ class StationView(ModelView):
         super().__init__(*args, **kwargs)
         self.icon = "fa-solid fa-tower-observation"
 
+    async def delete(self, request: Request, pks: list[Any]) -> Optional[int]:
+        return await delete_through_database(request, pks, db.delete_station)
+
     @staticmethod
     def _serialize_instance(instance: observations.Station) -> read_schemas.StationRead:
         geom = shapely.io.from_wkb(bytes(instance.geom.data))
@@ -1,16 +1,26 @@
+import functools
+from typing import Optional
+
 import fastapi
 from fastapi.middleware.cors import CORSMiddleware
 
 from ... import config
+from ...datagenerations import ResponseCache
+from ...schemas import datagenerations
+from .. import dependencies
+from ..compression import CompressionMiddleware
+from ..responses import FastJsonResponse
 from .routers.coverages import router as coverages_router
 from .routers.municipalities import router as municipalities_router
 from .routers.observations import router as observations_router
+from .routers.tiles import router as tiles_router
 from .routers.base import router as base_router
 
 
 def create_app(settings: config.ArpavPpcvSettings) -> fastapi.FastAPI:
     app = fastapi.FastAPI(
         debug=settings.debug,
+        default_response_class=FastJsonResponse,
         title="ARPAV PPCV backend v2",
         description=(
             "### Developer API for ARPAV-PPCV backend v2\n"
@@ -23,6 +33,36 @@ def create_app(settings: config.ArpavPpcvSettings) -> fastapi.FastAPI:
             "email": settings.contact.email,
         },
     )
+    if settings.response_compression.enabled:
+        # added before the CORS middleware, so that it does not skip CORS headers
+        # when serving cached responses
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.response_compression.minimum_size,
+            gzip_level=settings.response_compression.gzip_level,
+            brotli_quality=settings.response_compression.brotli_quality,
+            cache_factory=functools.partial(
+                _get_compressed_response_cache, app, settings
+            ),
+            cached_paths={
+                "/coverages/configuration-parameters": (
+                    datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN,
+                ),
+                "/coverages/coverage-configurations": (
+                    datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN,
+                ),
+                "/observations/stations": (
+                    datagenerations.STATIONS_DOMAIN,
+                    datagenerations.VARIABLES_DOMAIN,
+                ),
+                "/municipalities/": (datagenerations.MUNICIPALITIES_DOMAIN,),
+            },
+            # stations filtered by variable also depend on the measurements of
+            # the variable
+            uncached_query_parameters={
+                "/observations/stations": ("variable_name",),
+            },
+        )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins,
@@ -58,4 +98,27 @@ def create_app(settings: config.ArpavPpcvSettings) -> fastapi.FastAPI:
             "municipalities",
         ],
     )
+    app.include_router(
+        tiles_router,
+        prefix="/tiles",
+        tags=[
+            "tiles",
+        ],
+    )
     return app
+
+
+def _get_compressed_response_cache(
+    app: fastapi.FastAPI, settings: config.ArpavPpcvSettings
+) -> Optional[ResponseCache]:
+    """Get the cache of the compression middleware.
+
+    Middleware are not able to use dependency injection, so the database engine
+    dependency, or its override, is resolved here.
+    """
+    get_db_engine = app.dependency_overrides.get(
+        dependencies.get_db_engine, dependencies.get_db_engine
+    )
+    return dependencies.get_compressed_response_cache(
+        settings, next(get_db_engine(settings))
+    )
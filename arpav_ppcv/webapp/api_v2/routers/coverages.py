@@ -24,6 +24,7 @@ from .... import (
     database as db,
     exceptions,
     operations,
+    processpool,
 )
 from ....config import ArpavPpcvSettings
 from ....thredds import utils as thredds_utils
@@ -32,11 +33,21 @@ from ....schemas.base import (
     ObservationDataSmoothingStrategy,
 )
 from ....schemas.coverages import CoverageInternal
-from ... import dependencies
+from ... import (
+    conditional,
+    dependencies,
+    tabular,
+)
 from ..schemas import coverages as coverage_schemas
+from ...responses import (
+    CompactTimeSeriesResponse,
+    FastJsonResponse,
+)
 from ..schemas.base import (
-    TimeSeries,
+    TimeSeriesFormat,
     TimeSeriesList,
+    TimestampFormat,
+    get_time_series_type,
 )
 
 
@@ -50,6 +61,10 @@ router = APIRouter()
 )
 async def list_configuration_parameters(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion,
+        Depends(dependencies.get_coverage_configurations_data_version),
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     list_params: Annotated[dependencies.CommonListFilterParameters, Depends()],
     name_contains: str | None = None,
@@ -65,13 +80,16 @@ async def list_configuration_parameters(
     _, unfiltered_total = db.list_configuration_parameters(
         db_session, limit=1, offset=0, include_total=True
     )
-    return coverage_schemas.ConfigurationParameterList.from_items(
-        config_params,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        coverage_schemas.ConfigurationParameterList.from_items(
+            config_params,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        ),
+        headers=data_version.get_headers(),
     )
 
 
@@ -81,6 +99,10 @@ async def list_configuration_parameters(
 )
 async def list_coverage_configurations(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion,
+        Depends(dependencies.get_coverage_configurations_data_version),
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     list_params: Annotated[dependencies.CommonListFilterParameters, Depends()],
     possible_value: Annotated[
@@ -150,13 +172,16 @@ async def list_coverage_configurations(
     _, unfiltered_total = db.list_coverage_configurations(
         db_session, limit=1, offset=0, include_total=True
     )
-    return coverage_schemas.CoverageConfigurationList.from_items(
-        coverage_configurations,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        coverage_schemas.CoverageConfigurationList.from_items(
+            coverage_configurations,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        ),
+        headers=data_version.get_headers(),
     )
 
 
@@ -166,6 +191,10 @@ async def list_coverage_configurations(
 )
 def get_coverage_configuration(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion,
+        Depends(dependencies.get_coverage_configurations_data_version),
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     coverage_configuration_id: pydantic.UUID4,
 ):
@@ -175,8 +204,11 @@ def get_coverage_configuration(
     allowed_coverage_identifiers = db.generate_coverage_identifiers(
         coverage_configuration=db_coverage_configuration
     )
-    return coverage_schemas.CoverageConfigurationReadDetail.from_db_instance(
-        db_coverage_configuration, allowed_coverage_identifiers, request
+    return FastJsonResponse(
+        coverage_schemas.CoverageConfigurationReadDetail.from_db_instance(
+            db_coverage_configuration, allowed_coverage_identifiers, request
+        ),
+        headers=data_version.get_headers(),
     )
 
 
@@ -189,6 +221,10 @@ def get_coverage_configuration(
 )
 def list_coverage_identifiers(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion,
+        Depends(dependencies.get_coverage_configurations_data_version),
+    ],
     settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     list_params: Annotated[dependencies.CommonListFilterParameters, Depends()],
@@ -227,14 +263,17 @@ def list_coverage_identifiers(
         db_session, limit=1, offset=0, include_total=True
     )
 
-    return coverage_schemas.CoverageIdentifierList.from_items(
-        cov_internals,
-        request,
-        settings=settings,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        coverage_schemas.CoverageIdentifierList.from_items(
+            cov_internals,
+            request,
+            settings=settings,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        ),
+        headers=data_version.get_headers(),
     )
 
 
@@ -395,13 +434,25 @@ def _modify_capabilities_response(
 def get_climate_barometer_time_series(
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
+    process_pool: Annotated[
+        Optional[processpool.ProcessPool], Depends(dependencies.get_process_pool)
+    ],
+    series_format: Annotated[
+        TimeSeriesFormat, Depends(dependencies.get_time_series_format)
+    ],
     coverage_identifier: str,
     data_smoothing: Annotated[list[CoverageDataSmoothingStrategy], Query()] = [  # noqa
         ObservationDataSmoothingStrategy.NO_SMOOTHING
     ],
     include_uncertainty: bool = False,
+    timestamps: TimestampFormat = TimestampFormat.ISO,
 ):
-    """Get climate barometer time series."""
+    """Get climate barometer time series.
+
+    Use `format=compact` to get each series as parallel arrays of timestamps and
+    values, or `format=csv`, `format=arrow` and `format=parquet` to download all
+    series as a single table, as for the `get_time_series` endpoint.
+    """
     if (
         db_cov_conf := db.get_coverage_configuration_by_coverage_identifier(
             db_session, coverage_identifier
@@ -421,6 +472,7 @@ def get_climate_barometer_time_series(
                     coverage,
                     smoothing_strategies=data_smoothing,
                     include_uncertainty=include_uncertainty,
+                    process_pool=process_pool,
                 )
             except exceptions.CoverageDataRetrievalError as err:
                 raise HTTPException(
@@ -428,15 +480,35 @@ def get_climate_barometer_time_series(
                     detail="Could not retrieve data",
                 ) from err
             else:
+                if series_format.is_tabular:
+                    columns = {}
+                    for coverage_info, pd_series in time_series.items():
+                        cov, smoothing_strategy = coverage_info
+                        columns[
+                            tabular.get_coverage_column_name(cov, smoothing_strategy)
+                        ] = pd_series
+                    return tabular.get_time_series_table_response(
+                        tabular.build_time_series_table(columns, timestamps),
+                        series_format,
+                        filename=coverage_identifier,
+                    )
+                series_type, series_list_type = get_time_series_type(
+                    series_format, timestamps
+                )
                 series = []
                 for coverage_info, pd_series in time_series.items():
                     cov, smoothing_strategy = coverage_info
                     series.append(
-                        TimeSeries.from_coverage_series(
+                        series_type.from_coverage_series(
                             pd_series, cov, smoothing_strategy
                         )
                     )
-                return TimeSeriesList(series=series)
+                result = series_list_type(series=series)
+                if series_format == TimeSeriesFormat.COMPACT_JSON:
+                    result = CompactTimeSeriesResponse(result)
+                else:
+                    result = FastJsonResponse(result)
+                return result
         else:
             raise HTTPException(status_code=400, detail="Invalid coverage_identifier")
     else:
@@ -448,6 +520,12 @@ def get_time_series(
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
     http_client: Annotated[httpx.AsyncClient, Depends(dependencies.get_http_client)],
+    process_pool: Annotated[
+        Optional[processpool.ProcessPool], Depends(dependencies.get_process_pool)
+    ],
+    series_format: Annotated[
+        TimeSeriesFormat, Depends(dependencies.get_time_series_format)
+    ],
     coverage_identifier: str,
     coords: str,
     datetime: Optional[str] = "../..",
@@ -469,12 +547,23 @@ def get_time_series(
     ] = [ObservationDataSmoothingStrategy.NO_SMOOTHING],  # noqa
     include_coverage_uncertainty: bool = False,
     include_coverage_related_data: bool = False,
+    timestamps: TimestampFormat = TimestampFormat.ISO,
 ):
     """### Get forecast-related time series for a geographic location.
 
     Given that a `coverage_identifier` represents a dataset generated by running a
     forecast model, this endpoint will return a representation of the various temporal
     series of data related to this forecast.
+
+    Use `format=compact`, or an `accept` header of
+    `application/vnd.arpav-ppcv.time-series-compact+json`, to get each series as
+    parallel arrays of timestamps and values. The `timestamps` parameter selects
+    between ISO 8601 strings and seconds since the Unix epoch.
+
+    Use `format=csv`, `format=arrow` (Arrow IPC stream) or `format=parquet`, or the
+    corresponding `accept` header, to download all series as a single table, with
+    a `time` column and one column per series and processing method. Arrow and
+    Parquet are only available when the server has the `arrow` extra installed.
     """
     if (
         db_cov_conf := db.get_coverage_configuration_by_coverage_identifier(
@@ -521,6 +610,7 @@ def get_time_series(
                     include_observation_data,
                     include_coverage_uncertainty,
                     include_coverage_related_data,
+                    process_pool=process_pool,
                 )
             except exceptions.CoverageDataRetrievalError as err:
                 raise HTTPException(
@@ -528,11 +618,35 @@ def get_time_series(
                     detail="Could not retrieve data",
                 ) from err
             else:
+                if series_format.is_tabular:
+                    columns = {}
+                    for coverage_info, pd_series in coverage_series.items():
+                        cov, smoothing_strategy = coverage_info
+                        columns[
+                            tabular.get_coverage_column_name(cov, smoothing_strategy)
+                        ] = pd_series
+                    for observation_info, pd_series in (
+                        observations_series or {}
+                    ).items():
+                        variable, smoothing_strategy = observation_info
+                        columns[
+                            tabular.get_observation_column_name(
+                                variable, smoothing_strategy
+                            )
+                        ] = pd_series
+                    return tabular.get_time_series_table_response(
+                        tabular.build_time_series_table(columns, timestamps),
+                        series_format,
+                        filename=coverage_identifier,
+                    )
+                series_type, series_list_type = get_time_series_type(
+                    series_format, timestamps
+                )
                 series = []
                 for coverage_info, pd_series in coverage_series.items():
                     cov, smoothing_strategy = coverage_info
                     series.append(
-                        TimeSeries.from_coverage_series(
+                        series_type.from_coverage_series(
                             pd_series, cov, smoothing_strategy
                         )
                     )
@@ -540,11 +654,16 @@ def get_time_series(
                     for observation_info, pd_series in observations_series.items():
                         variable, smoothing_strategy = observation_info
                         series.append(
-                            TimeSeries.from_observation_series(
+                            series_type.from_observation_series(
                                 pd_series, variable, smoothing_strategy
                             )
                         )
-                return TimeSeriesList(series=series)
+                result = series_list_type(series=series)
+                if series_format == TimeSeriesFormat.COMPACT_JSON:
+                    result = CompactTimeSeriesResponse(result)
+                else:
+                    result = FastJsonResponse(result)
+                return result
         else:
             raise HTTPException(status_code=400, detail="Invalid coverage_identifier")
     else:
@@ -1,23 +1,41 @@
 import logging
-from typing import Annotated
+from typing import (
+    Annotated,
+    Optional,
+)
 
 import shapely.io
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     Request,
 )
 from sqlmodel import Session
 
-from .... import database as db
+from .... import (
+    database as db,
+    datagenerations,
+    spatialindex,
+)
+from ....schemas.municipalities import (
+    MunicipalityGeometrySimplification,
+    MunicipalityGeometryType,
+)
 from ... import dependencies
-from ...responses import GeoJsonResponse
+from ...responses import (
+    FastJsonResponse,
+    GeoJsonResponse,
+)
+from ..schemas import municipalities as municipalities_schemas
 from ..schemas.geojson import municipalities as municipalities_geojson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+_MAX_LOCATE_POINTS = 1000
+
 
 @router.get(
     "/",
@@ -27,24 +45,44 @@ router = APIRouter()
 def list_municipalities(
     request: Request,
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
+    tracker: Annotated[
+        datagenerations.DataGenerationTracker,
+        Depends(dependencies.get_data_generation_tracker),
+    ],
     list_params: Annotated[dependencies.CommonListFilterParameters, Depends()],
     coords: str | None = None,
     name: str | None = None,
     province: str | None = None,
     region: str | None = None,
+    geometry: MunicipalityGeometryType = MunicipalityGeometryType.FULL,
+    simplify: Optional[MunicipalityGeometrySimplification] = None,
+    zoom: Annotated[Optional[int], Query(ge=0, le=24)] = None,
 ):
-    """List Italian municipalities."""
+    """List Italian municipalities.
+
+    Full geometries can be simplified, either by specifying the `simplify` level
+    explicitly or by specifying the map `zoom` level they are to be displayed
+    at. Use `geometry=centroid` or `geometry=bbox` to get each municipality's
+    centroid or bounding box instead, or `geometry=none` to not get any
+    geometry, which is useful when searching municipalities by name.
+    """
     geom_filter_kwarg = {}
     if coords is not None:
         geom = shapely.io.from_wkt(coords)
         if geom.geom_type == "Point":
-            geom_filter_kwarg = {"point_filter": geom}
+            # the point is located with the in-memory index, which is faster than
+            # intersecting it with the municipalities in the database
+            located = spatialindex.get_municipality_index(tracker).locate([geom])
+            geom_filter_kwarg = {
+                "id_filter": [loc.id for loc in located if loc is not None]
+            }
         elif geom.geom_type == "Polygon":
             geom_filter_kwarg = {"polygon_intersection_filter": geom}
         else:
             raise HTTPException(
                 status_code=400, detail="geometry be either point or polygon"
             )
+    geometry_column = _get_geometry_column(geometry, simplify, zoom)
     municipalities, filtered_total = db.list_municipalities(
         db_session,
         limit=list_params.limit,
@@ -53,16 +91,108 @@ def list_municipalities(
         name_filter=name,
         province_name_filter=province,
         region_name_filter=region,
+        geometry_column=geometry_column,
         **geom_filter_kwarg,
     )
     _, unfiltered_total = db.list_stations(
         db_session, limit=1, offset=0, include_total=True
     )
-    return municipalities_geojson.MunicipalityFeatureCollection.from_items(
-        municipalities,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return GeoJsonResponse(
+        municipalities_geojson.MunicipalityFeatureCollection.from_items(
+            municipalities,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+            geometry_column=geometry_column,
+        )
     )
+
+
+@router.get(
+    "/autocomplete",
+    response_model=municipalities_schemas.MunicipalityAutocompleteList,
+)
+def autocomplete_municipalities(
+    db_session: Annotated[Session, Depends(dependencies.get_db_session)],
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    """Suggest municipalities whose name matches a partial name.
+
+    Matching is insensitive to case and accents and tolerates typos. Suggestions
+    are ranked, with names that start with the input first.
+    """
+    return FastJsonResponse(
+        municipalities_schemas.MunicipalityAutocompleteList(
+            items=[
+                municipalities_schemas.MunicipalityAutocompleteItem.from_db_instance(
+                    db_municipality
+                )
+                for db_municipality in db.search_municipalities(
+                    db_session, q, limit=limit
+                )
+            ]
+        )
+    )
+
+
+@router.get(
+    "/locate",
+    response_model=municipalities_schemas.PointMunicipalityList,
+)
+def locate_municipalities(
+    municipality_index: Annotated[
+        spatialindex.MunicipalityIndex, Depends(dependencies.get_municipality_index)
+    ],
+    coords: str,
+):
+    """Find the municipality of each point.
+
+    The `coords` parameter is a WKT point or multipoint, in EPSG:4326. The
+    result has an item for each point, in the same order, whose `municipality`
+    is `null` if the point is not inside any municipality.
+    """
+    try:
+        geom = shapely.io.from_wkt(coords)
+    except shapely.errors.GEOSException:
+        raise HTTPException(status_code=400, detail="Invalid WKT geometry")
+    if geom.geom_type == "Point":
+        points = [geom]
+    elif geom.geom_type == "MultiPoint":
+        points = list(geom.geoms)
+    else:
+        raise HTTPException(
+            status_code=400, detail="geometry must be either point or multipoint"
+        )
+    if len(points) > _MAX_LOCATE_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {_MAX_LOCATE_POINTS} points can be located at once",
+        )
+    return FastJsonResponse(
+        municipalities_schemas.PointMunicipalityList.from_locations(
+            points, municipality_index.locate(points)
+        )
+    )
+
+
+def _get_geometry_column(
+    geometry: MunicipalityGeometryType,
+    simplify: Optional[MunicipalityGeometrySimplification],
+    zoom: Optional[int],
+) -> Optional[str]:
+    if geometry == MunicipalityGeometryType.FULL:
+        if simplify is None:
+            simplify = (
+                MunicipalityGeometrySimplification.from_zoom(zoom)
+                if zoom is not None
+                else MunicipalityGeometrySimplification.NONE
+            )
+        result = simplify.column_name
+    elif geometry == MunicipalityGeometryType.NONE:
+        result = None
+    else:
+        result = geometry.value
+    return result
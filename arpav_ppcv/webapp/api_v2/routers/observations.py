@@ -17,24 +17,39 @@ from fastapi import (
     Request,
     Query,
 )
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import HTTPException
 from sqlmodel import Session
 
 from .... import (
     database as db,
+    datagenerations,
     operations,
+    processpool,
+)
+from ....config import ArpavPpcvSettings
+from ...responses import (
+    CompactTimeSeriesResponse,
+    FastJsonResponse,
+    GeoJsonResponse,
+)
+from ....schemas import (
+    base,
+    datagenerations as datagenerations_schemas,
+)
+from ... import (
+    conditional,
+    dependencies,
+    tabular,
 )
-from ...responses import GeoJsonResponse
-from ....schemas import base
-from ... import dependencies
 from ..schemas import observations
 from ..schemas.geojson import observations as observations_geojson
 from ..schemas.base import (
     TimeSeries,
+    TimeSeriesFormat,
     TimeSeriesItem,
     TimeSeriesList,
+    TimestampFormat,
+    get_time_series_type,
 )
 
 logger = logging.getLogger(__name__)
@@ -57,6 +72,9 @@ router = APIRouter()
 )
 def list_stations(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion, Depends(dependencies.get_stations_data_version)
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     list_params: Annotated[dependencies.CommonListFilterParameters, Depends()],
     variable_name: str | None = None,
@@ -88,26 +106,28 @@ def list_stations(
         db_session, limit=1, offset=0, include_total=True
     )
     if accept == "application/json":
-        result = JSONResponse(
-            content=jsonable_encoder(
-                observations.StationList.from_items(
-                    stations,
-                    request,
-                    limit=list_params.limit,
-                    offset=list_params.offset,
-                    filtered_total=filtered_total,
-                    unfiltered_total=unfiltered_total,
-                )
-            )
+        result = FastJsonResponse(
+            observations.StationList.from_items(
+                stations,
+                request,
+                limit=list_params.limit,
+                offset=list_params.offset,
+                filtered_total=filtered_total,
+                unfiltered_total=unfiltered_total,
+            ),
+            headers=data_version.get_headers(),
         )
     else:
-        result = observations_geojson.StationFeatureCollection.from_items(
-            stations,
-            request,
-            limit=list_params.limit,
-            offset=list_params.offset,
-            filtered_total=filtered_total,
-            unfiltered_total=unfiltered_total,
+        result = GeoJsonResponse(
+            observations_geojson.StationFeatureCollection.from_items(
+                stations,
+                request,
+                limit=list_params.limit,
+                offset=list_params.offset,
+                filtered_total=filtered_total,
+                unfiltered_total=unfiltered_total,
+            ),
+            headers=data_version.get_headers(),
         )
     return result
 
@@ -118,16 +138,25 @@ def list_stations(
 )
 def get_station(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion, Depends(dependencies.get_stations_data_version)
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     station_id: pydantic.UUID4,
 ):
     db_station = db.get_station(db_session, station_id)
-    return observations.StationReadListItem.from_db_instance(db_station, request)
+    return FastJsonResponse(
+        observations.StationReadListItem.from_db_instance(db_station, request),
+        headers=data_version.get_headers(),
+    )
 
 
 @router.get("/variables", response_model=observations.VariableList)
 def list_variables(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion, Depends(dependencies.get_variables_data_version)
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     list_params: Annotated[dependencies.CommonListFilterParameters, Depends()],
 ):
@@ -141,13 +170,16 @@ def list_variables(
     _, unfiltered_total = db.list_variables(
         db_session, limit=1, offset=0, include_total=True
     )
-    return observations.VariableList.from_items(
-        variables,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        observations.VariableList.from_items(
+            variables,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        ),
+        headers=data_version.get_headers(),
     )
 
 
@@ -157,11 +189,17 @@ def list_variables(
 )
 def get_variable(
     request: Request,
+    data_version: Annotated[
+        conditional.DataVersion, Depends(dependencies.get_variables_data_version)
+    ],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
     variable_id: pydantic.UUID4,
 ):
     db_variable = db.get_variable(db_session, variable_id)
-    return observations.VariableReadListItem.from_db_instance(db_variable, request)
+    return FastJsonResponse(
+        observations.VariableReadListItem.from_db_instance(db_variable, request),
+        headers=data_version.get_headers(),
+    )
 
 
 @router.get("/monthly-measurements", response_model=observations.MonthlyMeasurementList)
@@ -202,13 +240,15 @@ def list_monthly_measurements(
     _, unfiltered_total = db.list_monthly_measurements(
         db_session, limit=1, offset=0, include_total=True
     )
-    return observations.MonthlyMeasurementList.from_items(
-        monthly_measurements,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        observations.MonthlyMeasurementList.from_items(
+            monthly_measurements,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        )
     )
 
 
@@ -224,8 +264,10 @@ def get_monthly_measurement(
     db_monthly_measurement = db.get_monthly_measurement(
         db_session, monthly_measurement_id
     )
-    return observations.MonthlyMeasurementReadListItem.from_db_instance(
-        db_monthly_measurement, request
+    return FastJsonResponse(
+        observations.MonthlyMeasurementReadListItem.from_db_instance(
+            db_monthly_measurement, request
+        )
     )
 
 
@@ -269,13 +311,15 @@ def list_seasonal_measurements(
     _, unfiltered_total = db.list_seasonal_measurements(
         db_session, limit=1, offset=0, include_total=True
     )
-    return observations.SeasonalMeasurementList.from_items(
-        measurements,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        observations.SeasonalMeasurementList.from_items(
+            measurements,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        )
     )
 
 
@@ -289,8 +333,10 @@ def get_seasonal_measurement(
     seasonal_measurement_id: pydantic.UUID4,
 ):
     db_measurement = db.get_seasonal_measurement(db_session, seasonal_measurement_id)
-    return observations.SeasonalMeasurementReadListItem.from_db_instance(
-        db_measurement, request
+    return FastJsonResponse(
+        observations.SeasonalMeasurementReadListItem.from_db_instance(
+            db_measurement, request
+        )
     )
 
 
@@ -330,13 +376,15 @@ def list_yearly_measurements(
     _, unfiltered_total = db.list_yearly_measurements(
         db_session, limit=1, offset=0, include_total=True
     )
-    return observations.YearlyMeasurementList.from_items(
-        measurements,
-        request,
-        limit=list_params.limit,
-        offset=list_params.offset,
-        filtered_total=filtered_total,
-        unfiltered_total=unfiltered_total,
+    return FastJsonResponse(
+        observations.YearlyMeasurementList.from_items(
+            measurements,
+            request,
+            limit=list_params.limit,
+            offset=list_params.offset,
+            filtered_total=filtered_total,
+            unfiltered_total=unfiltered_total,
+        )
     )
 
 
@@ -350,8 +398,10 @@ def get_yearly_measurement(
     yearly_measurement_id: pydantic.UUID4,
 ):
     db_measurement = db.get_yearly_measurement(db_session, yearly_measurement_id)
-    return observations.YearlyMeasurementReadListItem.from_db_instance(
-        db_measurement, request
+    return FastJsonResponse(
+        observations.YearlyMeasurementReadListItem.from_db_instance(
+            db_measurement, request
+        )
     )
 
 
@@ -359,7 +409,23 @@ def get_yearly_measurement(
     "/time-series/{station_code}/{variable_name}/{month}", response_model=TimeSeriesList
 )
 def get_time_series(
+    request: Request,
+    settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
     db_session: Annotated[Session, Depends(dependencies.get_db_session)],
+    tracker: Annotated[
+        datagenerations.DataGenerationTracker,
+        Depends(dependencies.get_data_generation_tracker),
+    ],
+    cache: Annotated[
+        Optional[datagenerations.ResponseCache],
+        Depends(dependencies.get_observation_time_series_cache),
+    ],
+    process_pool: Annotated[
+        Optional[processpool.ProcessPool], Depends(dependencies.get_process_pool)
+    ],
+    series_format: Annotated[
+        TimeSeriesFormat, Depends(dependencies.get_time_series_format)
+    ],
     station_code: str,
     month: Annotated[int, Path(ge=1, le=12)],
     variable_name: str,
@@ -371,11 +437,28 @@ def get_time_series(
     include_mann_kendall_trend: bool = False,
     mann_kendall_start_year: Optional[int] = None,
     mann_kendall_end_year: Optional[int] = None,
+    timestamps: TimestampFormat = TimestampFormat.ISO,
 ):
+    """Get the time series of a station, variable and month.
+
+    Use `format=compact` to get each series as parallel arrays of timestamps and
+    values, or `format=csv`, `format=arrow` and `format=parquet` to download all
+    series as a single table, as for the coverages' `get_time_series` endpoint.
+    """
     if (db_station := db.get_station_by_code(db_session, station_code)) is not None:
         if (
             db_variable := db.get_variable_by_name(db_session, variable_name)
         ) is not None:
+            data_version = conditional.get_data_version(
+                request,
+                tracker,
+                (
+                    datagenerations_schemas.STATIONS_DOMAIN,
+                    datagenerations_schemas.VARIABLES_DOMAIN,
+                    datagenerations_schemas.get_measurements_domain(db_variable.id),
+                ),
+                settings.http_cache_max_age_seconds,
+            )
             if include_mann_kendall_trend:
                 try:
                     mann_kendall = base.MannKendallParameters(
@@ -387,39 +470,396 @@ def get_time_series(
                     raise HTTPException(status_code=400, detail=error_dict)
             else:
                 mann_kendall = None
-            try:
-                observation_series = operations.get_observation_time_series(
-                    session=db_session,
-                    variable=db_variable,
-                    station=db_station,
-                    month=month,
-                    temporal_range=datetime,
-                    smoothing_strategies=smoothing,
-                    include_decade_data=include_decade_data,
-                    mann_kendall_parameters=mann_kendall,
+
+            series_type, series_list_type = get_time_series_type(
+                series_format, timestamps
+            )
+
+            def generate_series():
+                try:
+                    observation_series = operations.get_observation_time_series(
+                        session=db_session,
+                        variable=db_variable,
+                        station=db_station,
+                        month=month,
+                        temporal_range=datetime,
+                        smoothing_strategies=smoothing,
+                        include_decade_data=include_decade_data,
+                        mann_kendall_parameters=mann_kendall,
+                        process_pool=process_pool,
+                    )
+                except ValueError as err:
+                    raise HTTPException(status_code=400, detail=str(err))
+                if series_format.is_tabular:
+                    columns = {}
+                    for obs_series_info, pd_series_stuff in (
+                        observation_series or {}
+                    ).items():
+                        smoothing_strategy, derived_series = obs_series_info
+                        pd_series, _ = pd_series_stuff
+                        columns[
+                            tabular.get_observation_column_name(
+                                db_variable, smoothing_strategy, derived_series
+                            )
+                        ] = pd_series
+                    return tabular.build_time_series_table(columns, timestamps)
+                series = []
+                for obs_series_info, pd_series_stuff in (
+                    observation_series or {}
+                ).items():
+                    smoothing_strategy, derived_series = obs_series_info
+                    pd_series, pd_series_info = pd_series_stuff
+                    processed_series = series_type.from_observation_series(
+                        series=pd_series,
+                        variable=db_variable,
+                        smoothing_strategy=smoothing_strategy,
+                        extra_info=pd_series_info,
+                        derived_series=derived_series,
+                    )
+                    series.append(processed_series)
+                return series_list_type(series=series)
+
+            if cache is not None:
+                result = cache.get_or_set(
+                    (
+                        db_station.id,
+                        db_variable.id,
+                        month,
+                        datetime,
+                        tuple(smoothing),
+                        include_decade_data,
+                        (
+                            mann_kendall.model_dump_json()
+                            if mann_kendall is not None
+                            else None
+                        ),
+                        series_format,
+                        timestamps,
+                    ),
+                    (
+                        datagenerations_schemas.STATIONS_DOMAIN,
+                        datagenerations_schemas.VARIABLES_DOMAIN,
+                        datagenerations_schemas.get_measurements_domain(db_variable.id),
+                    ),
+                    generate_series,
+                )
+            else:
+                result = generate_series()
+            if series_format.is_tabular:
+                result = tabular.get_time_series_table_response(
+                    result,
+                    series_format,
+                    filename=f"{db_station.code}-{db_variable.name}-{month}",
                 )
-            except ValueError as err:
-                raise HTTPException(status_code=400, detail=str(err))
+            elif series_format == TimeSeriesFormat.COMPACT_JSON:
+                result = CompactTimeSeriesResponse(result)
+            else:
+                result = FastJsonResponse(result)
+            return data_version.apply(result)
+        else:
+            raise HTTPException(status_code=400, detail="Invalid variable identifier")
+    else:
+        raise HTTPException(status_code=400, detail="Invalid station identifier")
+
+
+@router.get(
+    "/time-series/{station_code}/{variable_name}", response_model=TimeSeriesList
+)
+def get_time_series_collection(
+    request: Request,
+    settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
+    db_session: Annotated[Session, Depends(dependencies.get_db_session)],
+    tracker: Annotated[
+        datagenerations.DataGenerationTracker,
+        Depends(dependencies.get_data_generation_tracker),
+    ],
+    cache: Annotated[
+        Optional[datagenerations.ResponseCache],
+        Depends(dependencies.get_observation_time_series_cache),
+    ],
+    process_pool: Annotated[
+        Optional[processpool.ProcessPool], Depends(dependencies.get_process_pool)
+    ],
+    series_format: Annotated[
+        TimeSeriesFormat, Depends(dependencies.get_time_series_format)
+    ],
+    station_code: str,
+    variable_name: str,
+    datetime: Optional[str] = "../..",
+    smoothing: Annotated[list[base.ObservationDataSmoothingStrategy], Query()] = [  # noqa
+        base.ObservationDataSmoothingStrategy.NO_SMOOTHING
+    ],
+    include_seasonal: bool = False,
+    include_yearly: bool = False,
+    include_decade_data: bool = False,
+    include_mann_kendall_trend: bool = False,
+    mann_kendall_start_year: Optional[int] = None,
+    mann_kendall_end_year: Optional[int] = None,
+    timestamps: TimestampFormat = TimestampFormat.ISO,
+):
+    """Get the time series of all months of a station and variable.
+
+    Each series' `info` includes its `aggregation_type` and `period`, which is the
+    month number for monthly series, the season name for seasonal series and
+    `YEAR` for the yearly series. Use `format=compact` to get each series as
+    parallel arrays of timestamps and values, or `format=csv`, `format=arrow` and
+    `format=parquet` to download all series as a single table.
+    """
+    if (db_station := db.get_station_by_code(db_session, station_code)) is not None:
+        if (
+            db_variable := db.get_variable_by_name(db_session, variable_name)
+        ) is not None:
+            data_version = conditional.get_data_version(
+                request,
+                tracker,
+                (
+                    datagenerations_schemas.STATIONS_DOMAIN,
+                    datagenerations_schemas.VARIABLES_DOMAIN,
+                    datagenerations_schemas.get_measurements_domain(db_variable.id),
+                ),
+                settings.http_cache_max_age_seconds,
+            )
+            if include_mann_kendall_trend:
+                try:
+                    mann_kendall = base.MannKendallParameters(
+                        start_year=mann_kendall_start_year,
+                        end_year=mann_kendall_end_year,
+                    )
+                except pydantic.ValidationError as err:
+                    error_dict = json.loads(err.json())
+                    raise HTTPException(status_code=400, detail=error_dict)
             else:
+                mann_kendall = None
+            aggregation_types = [base.ObservationAggregationType.MONTHLY]
+            if include_seasonal:
+                aggregation_types.append(base.ObservationAggregationType.SEASONAL)
+            if include_yearly:
+                aggregation_types.append(base.ObservationAggregationType.YEARLY)
+
+            series_type, series_list_type = get_time_series_type(
+                series_format, timestamps
+            )
+
+            def generate_series():
+                try:
+                    observation_series = (
+                        operations.get_observation_time_series_collection(
+                            session=db_session,
+                            variable=db_variable,
+                            station=db_station,
+                            temporal_range=datetime,
+                            aggregation_types=aggregation_types,
+                            smoothing_strategies=smoothing,
+                            include_decade_data=include_decade_data,
+                            mann_kendall_parameters=mann_kendall,
+                            process_pool=process_pool,
+                        )
+                    )
+                except ValueError as err:
+                    raise HTTPException(status_code=400, detail=str(err))
+                if series_format.is_tabular:
+                    columns = {}
+                    for obs_series_info, pd_series_stuff in observation_series.items():
+                        _, period, smoothing_strategy, derived_series = obs_series_info
+                        pd_series, _ = pd_series_stuff
+                        columns[
+                            tabular.get_observation_column_name(
+                                db_variable, smoothing_strategy, derived_series, period
+                            )
+                        ] = pd_series
+                    return tabular.build_time_series_table(columns, timestamps)
                 series = []
                 for obs_series_info, pd_series_stuff in observation_series.items():
-                    smoothing_strategy, derived_series = obs_series_info
+                    (
+                        aggregation_type,
+                        period,
+                        smoothing_strategy,
+                        derived_series,
+                    ) = obs_series_info
                     pd_series, pd_series_info = pd_series_stuff
-                    processed_series = TimeSeries.from_observation_series(
+                    processed_series = series_type.from_observation_series(
                         series=pd_series,
                         variable=db_variable,
                         smoothing_strategy=smoothing_strategy,
-                        extra_info=pd_series_info,
+                        extra_info={
+                            "aggregation_type": aggregation_type.value,
+                            "period": period,
+                            **(pd_series_info or {}),
+                        },
                         derived_series=derived_series,
                     )
                     series.append(processed_series)
-                return TimeSeriesList(series=series)
+                return series_list_type(series=series)
+
+            if cache is not None:
+                result = cache.get_or_set(
+                    (
+                        "collection",
+                        db_station.id,
+                        db_variable.id,
+                        tuple(aggregation_types),
+                        datetime,
+                        tuple(smoothing),
+                        include_decade_data,
+                        (
+                            mann_kendall.model_dump_json()
+                            if mann_kendall is not None
+                            else None
+                        ),
+                        series_format,
+                        timestamps,
+                    ),
+                    (
+                        datagenerations_schemas.STATIONS_DOMAIN,
+                        datagenerations_schemas.VARIABLES_DOMAIN,
+                        datagenerations_schemas.get_measurements_domain(db_variable.id),
+                    ),
+                    generate_series,
+                )
+            else:
+                result = generate_series()
+            if series_format.is_tabular:
+                result = tabular.get_time_series_table_response(
+                    result,
+                    series_format,
+                    filename=f"{db_station.code}-{db_variable.name}",
+                )
+            elif series_format == TimeSeriesFormat.COMPACT_JSON:
+                result = CompactTimeSeriesResponse(result)
+            else:
+                result = FastJsonResponse(result)
+            return data_version.apply(result)
         else:
             raise HTTPException(status_code=400, detail="Invalid variable identifier")
     else:
         raise HTTPException(status_code=400, detail="Invalid station identifier")
 
 
+@router.get(
+    "/trends/{variable_name}",
+    response_class=GeoJsonResponse,
+    response_model=observations_geojson.StationTrendFeatureCollection,
+    responses={
+        200: {
+            "content": {"application/json": {}},
+            "description": (
+                "Return a GeoJSON feature collection or a custom JSON "
+                "representation of the stations' trends"
+            ),
+        }
+    },
+)
+def list_station_trends(
+    request: Request,
+    settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
+    db_session: Annotated[Session, Depends(dependencies.get_db_session)],
+    tracker: Annotated[
+        datagenerations.DataGenerationTracker,
+        Depends(dependencies.get_data_generation_tracker),
+    ],
+    cache: Annotated[
+        Optional[datagenerations.ResponseCache],
+        Depends(dependencies.get_observation_time_series_cache),
+    ],
+    variable_name: str,
+    period: str,
+    temporal_aggregation: Annotated[
+        base.ObservationAggregationType, Query()
+    ] = base.ObservationAggregationType.SEASONAL,
+    mann_kendall_start_year: Optional[int] = None,
+    mann_kendall_end_year: Optional[int] = None,
+    accept: Annotated[str | None, Header()] = None,
+):
+    """Get the Mann-Kendall trend of each station, for a variable and period.
+
+    The `period` is the month number for monthly data, the season name for
+    seasonal data and `YEAR` for yearly data. Stations whose series do not span
+    enough years for computing a trend are not included.
+    """
+    if (db_variable := db.get_variable_by_name(db_session, variable_name)) is None:
+        raise HTTPException(status_code=400, detail="Invalid variable identifier")
+    data_version = conditional.get_data_version(
+        request,
+        tracker,
+        (
+            datagenerations_schemas.STATIONS_DOMAIN,
+            datagenerations_schemas.VARIABLES_DOMAIN,
+            datagenerations_schemas.get_measurements_domain(db_variable.id),
+        ),
+        settings.http_cache_max_age_seconds,
+    )
+    try:
+        mann_kendall = base.MannKendallParameters(
+            start_year=mann_kendall_start_year,
+            end_year=mann_kendall_end_year,
+        )
+    except pydantic.ValidationError as err:
+        error_dict = json.loads(err.json())
+        raise HTTPException(status_code=400, detail=error_dict)
+
+    def generate_trends():
+        try:
+            return operations.get_station_trends(
+                db_session,
+                variable=db_variable,
+                aggregation_type=temporal_aggregation,
+                period=period,
+                mann_kendall_parameters=mann_kendall,
+            )
+        except ValueError as err:
+            raise HTTPException(status_code=400, detail=str(err))
+
+    if cache is not None:
+        station_trends = cache.get_or_set(
+            (
+                "trends",
+                db_variable.id,
+                temporal_aggregation,
+                period,
+                mann_kendall.window,
+            ),
+            (
+                datagenerations_schemas.STATIONS_DOMAIN,
+                datagenerations_schemas.VARIABLES_DOMAIN,
+                datagenerations_schemas.get_measurements_domain(db_variable.id),
+            ),
+            generate_trends,
+        )
+    else:
+        station_trends = generate_trends()
+    summary = {
+        "variable_name": db_variable.name,
+        "aggregation_type": temporal_aggregation,
+        "period": period,
+        "window": mann_kendall.window,
+    }
+    if accept == "application/json":
+        result = FastJsonResponse(
+            observations.StationTrendList(
+                items=[
+                    observations.StationTrendReadListItem.from_db_instance(
+                        station_trend, request
+                    )
+                    for station_trend in station_trends
+                ],
+                **summary,
+            )
+        )
+    else:
+        result = GeoJsonResponse(
+            observations_geojson.StationTrendFeatureCollection(
+                features=[
+                    observations_geojson.StationTrendFeatureCollectionItem.from_db_instance(
+                        station_trend, request
+                    )
+                    for station_trend in station_trends
+                ],
+                **summary,
+            )
+        )
+    return data_version.apply(result)
+
+
 def _serialize_dataframe(
     df: pd.DataFrame,
     exclude_series_name_pattern: str | None = None,
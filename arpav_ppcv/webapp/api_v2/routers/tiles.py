@@ -0,0 +1,139 @@
+import logging
+from typing import (
+    Annotated,
+    Optional,
+)
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Request,
+    Response,
+)
+from sqlmodel import Session
+
+from .... import (
+    database as db,
+    datagenerations,
+)
+from ....config import ArpavPpcvSettings
+from ....schemas import (
+    base,
+    datagenerations as datagenerations_schemas,
+)
+from ....schemas.municipalities import MunicipalityGeometrySimplification
+from ... import (
+    conditional,
+    dependencies,
+    tilecache,
+)
+from ...responses import VECTOR_TILE_MEDIA_TYPE
+from ..schemas.base import VectorTileLayer
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get(
+    "/{layer}/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={
+        200: {
+            "content": {VECTOR_TILE_MEDIA_TYPE: {}},
+            "description": "Return a Mapbox Vector Tile",
+        }
+    },
+)
+def get_vector_tile(
+    request: Request,
+    settings: Annotated[ArpavPpcvSettings, Depends(dependencies.get_settings)],
+    db_session: Annotated[Session, Depends(dependencies.get_db_session)],
+    tracker: Annotated[
+        datagenerations.DataGenerationTracker,
+        Depends(dependencies.get_data_generation_tracker),
+    ],
+    tile_cache: Annotated[
+        Optional[tilecache.TileCache], Depends(dependencies.get_tile_cache)
+    ],
+    layer: VectorTileLayer,
+    z: Annotated[int, Path(ge=0, le=22)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    variable_name: str | None = None,
+    temporal_aggregation: base.ObservationAggregationType = (
+        base.ObservationAggregationType.SEASONAL
+    ),
+):
+    """Get a vector tile of a layer, in the web mercator tile grid.
+
+    The `stations` layer can be restricted to the stations that have data for
+    the `variable_name` and `temporal_aggregation`, in which case its features
+    also include the `first_year`, `last_year` and `value_count` of the available
+    data. The geometries of the `municipalities` layer are simplified according
+    to the zoom level.
+    """
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=400, detail="Invalid tile coordinates")
+    if layer == VectorTileLayer.STATIONS and variable_name is not None:
+        if (db_variable := db.get_variable_by_name(db_session, variable_name)) is None:
+            raise HTTPException(status_code=400, detail="Invalid variable name")
+        variant = f"{db_variable.name}-{temporal_aggregation.value}"
+    else:
+        db_variable = None
+        variant = "default"
+    if layer == VectorTileLayer.MUNICIPALITIES:
+        domains = (datagenerations_schemas.MUNICIPALITIES_DOMAIN,)
+    else:
+        domains = (
+            datagenerations_schemas.STATIONS_DOMAIN,
+            datagenerations_schemas.VARIABLES_DOMAIN,
+        )
+        if db_variable is not None:
+            # the availability of the variable's data changes with its measurements
+            domains += (
+                datagenerations_schemas.get_measurements_domain(db_variable.id),
+            )
+    data_version = conditional.get_data_version(
+        request, tracker, domains, settings.http_cache_max_age_seconds
+    )
+
+    def generate_tile() -> bytes:
+        if layer == VectorTileLayer.MUNICIPALITIES:
+            return db.get_municipality_vector_tile(
+                db_session,
+                z,
+                x,
+                y,
+                geometry_column=MunicipalityGeometrySimplification.from_zoom(
+                    z
+                ).column_name,
+                extent=settings.vector_tiles.extent,
+                buffer=settings.vector_tiles.buffer,
+            )
+        return db.get_station_vector_tile(
+            db_session,
+            z,
+            x,
+            y,
+            variable_id=db_variable.id if db_variable is not None else None,
+            aggregation_type=temporal_aggregation if db_variable is not None else None,
+            extent=settings.vector_tiles.extent,
+            buffer=settings.vector_tiles.buffer,
+        )
+
+    if tile_cache is not None:
+        # the version is read before generating the tile, so that a concurrent
+        # change results in the tile being stored with the previous version
+        version = tilecache.get_version(tracker.get_generations(domains))
+        if (tile := tile_cache.get(layer.value, version, z, x, y, variant)) is None:
+            tile = generate_tile()
+            tile_cache.set(layer.value, version, z, x, y, tile, variant)
+    else:
+        tile = generate_tile()
+    return Response(
+        content=tile,
+        media_type=VECTOR_TILE_MEDIA_TYPE,
+        headers=data_version.get_headers(),
+    )
@@ -1,8 +1,10 @@
 import datetime as dt
+import enum
 import logging
 import math
 import typing
 
+import numpy as np
 import pandas as pd
 import pydantic
 import sqlmodel
@@ -60,6 +62,28 @@ class ListLinks(pydantic.BaseModel):
     last: str | None = None
 
 
+class TimeSeriesFormat(enum.Enum):
+    JSON = "json"
+    COMPACT_JSON = "compact"
+    CSV = "csv"
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+    @property
+    def is_tabular(self) -> bool:
+        return self in (self.CSV, self.ARROW, self.PARQUET)
+
+
+class TimestampFormat(enum.Enum):
+    ISO = "iso"
+    EPOCH = "epoch"
+
+
+class VectorTileLayer(enum.Enum):
+    STATIONS = "stations"
+    MUNICIPALITIES = "municipalities"
+
+
 class TimeSeriesItem(pydantic.BaseModel):
     value: float
     datetime: dt.datetime
@@ -78,6 +102,16 @@ class TimeSeries(pydantic.BaseModel):
     info: typing.Optional[dict[str, str | int | float | bool | dict]] = None
     translations: typing.Optional[TimeSeriesTranslations] = None
 
+    @classmethod
+    def _get_series_data(cls, series: pd.Series) -> dict[str, typing.Any]:
+        return {
+            "values": [
+                TimeSeriesItem(datetime=timestamp, value=value)
+                for timestamp, value in series.to_dict().items()
+                if not math.isnan(value)
+            ]
+        }
+
     @classmethod
     def from_observation_series(
         cls,
@@ -113,11 +147,7 @@ class TimeSeries(pydantic.BaseModel):
             }
         return cls(
             name=name,
-            values=[
-                TimeSeriesItem(datetime=timestamp, value=value)
-                for timestamp, value in series.to_dict().items()
-                if not math.isnan(value)
-            ],
+            **cls._get_series_data(series),
             info={
                 "processing_method": smoothing_strategy.value,
                 "variable": variable.name,
@@ -258,13 +288,9 @@ class TimeSeries(pydantic.BaseModel):
                 ),
             }
         logger.info(f"serializing {coverage.identifier=} {smoothing_strategy=}...")
-        return TimeSeries(
+        return cls(
             name=str(series.name),
-            values=[
-                TimeSeriesItem(datetime=timestamp, value=value)
-                for timestamp, value in series.to_dict().items()
-                if not math.isnan(value)
-            ],
+            **cls._get_series_data(series),
             info={
                 "processing_method": smoothing_strategy.value,
                 "coverage_identifier": coverage.identifier,
@@ -366,6 +392,69 @@ class TimeSeriesList(pydantic.BaseModel):
     series: list[TimeSeries]
 
 
+class CompactTimeSeries(TimeSeries):
+    """A time series whose timestamps and values are stored as parallel arrays.
+
+    Arrays are built directly from the pandas series, without creating an
+    object for each point, and are meant to be encoded with orjson, which
+    serializes NumPy arrays natively. Timestamps use ISO 8601 strings.
+    """
+
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
+    times: list[str] | np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def _get_series_data(cls, series: pd.Series) -> dict[str, typing.Any]:
+        values = series.to_numpy(dtype=float)
+        is_present = ~np.isnan(values)
+        return {
+            "times": cls._get_times(pd.DatetimeIndex(series.index[is_present])),
+            "values": values[is_present],
+        }
+
+    @classmethod
+    def _get_times(cls, index: pd.DatetimeIndex) -> list[str] | np.ndarray:
+        if index.tz is not None:
+            result = np.datetime_as_string(
+                index.tz_convert("UTC").tz_localize(None).to_numpy(),
+                unit="s",
+                timezone="UTC",
+            )
+        else:
+            result = np.datetime_as_string(index.to_numpy(), unit="s")
+        return result.tolist()
+
+
+class EpochCompactTimeSeries(CompactTimeSeries):
+    """A compact time series whose timestamps are seconds since the Unix epoch."""
+
+    @classmethod
+    def _get_times(cls, index: pd.DatetimeIndex) -> list[str] | np.ndarray:
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return index.to_numpy().astype("datetime64[s]").astype(np.int64)
+
+
+class CompactTimeSeriesList(pydantic.BaseModel):
+    series: list[CompactTimeSeries]
+
+
+def get_time_series_type(
+    series_format: TimeSeriesFormat, timestamp_format: TimestampFormat
+) -> tuple[typing.Type[TimeSeries], typing.Type[pydantic.BaseModel]]:
+    """Return the types of the time series and time series list of a format."""
+    if series_format == TimeSeriesFormat.COMPACT_JSON:
+        if timestamp_format == TimestampFormat.EPOCH:
+            result = (EpochCompactTimeSeries, CompactTimeSeriesList)
+        else:
+            result = (CompactTimeSeries, CompactTimeSeriesList)
+    else:
+        result = (TimeSeries, TimeSeriesList)
+    return result
+
+
 class WebResourceList(base_schemas.ResourceList):
     meta: ListMeta
     links: ListLinks
@@ -1,3 +1,5 @@
+import typing
+
 import geojson_pydantic
 import pydantic
 from fastapi import Request
@@ -14,22 +16,28 @@ class MunicipalityFeatureCollectionItem(geojson_pydantic.Feature):
 
     type: str = "Feature"
     id: pydantic.UUID4
-    geometry: fields.WkbElement
+    geometry: typing.Optional[fields.WkbElement]
 
     @classmethod
     def from_db_instance(
         cls,
         instance: municipalities.Municipality,
         request: Request,
+        geometry_column: typing.Optional[str] = "geom",
     ) -> "MunicipalityFeatureCollectionItem":
         return cls(
             id=instance.id,
-            geometry=instance.geom,
+            geometry=(
+                getattr(instance, geometry_column)
+                if geometry_column is not None
+                else None
+            ),
             properties={
                 **instance.model_dump(
                     exclude={
                         "id",
-                        "geom",
+                        "search_name",
+                        *municipalities.GEOMETRY_COLUMN_NAMES,
                     }
                 ),
             },
@@ -39,3 +47,28 @@ class MunicipalityFeatureCollectionItem(geojson_pydantic.Feature):
 class MunicipalityFeatureCollection(ArpavFeatureCollection):
     path_operation_name = "list_municipalities"
     list_item_type = MunicipalityFeatureCollectionItem
+
+    @classmethod
+    def from_items(
+        cls,
+        items: typing.Sequence[municipalities.Municipality],
+        request: Request,
+        *,
+        limit: int,
+        offset: int,
+        filtered_total: int,
+        unfiltered_total: int,
+        geometry_column: typing.Optional[str] = "geom",
+    ) -> "MunicipalityFeatureCollection":
+        return cls(
+            features=[
+                cls.list_item_type.from_db_instance(i, request, geometry_column)
+                for i in items
+            ],
+            links=cls._get_list_links(
+                request, limit, offset, filtered_total, len(items)
+            ),
+            number_matched=filtered_total,
+            number_total=unfiltered_total,
+            number_returned=len(items),
+        )
@@ -6,6 +6,7 @@ from .....schemas import (
     observations,
     fields,
 )
+from .....schemas.base import ObservationAggregationType
 from ..observations import VariableReadEmbeddedInStationRead
 from .base import ArpavFeatureCollection
 
@@ -55,3 +56,41 @@ class StationFeatureCollectionItem(geojson_pydantic.Feature):
 class StationFeatureCollection(ArpavFeatureCollection):
     path_operation_name = "list_stations"
     list_item_type = StationFeatureCollectionItem
+
+
+class StationTrendFeatureCollectionItem(geojson_pydantic.Feature):
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
+    type: str = "Feature"
+    id: pydantic.UUID4
+    geometry: fields.WkbElement
+    links: list[str]
+
+    @classmethod
+    def from_db_instance(
+        cls,
+        instance: tuple[observations.Station, observations.MeasurementTrend],
+        request: Request,
+    ) -> "StationTrendFeatureCollectionItem":
+        station, trend = instance
+        url = request.url_for("get_station", **{"station_id": station.id})
+        return cls(
+            id=station.id,
+            geometry=station.geom,
+            properties={
+                "station_code": station.code,
+                "station_name": station.name,
+                "start_year": trend.start_year,
+                "end_year": trend.end_year,
+                **trend.get_info(),
+            },
+            links=[str(url)],
+        )
+
+
+class StationTrendFeatureCollection(geojson_pydantic.FeatureCollection):
+    type: str = "FeatureCollection"
+    variable_name: str
+    aggregation_type: ObservationAggregationType
+    period: str
+    window: str
@@ -0,0 +1,77 @@
+import dataclasses
+import typing
+import uuid
+
+import pydantic
+import shapely
+
+from .... import spatialindex
+from ....schemas import (
+    fields,
+    municipalities,
+)
+
+
+class MunicipalityAutocompleteItem(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
+    id: uuid.UUID
+    name: str
+    province_name: str
+    region_name: str
+    centroid: typing.Optional[fields.WkbElement]
+
+    @classmethod
+    def from_db_instance(
+        cls,
+        instance: municipalities.Municipality,
+    ) -> "MunicipalityAutocompleteItem":
+        return cls(
+            id=instance.id,
+            name=instance.name,
+            province_name=instance.province_name,
+            region_name=instance.region_name,
+            centroid=instance.centroid,
+        )
+
+
+class MunicipalityAutocompleteList(pydantic.BaseModel):
+    items: list[MunicipalityAutocompleteItem]
+
+
+class LocatedMunicipality(pydantic.BaseModel):
+    id: uuid.UUID
+    name: str
+    province_name: str
+    region_name: str
+
+
+class PointMunicipality(pydantic.BaseModel):
+    lon: float
+    lat: float
+    municipality: typing.Optional[LocatedMunicipality]
+
+
+class PointMunicipalityList(pydantic.BaseModel):
+    items: list[PointMunicipality]
+
+    @classmethod
+    def from_locations(
+        cls,
+        points: typing.Sequence[shapely.Point],
+        locations: typing.Sequence[typing.Optional[spatialindex.MunicipalityLocation]],
+    ) -> "PointMunicipalityList":
+        return cls(
+            items=[
+                PointMunicipality(
+                    lon=point.x,
+                    lat=point.y,
+                    municipality=(
+                        LocatedMunicipality(**dataclasses.asdict(location))
+                        if location is not None
+                        else None
+                    ),
+                )
+                for point, location in zip(points, locations)
+            ]
+        )
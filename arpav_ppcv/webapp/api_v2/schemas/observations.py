@@ -5,7 +5,10 @@ import pydantic
 from fastapi import Request
 
 from ....schemas import observations
-from ....schemas.base import Season
+from ....schemas.base import (
+    ObservationAggregationType,
+    Season,
+)
 from .base import WebResourceList
 
 logger = logging.getLogger(__name__)
@@ -165,6 +168,49 @@ class YearlyMeasurementReadListItem(pydantic.BaseModel):
         )
 
 
+class StationTrendReadListItem(pydantic.BaseModel):
+    station_id: uuid.UUID
+    station_code: str
+    station_name: str
+    station_url: pydantic.AnyHttpUrl
+    start_year: int
+    end_year: int
+    trend: str
+    h: bool
+    p: float
+    z: float
+    tau: float
+    s: float
+    var_s: float
+    slope: float
+    intercept: float
+
+    @classmethod
+    def from_db_instance(
+        cls,
+        instance: tuple[observations.Station, observations.MeasurementTrend],
+        request: Request,
+    ) -> "StationTrendReadListItem":
+        station, trend = instance
+        return cls(
+            station_id=station.id,
+            station_code=station.code,
+            station_name=station.name,
+            station_url=str(request.url_for("get_station", station_id=station.id)),
+            start_year=trend.start_year,
+            end_year=trend.end_year,
+            **trend.get_info(),
+        )
+
+
+class StationTrendList(pydantic.BaseModel):
+    variable_name: str
+    aggregation_type: ObservationAggregationType
+    period: str
+    window: str
+    items: list[StationTrendReadListItem]
+
+
 class StationList(WebResourceList):
     items: list[StationReadListItem]
     list_item_type = StationReadListItem
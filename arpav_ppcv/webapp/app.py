@@ -1,18 +1,33 @@
+import contextlib
+from typing import AsyncIterator
+
 import fastapi
 from starlette.applications import Starlette
 from starlette.staticfiles import StaticFiles
 from starlette.templating import Jinja2Templates
 
-from .. import config
+from .. import (
+    config,
+    processpool,
+)
 from .api_v2.app import create_app as create_v2_app
 from .admin.app import create_admin
 from .routes import routes
 
 
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    yield
+    # the lifespan of mounted apps is not run, so the pool used by the v2 API
+    # is shut down here
+    processpool.shutdown_pool()
+
+
 def create_app_from_settings(settings: config.ArpavPpcvSettings) -> fastapi.FastAPI:
     app = Starlette(
         debug=settings.debug,
         routes=routes,
+        lifespan=lifespan,
     )
     settings.static_dir.mkdir(parents=True, exist_ok=True)
     app.mount("/static", StaticFiles(directory=settings.static_dir), name="static")
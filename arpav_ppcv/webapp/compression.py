@@ -0,0 +1,328 @@
+"""Compression of HTTP responses.
+
+Responses are compressed with brotli, if the client accepts it and the optional
+`brotli` package is installed, and otherwise with gzip. Brotli is installed with
+the `compression` extra.
+
+Stable responses, whose paths are registered together with the data domains
+they depend on, have their compressed bodies cached. This means they are
+compressed once per data generation, rather than on each request.
+"""
+
+import logging
+import typing
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import (
+    Headers,
+    MutableHeaders,
+    QueryParams,
+)
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+from .. import datagenerations
+from . import responses
+
+logger = logging.getLogger(__name__)
+
+GZIP_ENCODING = "gzip"
+BROTLI_ENCODING = "br"
+
+
+def is_brotli_available() -> bool:
+    return brotli is not None
+
+
+def get_preferred_encoding(accept_encoding: str) -> typing.Optional[str]:
+    """Return the best supported encoding of an `accept-encoding` header."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        quality = 1.0
+        name, _, value = parameters.strip().partition("=")
+        if name == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0
+        accepted[coding.strip().lower()] = quality
+    supported = [GZIP_ENCODING]
+    if is_brotli_available():
+        supported.insert(0, BROTLI_ENCODING)
+    for encoding in supported:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith(("json", "xml"))
+        or media_type
+        in (responses.ARROW_STREAM_MEDIA_TYPE, responses.VECTOR_TILE_MEDIA_TYPE)
+    )
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == BROTLI_ENCODING:
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress = compressor.process
+            self.finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(
+                gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.compress = compressor.compress
+            self.finish = compressor.flush
+
+
+class CompressionMiddleware:
+    """Compress responses whose media type benefits from it.
+
+    `cached_paths` maps paths, relative to the app, to the data domains which
+    their responses depend on. Compressed responses to GET requests for these
+    paths are stored in the cache returned by `cache_factory`, keyed by the
+    request's query string, `accept` header, encoding and the parts of the request
+    which determine the base of absolute URLs, as responses may include links.
+
+    `uncached_query_parameters` maps cached paths to query parameters which make
+    responses depend on more than the declared domains. Requests including any of
+    them are not cached.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_factory: typing.Optional[
+            typing.Callable[[], typing.Optional[datagenerations.ResponseCache]]
+        ] = None,
+        cached_paths: typing.Optional[dict[str, typing.Sequence[str]]] = None,
+        uncached_query_parameters: typing.Optional[
+            dict[str, typing.Sequence[str]]
+        ] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_factory = cache_factory
+        self.cached_paths = dict(cached_paths or {})
+        self.uncached_query_parameters = dict(uncached_query_parameters or {})
+        self._cache: typing.Optional[datagenerations.ResponseCache] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = get_preferred_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        sender = _CompressingSender(
+            send,
+            encoding=encoding,
+            minimum_size=self.minimum_size,
+            gzip_level=self.gzip_level,
+            brotli_quality=self.brotli_quality,
+            if_none_match=headers.get("if-none-match", ""),
+        )
+        route_path = _get_route_path(scope)
+        domains = self.cached_paths.get(route_path)
+        if (
+            scope["method"] == "GET"
+            and domains is not None
+            and not _has_query_parameters(
+                scope, self.uncached_query_parameters.get(route_path, ())
+            )
+            # conditional requests are left to the app, which may answer them
+            # with a 'Not Modified' response
+            and not _is_conditional(headers)
+            and (cache := await self._get_cache()) is not None
+        ):
+            key = (
+                route_path,
+                scope["query_string"],
+                headers.get("accept"),
+                encoding,
+                _get_url_base(scope, headers),
+            )
+            if (cached := await run_in_threadpool(cache.get, key)) is not None:
+                status, raw_headers, body = cached
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": status,
+                        "headers": raw_headers,
+                    }
+                )
+                await send({"type": "http.response.body", "body": body})
+                return
+            # generations are read before computing the response, so that a
+            # concurrent change results in the new entry being considered stale
+            generations = await run_in_threadpool(
+                cache.tracker.get_generations, domains
+            )
+
+            def store(status: int, raw_headers: list, body: bytes) -> None:
+                cache.set(key, (status, raw_headers, body), domains, generations)
+
+            sender.on_complete = store
+        await self.app(scope, receive, sender)
+
+    async def _get_cache(self) -> typing.Optional[datagenerations.ResponseCache]:
+        if self._cache is None and self.cache_factory is not None:
+            try:
+                self._cache = await run_in_threadpool(self.cache_factory)
+            except Exception:
+                logger.exception("Could not create the compressed response cache")
+            # the factory is only called once, even if it fails
+            self.cache_factory = None
+        return self._cache
+
+
+class _CompressingSender:
+    def __init__(
+        self,
+        send: Send,
+        *,
+        encoding: str,
+        minimum_size: int,
+        gzip_level: int,
+        brotli_quality: int,
+        if_none_match: str = "",
+    ):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.if_none_match = if_none_match
+        self.on_complete: typing.Optional[
+            typing.Callable[[int, list, bytes], None]
+        ] = None
+        self._start_message: typing.Optional[Message] = None
+        self._compressor: typing.Optional[_Compressor] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if message["status"] == 304:
+                self._set_not_modified_etag(message)
+            # sending is delayed until the first part of the body is known
+            self._start_message = message
+        elif message["type"] != "http.response.body":
+            await self.send(message)
+        elif self._start_message is not None:
+            await self._send_first_body_part(message)
+        elif self._compressor is not None:
+            body = self._compressor.compress(message.get("body", b""))
+            if not (more_body := message.get("more_body", False)):
+                body += self._compressor.finish()
+            await self.send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+        else:
+            await self.send(message)
+
+    def _set_not_modified_etag(self, message: Message) -> None:
+        """Use the ETag of the compressed representation held by the client."""
+        headers = MutableHeaders(raw=message["headers"])
+        if (etag := headers.get("etag")) is not None and etag.endswith('"'):
+            compressed_etag = _get_compressed_etag(etag, self.encoding)
+            if compressed_etag in self.if_none_match:
+                headers["ETag"] = compressed_etag
+
+    async def _send_first_body_part(self, message: Message) -> None:
+        start_message = self._start_message
+        self._start_message = None
+        headers = MutableHeaders(raw=start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        should_compress = (
+            "content-encoding" not in headers
+            and is_compressible(headers.get("content-type", ""))
+            and (more_body or len(body) >= self.minimum_size)
+        )
+        if not should_compress:
+            await self.send(start_message)
+            await self.send(message)
+            return
+        self._compressor = _Compressor(
+            self.encoding, self.gzip_level, self.brotli_quality
+        )
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if (etag := headers.get("etag")) is not None and etag.endswith('"'):
+            # the compressed representation needs its own ETag
+            headers["ETag"] = _get_compressed_etag(etag, self.encoding)
+        body = self._compressor.compress(body)
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            body += self._compressor.finish()
+            headers["Content-Length"] = str(len(body))
+            if self.on_complete is not None and start_message["status"] == 200:
+                self.on_complete(start_message["status"], list(headers.raw), body)
+        await self.send(start_message)
+        await self.send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+
+
+def _get_compressed_etag(etag: str, encoding: str) -> str:
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _is_conditional(headers: Headers) -> bool:
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def _has_query_parameters(scope: Scope, names: typing.Sequence[str]) -> bool:
+    return len(names) > 0 and any(
+        name in names for name in QueryParams(scope["query_string"]).keys()
+    )
+
+
+def _get_url_base(scope: Scope, headers: Headers) -> tuple:
+    """Return the parts of the request which absolute URLs are built from.
+
+    Forwarded headers are included as well, since the app may run behind a proxy
+    that either rewrites the scheme and host or passes these headers through.
+    """
+    return (
+        scope.get("scheme"),
+        scope.get("root_path", ""),
+        headers.get("host"),
+        headers.get("forwarded"),
+        headers.get("x-forwarded-proto"),
+        headers.get("x-forwarded-host"),
+        headers.get("x-forwarded-prefix"),
+    )
+
+
+def _get_route_path(scope: Scope) -> str:
+    """Return the request's path, relative to the root path of the app."""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+    return path
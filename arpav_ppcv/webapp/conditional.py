@@ -0,0 +1,130 @@
+"""Conditional requests, based on the generation of the data domains.
+
+A response's ETag is computed from the request and the current generation of
+the data domains it depends on. This means it can be checked against the
+client's `if-none-match` header before doing any work for computing the
+response.
+"""
+
+import dataclasses
+import datetime as dt
+import email.utils
+import hashlib
+import typing
+
+from fastapi import (
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+
+from .. import datagenerations
+
+# suffixes that the compression middleware adds to the ETag of compressed
+# responses
+_ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+@dataclasses.dataclass(frozen=True)
+class DataVersion:
+    etag: str
+    last_modified: typing.Optional[dt.datetime]
+    max_age_seconds: int
+
+    def get_headers(self) -> dict[str, str]:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": (
+                f"public, max-age={self.max_age_seconds}, must-revalidate"
+            ),
+        }
+        if self.last_modified is not None:
+            headers["Last-Modified"] = email.utils.format_datetime(
+                self.last_modified.astimezone(dt.timezone.utc), usegmt=True
+            )
+        return headers
+
+    def apply(self, response: Response) -> Response:
+        """Add the caching headers to a response."""
+        response.headers.update(self.get_headers())
+        return response
+
+    def is_modified(self, request: Request) -> bool:
+        """Check the request's conditional headers against this version.
+
+        As per RFC 9110, `if-modified-since` is ignored when `if-none-match` is
+        present.
+        """
+        if (if_none_match := request.headers.get("if-none-match")) is not None:
+            result = not matches_etag(if_none_match, self.etag)
+        elif (
+            if_modified_since := request.headers.get("if-modified-since")
+        ) is not None and self.last_modified is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                result = True
+            else:
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=dt.timezone.utc)
+                result = self.last_modified.replace(microsecond=0) > since
+        else:
+            result = True
+        return result
+
+
+def compute_etag(request: Request, generations: dict[str, int]) -> str:
+    """Compute a strong ETag for the request's current representation."""
+    variant = "\n".join(
+        (
+            request.url.path,
+            str(sorted(request.query_params.multi_items())),
+            request.headers.get("accept", ""),
+            str(sorted(generations.items())),
+        )
+    )
+    return f'"{hashlib.blake2b(variant.encode(), digest_size=16).hexdigest()}"'
+
+
+def matches_etag(if_none_match: str, etag: str) -> bool:
+    """Check whether an `if-none-match` header matches an ETag.
+
+    The comparison is weak, as required for `if-none-match`, and ignores the
+    suffixes added to the ETags of compressed responses.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        for suffix in _ENCODING_SUFFIXES:
+            if candidate.endswith(f'{suffix}"'):
+                candidate = f'{candidate[: -len(suffix) - 1]}"'
+                break
+        if candidate == etag:
+            return True
+    return False
+
+
+def get_data_version(
+    request: Request,
+    tracker: datagenerations.DataGenerationTracker,
+    domains: typing.Iterable[str],
+    max_age_seconds: int = 0,
+) -> DataVersion:
+    """Get the version of the data behind a response.
+
+    Raises an HTTP 304 error, which is turned into a 'Not Modified' response,
+    if the client already has the current version.
+    """
+    domains = list(domains)
+    version = DataVersion(
+        etag=compute_etag(request, tracker.get_generations(domains)),
+        last_modified=tracker.get_last_modified(domains),
+        max_age_seconds=max_age_seconds,
+    )
+    if not version.is_modified(request):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=version.get_headers()
+        )
+    return version
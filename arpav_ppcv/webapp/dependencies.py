@@ -1,14 +1,36 @@
-from typing import Annotated
+from typing import (
+    Annotated,
+    Optional,
+)
 
 import httpx
 import pydantic
 import sqlmodel
-from fastapi import Depends
+from fastapi import (
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
 
 from .. import (
     config,
     database,
+    datagenerations,
+    processpool,
+    replay,
+    spatialindex,
+)
+from ..schemas import datagenerations as datagenerations_schemas
+from . import (
+    conditional,
+    responses,
+    tabular,
+    tilecache,
 )
+from .api_v2.schemas.base import TimeSeriesFormat
 
 
 def get_settings() -> config.ArpavPpcvSettings:
@@ -29,12 +51,164 @@ def get_db_session(engine=Depends(get_db_engine)):  # noqa: B008
         yield session
 
 
-def get_http_client() -> httpx.AsyncClient:
-    return httpx.AsyncClient()
+def get_data_generation_tracker(
+    engine=Depends(get_db_engine),  # noqa: B008
+) -> datagenerations.DataGenerationTracker:
+    return datagenerations.get_tracker(engine)
+
+
+def _get_data_version_dependency(*domains: str):
+    """Create a dependency that answers conditional requests for the input domains.
+
+    The dependency raises an HTTP 304 error, before any other work is done, if
+    the client already has the current version of the response.
+    """
+
+    def get_data_version(
+        request: Request,
+        settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+        tracker: datagenerations.DataGenerationTracker = Depends(  # noqa: B008
+            get_data_generation_tracker
+        ),
+    ) -> conditional.DataVersion:
+        return conditional.get_data_version(
+            request, tracker, domains, settings.http_cache_max_age_seconds
+        )
+
+    return get_data_version
+
+
+get_coverage_configurations_data_version = _get_data_version_dependency(
+    datagenerations_schemas.COVERAGE_CONFIGURATIONS_DOMAIN
+)
+get_variables_data_version = _get_data_version_dependency(
+    datagenerations_schemas.VARIABLES_DOMAIN
+)
+
+
+def get_stations_data_version(
+    request: Request,
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+    tracker: datagenerations.DataGenerationTracker = Depends(  # noqa: B008
+        get_data_generation_tracker
+    ),
+    db_session: sqlmodel.Session = Depends(get_db_session),  # noqa: B008
+    variable_name: Optional[str] = None,
+) -> conditional.DataVersion:
+    """Answer conditional requests for the list of stations.
+
+    Stations filtered by variable also depend on the measurements of the variable,
+    as these determine which stations have data.
+    """
+    domains = [
+        datagenerations_schemas.STATIONS_DOMAIN,
+        datagenerations_schemas.VARIABLES_DOMAIN,
+    ]
+    if variable_name is not None and (
+        db_variable := database.get_variable_by_name(db_session, variable_name)
+    ):
+        domains.append(datagenerations_schemas.get_measurements_domain(db_variable.id))
+    return conditional.get_data_version(
+        request, tracker, domains, settings.http_cache_max_age_seconds
+    )
+
+
+def get_observation_time_series_cache(
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+    engine=Depends(get_db_engine),  # noqa: B008
+) -> Optional[datagenerations.ResponseCache]:
+    if settings.response_cache.enabled:
+        # the tracker is only started when caching is enabled
+        tracker = datagenerations.get_tracker(engine)
+        return tracker.get_cache(
+            "observation-time-series",
+            max_entries=settings.response_cache.max_entries,
+            ttl_seconds=settings.response_cache.ttl_seconds,
+        )
+    return None
+
+
+def get_compressed_response_cache(
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+    engine=Depends(get_db_engine),  # noqa: B008
+) -> Optional[datagenerations.ResponseCache]:
+    if (
+        settings.response_cache.enabled
+        and settings.response_compression.cache_max_entries > 0
+    ):
+        tracker = datagenerations.get_tracker(engine)
+        return tracker.get_cache(
+            "compressed-responses",
+            max_entries=settings.response_compression.cache_max_entries,
+            ttl_seconds=settings.response_cache.ttl_seconds,
+        )
+    return None
+
+
+def get_municipality_index(
+    tracker: datagenerations.DataGenerationTracker = Depends(  # noqa: B008
+        get_data_generation_tracker
+    ),
+) -> spatialindex.MunicipalityIndex:
+    return spatialindex.get_municipality_index(tracker)
+
+
+def get_tile_cache(
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+) -> Optional[tilecache.TileCache]:
+    if settings.vector_tiles.cache_enabled:
+        return tilecache.TileCache(settings.vector_tiles.cache_dir)
+    return None
+
+
+def get_process_pool(
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+) -> Optional[processpool.ProcessPool]:
+    return processpool.get_pool(settings.process_pool)
+
+
+def get_time_series_format(
+    series_format: Annotated[Optional[TimeSeriesFormat], Query(alias="format")] = None,
+    accept: Annotated[str | None, Header()] = None,
+) -> TimeSeriesFormat:
+    """Get the requested time series format.
+
+    The format is taken from the `format` query parameter, if present, and
+    otherwise from the first media type of the `accept` header that matches
+    a supported format.
+    """
+    result = series_format
+    if result is None and accept is not None:
+        media_types = {
+            media_type: format_
+            for format_, media_type in responses.TIME_SERIES_MEDIA_TYPES.items()
+        }
+        for accepted in accept.split(","):
+            media_type = accepted.partition(";")[0].strip()
+            if (result := media_types.get(media_type)) is not None:
+                break
+    result = result or TimeSeriesFormat.JSON
+    if (
+        result in (TimeSeriesFormat.ARROW, TimeSeriesFormat.PARQUET)
+        and not tabular.is_arrow_available()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"The {result.value!r} format is not available on this server",
+        )
+    return result
+
+
+def get_http_client(
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=replay.build_transport(settings.http_replay))
 
 
-def get_sync_http_client() -> httpx.Client:
-    return httpx.Client()
+def get_sync_http_client(
+    settings: config.ArpavPpcvSettings = Depends(get_settings),  # noqa: B008
+) -> httpx.Client:
+    return httpx.Client(transport=replay.build_transport(settings.http_replay))
 
 
 class CommonListFilterParameters(pydantic.BaseModel):  # noqa: D101
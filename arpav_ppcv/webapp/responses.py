@@ -1,5 +1,76 @@
-from fastapi.responses import JSONResponse
+import datetime as dt
+import typing
 
+import numpy as np
+import orjson
+import pydantic
+import pydantic_core
+from fastapi.responses import ORJSONResponse
 
-class GeoJsonResponse(JSONResponse):
+from .api_v2.schemas.base import TimeSeriesFormat
+
+COMPACT_TIME_SERIES_MEDIA_TYPE = "application/vnd.arpav-ppcv.time-series-compact+json"
+CSV_MEDIA_TYPE = "text/csv"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+VECTOR_TILE_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+TIME_SERIES_MEDIA_TYPES = {
+    TimeSeriesFormat.JSON: "application/json",
+    TimeSeriesFormat.COMPACT_JSON: COMPACT_TIME_SERIES_MEDIA_TYPE,
+    TimeSeriesFormat.CSV: CSV_MEDIA_TYPE,
+    TimeSeriesFormat.ARROW: ARROW_STREAM_MEDIA_TYPE,
+    TimeSeriesFormat.PARQUET: PARQUET_MEDIA_TYPE,
+}
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+)
+
+
+class FastJsonResponse(ORJSONResponse):
+    """A JSON response that is rendered with orjson.
+
+    The content may be a pydantic model, which is converted with pydantic's JSON
+    mode without being validated again, thus giving the same output as FastAPI's
+    response models. Datetimes, UUIDs, enums and NumPy types are serialized
+    natively. Routes can return an instance of this class, built with the schema
+    object, in order to skip FastAPI's validation and serialization of the
+    response model.
+    """
+
+    def render(self, content: typing.Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class GeoJsonResponse(FastJsonResponse):
     media_type = "application/geo+json"
+
+
+class CompactTimeSeriesResponse(FastJsonResponse):
+    media_type = COMPACT_TIME_SERIES_MEDIA_TYPE
+
+
+def _default(obj: typing.Any) -> typing.Any:
+    """Convert the objects that orjson does not serialize natively."""
+    if isinstance(obj, pydantic.BaseModel):
+        result = obj.__pydantic_serializer__.to_python(
+            obj, mode="json", by_alias=True, fallback=_get_numpy_fallback
+        )
+    elif isinstance(obj, dt.datetime):
+        # subclasses, such as pandas timestamps
+        result = dt.datetime.combine(obj.date(), obj.timetz())
+    else:
+        raise TypeError
+    return result
+
+
+def _get_numpy_fallback(obj: typing.Any) -> typing.Any:
+    """Convert the NumPy values of pydantic models, which pydantic cannot."""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        result = obj.tolist()
+    else:
+        raise pydantic_core.PydanticSerializationError(
+            f"Unable to serialize unknown type: {type(obj)}"
+        )
+    return result
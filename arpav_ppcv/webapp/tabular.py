@@ -0,0 +1,155 @@
+"""Export of time series as tabular files.
+
+All the series of a response are joined in a single wide table, which is indexed
+by time and has one column per series and processing method. Tables are built
+directly from the pandas series computed by the `operations` module and are
+streamed to the client in chunks.
+
+Arrow IPC and Parquet output require `pyarrow`, which is an optional dependency
+that is installed with the `arrow` extra.
+"""
+
+import io
+import typing
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import StreamingResponse
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+from ..schemas import (
+    base as base_schemas,
+    coverages as coverages_schemas,
+    observations as observations_schemas,
+)
+from . import responses
+from .api_v2.schemas.base import (
+    TimeSeriesFormat,
+    TimestampFormat,
+)
+
+TIME_COLUMN_NAME = "time"
+
+# number of table rows that are serialized at once
+_CHUNK_SIZE = 10_000
+
+_CSV_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def is_arrow_available() -> bool:
+    return pyarrow is not None
+
+
+def get_coverage_column_name(
+    coverage: coverages_schemas.CoverageInternal,
+    smoothing_strategy: base_schemas.CoverageDataSmoothingStrategy,
+) -> str:
+    return ":".join((coverage.identifier, smoothing_strategy.value))
+
+
+def get_observation_column_name(
+    variable: observations_schemas.Variable,
+    smoothing_strategy: base_schemas.ObservationDataSmoothingStrategy,
+    derived_series: typing.Optional[base_schemas.ObservationDerivedSeries] = None,
+    period: typing.Optional[str] = None,
+) -> str:
+    parts = [variable.name]
+    if derived_series is not None:
+        parts.append(derived_series.value)
+    if period is not None:
+        parts.append(period)
+    parts.append(smoothing_strategy.value)
+    return ":".join(parts)
+
+
+def build_time_series_table(
+    columns: dict[str, pd.Series],
+    timestamp_format: TimestampFormat = TimestampFormat.ISO,
+) -> pd.DataFrame:
+    """Join the input series in a single table, indexed by their UTC timestamps.
+
+    Series are aligned on their timestamps, with missing values where a series
+    has no value for a timestamp. With the epoch timestamp format, the index
+    holds seconds since the Unix epoch.
+    """
+    aligned = {}
+    for name, series in columns.items():
+        index = pd.DatetimeIndex(series.index)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        else:
+            index = index.tz_convert("UTC")
+        aligned[name] = pd.Series(series.to_numpy(dtype=float), index=index)
+    if len(aligned) > 0:
+        result = pd.concat(aligned, axis=1).sort_index()
+    else:
+        result = pd.DataFrame(index=pd.DatetimeIndex([], tz="UTC"))
+    if timestamp_format == TimestampFormat.EPOCH:
+        result.index = (
+            result.index.tz_localize(None)
+            .to_numpy()
+            .astype("datetime64[s]")
+            .astype(np.int64)
+        )
+    result.index.name = TIME_COLUMN_NAME
+    return result
+
+
+def get_time_series_table_response(
+    table: pd.DataFrame, series_format: TimeSeriesFormat, filename: str
+) -> StreamingResponse:
+    """Stream a time series table in the requested tabular format."""
+    writer, extension = {
+        TimeSeriesFormat.CSV: (_stream_csv, "csv"),
+        TimeSeriesFormat.ARROW: (_stream_arrow, "arrow"),
+        TimeSeriesFormat.PARQUET: (_stream_parquet, "parquet"),
+    }[series_format]
+    return StreamingResponse(
+        writer(table),
+        media_type=responses.TIME_SERIES_MEDIA_TYPES[series_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"'
+        },
+    )
+
+
+def _stream_csv(table: pd.DataFrame) -> typing.Iterator[str]:
+    yield table.iloc[:0].to_csv(date_format=_CSV_DATE_FORMAT)
+    for start in range(0, len(table), _CHUNK_SIZE):
+        yield table.iloc[start : start + _CHUNK_SIZE].to_csv(
+            header=False, date_format=_CSV_DATE_FORMAT
+        )
+
+
+def _stream_arrow(table: pd.DataFrame) -> typing.Iterator[bytes]:
+    arrow_table = pyarrow.Table.from_pandas(table, preserve_index=True)
+    sink = io.BytesIO()
+    with pyarrow.ipc.new_stream(sink, arrow_table.schema) as writer:
+        for batch in arrow_table.to_batches(max_chunksize=_CHUNK_SIZE):
+            writer.write_batch(batch)
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _stream_parquet(table: pd.DataFrame) -> typing.Iterator[bytes]:
+    arrow_table = pyarrow.Table.from_pandas(table, preserve_index=True)
+    sink = io.BytesIO()
+    with pyarrow.parquet.ParquetWriter(sink, arrow_table.schema) as writer:
+        for batch in arrow_table.to_batches(max_chunksize=_CHUNK_SIZE):
+            writer.write_batch(batch)
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    """Return the bytes written to the sink so far and empty it."""
+    result = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return result
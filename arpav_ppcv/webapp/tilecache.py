@@ -0,0 +1,110 @@
+"""Disk cache of vector tiles.
+
+Tiles are stored under a directory for the version of the data they were
+generated from, which is derived from the generation of their data domains. When
+data changes, tiles are looked up in a new directory and the directories of
+previous versions are removed.
+
+Generations only increase, so versions are prefixed with the sum of generations,
+which orders the versions of tiles depending on the same domains. Only older
+versions are removed, as web workers may briefly lag behind each other in
+learning about changes, and a lagging worker must not remove the tiles that
+other workers have just stored. Versions of each variant are kept apart, since
+variants may depend on different domains.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import typing
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def get_version(generations: dict[str, int]) -> str:
+    """Return the version of tiles which depend on the input generations."""
+    digest = hashlib.blake2b(
+        str(sorted(generations.items())).encode(), digest_size=8
+    ).hexdigest()
+    return f"{sum(generations.values())}-{digest}"
+
+
+def _get_version_order(version: str) -> typing.Optional[int]:
+    order, _, _ = version.partition("-")
+    try:
+        return int(order)
+    except ValueError:
+        return None
+
+
+class TileCache:
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def get(
+        self,
+        layer: str,
+        version: str,
+        z: int,
+        x: int,
+        y: int,
+        variant: str = "default",
+    ) -> typing.Optional[bytes]:
+        try:
+            return self._get_path(layer, version, z, x, y, variant).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(
+        self,
+        layer: str,
+        version: str,
+        z: int,
+        x: int,
+        y: int,
+        content: bytes,
+        variant: str = "default",
+    ) -> None:
+        variant_directory = self._get_variant_directory(layer, variant)
+        if not (variant_directory / version).exists():
+            self._remove_older_versions(variant_directory, version)
+        path = self._get_path(layer, version, z, x, y, variant)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # the tile is written to a temporary file and then moved, so that
+            # other processes never read a partially written tile
+            handle, temporary_path = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(handle, "wb") as fh:
+                fh.write(content)
+            os.replace(temporary_path, path)
+        except OSError:
+            logger.exception(f"Could not store tile in {path}")
+
+    def _get_path(
+        self, layer: str, version: str, z: int, x: int, y: int, variant: str
+    ) -> Path:
+        return (
+            self._get_variant_directory(layer, variant)
+            / version
+            / str(z)
+            / str(x)
+            / f"{y}.mvt"
+        )
+
+    def _get_variant_directory(self, layer: str, variant: str) -> Path:
+        safe_variant = re.sub(r"[^\w.-]", "_", variant)
+        return self.directory / layer / safe_variant
+
+    def _remove_older_versions(self, variant_directory: Path, version: str) -> None:
+        order = _get_version_order(version)
+        if order is None or not variant_directory.is_dir():
+            return
+        for path in variant_directory.iterdir():
+            other_order = _get_version_order(path.name)
+            if path.name != version and (other_order is None or other_order < order):
+                logger.debug(f"Removing outdated tiles in {path}")
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,131 @@
+"""Compare FastAPI's default JSON rendering with `responses.FastJsonResponse`.
+
+Run with `python tests/benchmarks/bench_json_responses.py`.
+"""
+
+import argparse
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+import shapely
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from geoalchemy2.shape import from_shape
+
+from arpav_ppcv import config
+from arpav_ppcv.schemas import (
+    base,
+    municipalities,
+    observations,
+)
+from arpav_ppcv.webapp.api_v2.app import create_app
+from arpav_ppcv.webapp.api_v2.schemas.base import TimeSeries
+from arpav_ppcv.webapp.api_v2.schemas.geojson import (
+    municipalities as municipalities_geojson,
+    observations as observations_geojson,
+)
+from arpav_ppcv.webapp.responses import FastJsonResponse
+
+
+def _get_request() -> Request:
+    app = create_app(config.get_settings())
+    return Request(
+        {
+            "type": "http",
+            "app": app,
+            "router": app.router,
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "root_path": "",
+            "path": "/observations/stations",
+            "query_string": b"",
+            "headers": [],
+        }
+    )
+
+
+def _get_payloads(num_items: int, num_years: int) -> dict:
+    request = _get_request()
+    rng = np.random.default_rng(0)
+    stations = [
+        observations.Station(
+            code=f"station{i}",
+            geom=from_shape(shapely.Point(11 + rng.random(), 45 + rng.random())),
+            altitude_m=float(i),
+            name=f"station {i}",
+            type_="synthetic",
+        )
+        for i in range(num_items)
+    ]
+    municipality_items = [
+        municipalities.Municipality(
+            geom=from_shape(
+                shapely.MultiPolygon(
+                    [shapely.Point(11 + rng.random(), 45 + rng.random()).buffer(0.05)]
+                )
+            ),
+            name=f"municipality {i}",
+            province_name="province",
+            region_name="region",
+        )
+        for i in range(num_items)
+    ]
+    variable = observations.Variable(
+        name="TDd", display_name_english="temperature", display_name_italian="temp"
+    )
+    series = pd.Series(
+        rng.normal(size=num_years * 12),
+        index=pd.date_range("1950-01-01", periods=num_years * 12, freq="MS", tz="UTC"),
+    )
+    list_kwargs = {
+        "limit": num_items,
+        "offset": 0,
+        "filtered_total": num_items,
+        "unfiltered_total": num_items,
+    }
+    return {
+        "stations": observations_geojson.StationFeatureCollection.from_items(
+            stations, request, **list_kwargs
+        ),
+        "municipalities": (
+            municipalities_geojson.MunicipalityFeatureCollection.from_items(
+                municipality_items, request, **list_kwargs
+            )
+        ),
+        "time series": TimeSeries.from_observation_series(
+            series, variable, base.ObservationDataSmoothingStrategy.NO_SMOOTHING
+        ),
+    }
+
+
+def main(num_items: int, num_years: int, number: int, repeat: int):
+    payloads = _get_payloads(num_items, num_years)
+    for payload_name, payload in payloads.items():
+        reference = JSONResponse(jsonable_encoder(payload)).body
+        assert json.loads(FastJsonResponse(payload).body) == json.loads(reference)
+        timings = {
+            "jsonable_encoder + JSONResponse": lambda: JSONResponse(
+                jsonable_encoder(payload)
+            ).body,
+            "pydantic JSON mode dump + JSONResponse": lambda: JSONResponse(
+                payload.model_dump(mode="json")
+            ).body,
+            "FastJsonResponse": lambda: FastJsonResponse(payload).body,
+        }
+        print(f"{payload_name}: {len(reference)} bytes, best of {repeat} runs")
+        for name, func in timings.items():
+            best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+            print(f"  {name}: {best * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-items", type=int, default=500)
+    parser.add_argument("--num-years", type=int, default=70)
+    parser.add_argument("--number", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.num_items, args.num_years, args.number, args.repeat)
@@ -0,0 +1,50 @@
+"""Compare the speed of `pyloess` with the LOESS of the `smoothing` module.
+
+Run with `python tests/benchmarks/bench_smoothing.py`.
+"""
+
+import argparse
+import timeit
+import warnings
+
+import numpy as np
+import pyloess
+
+from arpav_ppcv import smoothing
+
+
+def _smooth_uncached(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    smoothing.clear_loess_memo()
+    return smoothing.loess(years, values)
+
+
+def _smooth_with_cached_hat_matrix(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # new values on each call, so that only the hat matrix is reused
+    return smoothing.loess(years, values + np.random.random())
+
+
+def main(num_years: int, number: int, repeat: int):
+    warnings.simplefilter("ignore")
+    years = np.arange(2100 - num_years, 2100)
+    values = np.cumsum(np.random.default_rng(0).normal(size=num_years))
+    timings = {
+        "pyloess": lambda: pyloess.loess(years, values, span=0.75, degree=2),
+        "smoothing.loess (nothing cached)": lambda: _smooth_uncached(years, values),
+        "smoothing.loess (cached hat matrix)": lambda: (
+            _smooth_with_cached_hat_matrix(years, values)
+        ),
+        "smoothing.loess (memoized result)": lambda: smoothing.loess(years, values),
+    }
+    print(f"series of {num_years} values, best of {repeat}x{number} runs")
+    for name, func in timings.items():
+        best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        print(f"{name}: {best * 1_000_000:.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-years", type=int, default=150)
+    parser.add_argument("--number", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.num_years, args.number, args.repeat)
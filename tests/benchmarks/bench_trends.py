@@ -0,0 +1,41 @@
+"""Compare the speed of `pymannkendall` with the vectorized `trends` module.
+
+Run with `python tests/benchmarks/bench_trends.py`.
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pymannkendall as mk
+
+from arpav_ppcv import trends
+
+
+def main(num_series: int, num_years: int, repeat: int):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(num_series, num_years)) + np.arange(num_years) * 0.02
+    timings = {
+        "pymannkendall (one series at a time)": lambda: [
+            mk.original_test(row) for row in values
+        ],
+        "trends.mann_kendall_test (one series at a time)": lambda: [
+            trends.mann_kendall_test(row) for row in values
+        ],
+        "trends.mann_kendall_test_many (all series at once)": lambda: (
+            trends.mann_kendall_test_many(values)
+        ),
+    }
+    print(f"{num_series} series of {num_years} values, best of {repeat} runs")
+    for name, func in timings.items():
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name}: {best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-series", type=int, default=1000)
+    parser.add_argument("--num-years", type=int, default=70)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.num_series, args.num_years, args.repeat)
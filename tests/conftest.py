@@ -18,6 +18,7 @@ from arpav_ppcv import (
     config,
     database,
     main,
+    replay,
 )
 from arpav_ppcv.schemas import (
     coverages,
@@ -61,6 +62,9 @@ def v2_app(settings):
 def arpav_db(settings):
     """Provides a clean DB."""
     engine = next(_override_get_db_engine(settings))
+    with engine.begin() as connection:
+        # needed by the trigram index on municipality names
+        connection.execute(sqlmodel.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     sqlmodel.SQLModel.metadata.create_all(engine)
     yield
     sqlmodel.SQLModel.metadata.drop_all(engine)
@@ -437,6 +441,36 @@ def sample_tas_csv_data():
     }
 
 
+@pytest.fixture()
+def replay_fixtures_dir(tmp_path, sample_tas_csv_data):
+    fixtures_dir = tmp_path / "replay"
+    for variable_name, csv_data in sample_tas_csv_data.items():
+        replay.write_recorded_response(
+            fixtures_dir,
+            f"ncss-{variable_name}",
+            "/thredds/ncss/grid/ensembletwbc/clipped/tas_avg.nc",
+            csv_data,
+            query={"var": variable_name},
+            headers={"content-type": "text/csv"},
+            body_file_suffix=".csv",
+        )
+    replay.write_recorded_response(
+        fixtures_dir,
+        "staz-attive-tdd",
+        "/REST/v1/clima_indicatori/staz_attive",
+        (
+            '{"data": [{"statcd": 12345, "statnm": "fake station", '
+            '"stattype": "METEO", "altitude": 100, "EPSG4258_LON": 11.9, '
+            '"EPSG4258_LAT": 45.4, "iniziovalidita": "2001-01-01", '
+            '"finevalidita": null}]}'
+        ),
+        query={"indicatore": "TDd"},
+        headers={"content-type": "application/json"},
+        body_file_suffix=".json.body",
+    )
+    return fixtures_dir
+
+
 @pytest.fixture()
 def sample_real_monthly_measurements(
     arpav_db_session,
@@ -919,6 +953,8 @@ def sample_real_monthly_measurements(
 
 def _override_get_settings():
     standard_settings = config.get_settings()
+    # tests recreate the database, so cached responses must not outlive them
+    standard_settings.response_cache.enabled = False
     return standard_settings
 
 
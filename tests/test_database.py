@@ -1,11 +1,23 @@
+import datetime as dt
 import random
 from contextlib import nullcontext as does_not_raise
 
+import geojson_pydantic
+import numpy as np
 import pydantic
 import pytest
+import shapely
+import shapely.io
+import sqlalchemy.exc
 
 from arpav_ppcv import database
-from arpav_ppcv.schemas import coverages
+from arpav_ppcv.schemas import (
+    base,
+    coverages,
+    datagenerations,
+    municipalities,
+    observations,
+)
 
 
 @pytest.mark.parametrize(
@@ -319,3 +331,249 @@ def test_create_coverage_configuration_uses_new_possible_values(
         created1.possible_values[0].configuration_parameter_value.name
         == possible_value.name
     )
+
+
+def test_create_many_monthly_measurements_bumps_data_generations(
+    arpav_db_session, sample_stations, sample_variables
+):
+    target_variable = sample_variables[0]
+    measurements_domain = datagenerations.get_measurements_domain(target_variable.id)
+    before = database.get_data_generations(
+        arpav_db_session, [measurements_domain, datagenerations.STATIONS_DOMAIN]
+    )
+    database.create_many_monthly_measurements(
+        arpav_db_session,
+        [
+            observations.MonthlyMeasurementCreate(
+                station_id=sample_stations[0].id,
+                variable_id=target_variable.id,
+                value=1.5,
+                date=dt.date(2020, 1, 1),
+            )
+        ],
+    )
+    after = database.get_data_generations(
+        arpav_db_session, [measurements_domain, datagenerations.STATIONS_DOMAIN]
+    )
+    assert after[measurements_domain] == before[measurements_domain] + 1
+    assert (
+        after[datagenerations.STATIONS_DOMAIN]
+        == before[datagenerations.STATIONS_DOMAIN]
+    )
+
+
+def test_delete_coverage_configuration_bumps_data_generations(
+    arpav_db_session, sample_coverage_configurations
+):
+    domains = [datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN]
+    before = database.get_data_generations(arpav_db_session, domains)
+    target = sample_coverage_configurations[0]
+    database.delete_coverage_configuration(arpav_db_session, target.id)
+    after = database.get_data_generations(arpav_db_session, domains)
+    assert database.get_coverage_configuration(arpav_db_session, target.id) is None
+    assert (
+        after[datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN]
+        == before[datagenerations.COVERAGE_CONFIGURATIONS_DOMAIN] + 1
+    )
+
+
+def test_get_measurement_series_monthly(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    times, values = database.get_measurement_series(
+        arpav_db_session,
+        station_id=sample_real_station.id,
+        variable_id=db_variable.id,
+        aggregation_type=base.ObservationAggregationType.MONTHLY,
+        month_filter=1,
+    )
+    expected = sorted(
+        (m.date, m.value) for m in sample_real_monthly_measurements if m.date.month == 1
+    )
+    assert times.dtype == np.dtype("datetime64[D]")
+    assert times.tolist() == [d for d, _ in expected]
+    assert values.tolist() == pytest.approx([v for _, v in expected])
+
+
+def test_get_measurement_series_reads_rebuilt_compact_series(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    series_kwargs = {
+        "station_id": sample_real_station.id,
+        "variable_id": db_variable.id,
+        "aggregation_type": base.ObservationAggregationType.MONTHLY,
+        "month_filter": 1,
+    }
+    expected_times, expected_values = database.get_measurement_series(
+        arpav_db_session, **series_kwargs
+    )
+    num_series = database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    times, values = database.get_measurement_series(arpav_db_session, **series_kwargs)
+    assert num_series > 0
+    assert times.tolist() == expected_times.tolist()
+    assert values.tolist() == pytest.approx(expected_values.tolist())
+
+
+def test_measurement_changes_update_compact_series(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    series_kwargs = {
+        "station_id": sample_real_station.id,
+        "variable_id": db_variable.id,
+        "aggregation_type": base.ObservationAggregationType.MONTHLY,
+        "month_filter": 1,
+    }
+    database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    db_measurement = database.create_monthly_measurement(
+        arpav_db_session,
+        observations.MonthlyMeasurementCreate(
+            station_id=sample_real_station.id,
+            variable_id=db_variable.id,
+            value=42.0,
+            date=dt.date(2100, 1, 1),
+        ),
+    )
+    times, values = database.get_measurement_series(arpav_db_session, **series_kwargs)
+    assert times[-1] == np.datetime64("2100-01-01")
+    assert values[-1] == pytest.approx(42.0)
+    database.delete_monthly_measurement(arpav_db_session, db_measurement.id)
+    times, _ = database.get_measurement_series(arpav_db_session, **series_kwargs)
+    assert np.datetime64("2100-01-01") not in times
+
+
+def test_bulk_measurement_creation_updates_compact_series(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    database.create_many_monthly_measurements(
+        arpav_db_session,
+        [
+            observations.MonthlyMeasurementCreate(
+                station_id=sample_real_station.id,
+                variable_id=db_variable.id,
+                value=42.0,
+                date=dt.date(2100, 1, 1),
+            )
+        ],
+    )
+    times, values = database.get_measurement_series(
+        arpav_db_session,
+        station_id=sample_real_station.id,
+        variable_id=db_variable.id,
+        aggregation_type=base.ObservationAggregationType.MONTHLY,
+        month_filter=1,
+    )
+    assert times[-1] == np.datetime64("2100-01-01")
+    assert values[-1] == pytest.approx(42.0)
+
+
+def test_refresh_station_variable_availability(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    list_kwargs = {
+        "variable_id_filter": db_variable.id,
+        "variable_aggregation_type": base.ObservationAggregationType.MONTHLY,
+    }
+    num_records = database.refresh_station_variable_availability(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    stations_after, _ = database.list_stations(arpav_db_session, **list_kwargs)
+    availabilities, _ = database.list_station_variable_availabilities(
+        arpav_db_session,
+        station_id_filter=sample_real_station.id,
+        variable_id_filter=db_variable.id,
+        limit=20,
+    )
+    january_years = [
+        m.date.year for m in sample_real_monthly_measurements if m.date.month == 1
+    ]
+    january = [a for a in availabilities if a.period == "1"][0]
+    assert [s.id for s in stations_after] == [sample_real_station.id]
+    assert num_records == len(availabilities)
+    assert january.first_year == min(january_years)
+    assert january.last_year == max(january_years)
+    assert january.value_count == len(january_years)
+
+
+def test_measurement_changes_update_station_availability(
+    arpav_db_session, sample_real_station, sample_real_variables
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    list_kwargs = {
+        "variable_id_filter": db_variable.id,
+        "variable_aggregation_type": base.ObservationAggregationType.YEARLY,
+    }
+    db_measurement = database.create_yearly_measurement(
+        arpav_db_session,
+        observations.YearlyMeasurementCreate(
+            station_id=sample_real_station.id,
+            variable_id=db_variable.id,
+            value=3.2,
+            year=2020,
+        ),
+    )
+    stations, _ = database.list_stations(arpav_db_session, **list_kwargs)
+    assert [s.id for s in stations] == [sample_real_station.id]
+    database.delete_yearly_measurement(arpav_db_session, db_measurement.id)
+    stations, _ = database.list_stations(arpav_db_session, **list_kwargs)
+    assert stations == []
+
+
+def _create_municipalities(session, names: list[str]):
+    coordinates = [
+        [[(11.0, 45.0), (11.1, 45.0), (11.1, 45.1), (11.0, 45.1), (11.0, 45.0)]]
+    ]
+    return database.create_many_municipalities(
+        session,
+        [
+            municipalities.MunicipalityCreate(
+                geom=geojson_pydantic.MultiPolygon(
+                    type="MultiPolygon", coordinates=coordinates
+                ),
+                name=name,
+                province_name="fake province",
+                region_name="fake region",
+            )
+            for name in names
+        ],
+    )
+
+
+def test_create_many_municipalities_computes_derived_geometries(arpav_db_session):
+    _create_municipalities(arpav_db_session, ["fake"])
+    db_municipalities, _ = database.list_municipalities(
+        arpav_db_session, geometry_column="centroid"
+    )
+    assert len(db_municipalities) == 1
+    centroid = shapely.io.from_wkb(bytes(db_municipalities[0].centroid.data))
+    assert centroid.equals_exact(shapely.Point(11.05, 45.05), 1e-9)
+    with pytest.raises(sqlalchemy.exc.InvalidRequestError):
+        db_municipalities[0].geom_coarse
+
+
+@pytest.mark.parametrize(
+    "query, expected_names",
+    [
+        pytest.param("ven", ["Venezia", "San Vendemiano"]),
+        pytest.param("FORLI", ["Forlì"]),
+        pytest.param("venzia", ["Venezia"]),
+        pytest.param("   ", []),
+    ],
+)
+def test_search_municipalities(arpav_db_session, query, expected_names):
+    _create_municipalities(
+        arpav_db_session, ["San Vendemiano", "Venezia", "Verona", "Forlì"]
+    )
+    db_municipalities = database.search_municipalities(arpav_db_session, query)
+    assert [m.name for m in db_municipalities] == expected_names
@@ -1,5 +1,8 @@
 import datetime as dt
 
+import geojson_pydantic
+import numpy as np
+import pandas as pd
 import pytest
 from pandas.core.dtypes.common import (
     is_datetime64_ns_dtype,
@@ -10,7 +13,11 @@ from arpav_ppcv import (
     database,
     operations,
 )
-from arpav_ppcv.schemas import coverages
+from arpav_ppcv.schemas import (
+    base,
+    coverages,
+    observations,
+)
 
 
 @pytest.mark.parametrize(
@@ -180,3 +187,290 @@ def test_get_related_coverage_configurations(
 
     for found_identifier in related_cov_identifiers:
         assert found_identifier in expected_related_coverage_identifiers
+
+
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [
+        pytest.param(None, None, (None, None)),
+        pytest.param(
+            dt.datetime(1990, 1, 1, tzinfo=dt.timezone.utc),
+            dt.datetime(2000, 1, 1, tzinfo=dt.timezone.utc),
+            (dt.date(1990, 1, 1), dt.date(2000, 1, 1)),
+        ),
+        pytest.param(
+            dt.datetime(1990, 1, 1, 1, tzinfo=dt.timezone.utc),
+            dt.datetime(2000, 1, 1, 1, tzinfo=dt.timezone.utc),
+            (dt.date(1990, 1, 2), dt.date(2000, 1, 1)),
+        ),
+    ],
+)
+def test_get_date_bounds(start, end, expected):
+    assert operations._get_date_bounds(start, end) == expected
+
+
+def test_get_observation_time_series_matches_pandas_processing(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    result = operations.get_observation_time_series(
+        arpav_db_session,
+        db_variable,
+        sample_real_station,
+        month=1,
+        temporal_range="1990-01-01T00:00:00Z/..",
+        smoothing_strategies=[
+            base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+            base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS,
+        ],
+        include_decade_data=True,
+    )
+    expected = pd.Series(
+        [m.value for m in sample_real_monthly_measurements],
+        index=pd.to_datetime(
+            [m.date for m in sample_real_monthly_measurements], utc=True
+        ),
+    )["1990-01-01":]
+    original = result[(base.ObservationDataSmoothingStrategy.NO_SMOOTHING, None)][0]
+    smoothed = result[
+        (base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS, None)
+    ][0]
+    decades = result[
+        (
+            base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+            base.ObservationDerivedSeries.DECADE_SERIES,
+        )
+    ][0]
+    expected_decades = expected.groupby(((expected.index.year - 1) // 10) * 10).agg(
+        ["size", "mean"]
+    )
+    expected_decades = expected_decades[expected_decades["size"] >= 7]["mean"]
+    assert original.tolist() == pytest.approx(expected.tolist())
+    assert smoothed.tolist() == pytest.approx(
+        expected.rolling(window=5, center=True).mean().tolist(), nan_ok=True
+    )
+    assert decades.index.year.tolist() == expected_decades.index.tolist()
+    assert decades.tolist() == pytest.approx(expected_decades.tolist())
+
+
+def test_process_station_data_filters_time_range():
+    times = np.array(["2000-01-01", "2001-04-01", "2002-01-01"], dtype="datetime64[D]")
+    result = operations._process_station_data(
+        times,
+        np.array([1.0, 2.0, 3.0]),
+        dt.datetime(2000, 6, 1, tzinfo=dt.timezone.utc),
+        dt.datetime(2002, 1, 1, tzinfo=dt.timezone.utc),
+        "fake",
+    )
+    assert result.name == "fake"
+    assert result.tolist() == [2.0, 3.0]
+    assert result.index[0] == pd.Timestamp("2001-04-01", tz="UTC")
+
+
+def test_get_observation_time_series_collection_matches_single_month(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    smoothing_strategies = [
+        base.ObservationDataSmoothingStrategy.NO_SMOOTHING,
+        base.ObservationDataSmoothingStrategy.MOVING_AVERAGE_5_YEARS,
+    ]
+    collection = operations.get_observation_time_series_collection(
+        arpav_db_session,
+        db_variable,
+        sample_real_station,
+        temporal_range="1990-01-01T00:00:00Z/..",
+        smoothing_strategies=smoothing_strategies,
+        include_decade_data=True,
+    )
+    single = operations.get_observation_time_series(
+        arpav_db_session,
+        db_variable,
+        sample_real_station,
+        month=1,
+        temporal_range="1990-01-01T00:00:00Z/..",
+        smoothing_strategies=smoothing_strategies,
+        include_decade_data=True,
+    )
+    for (smoothing_strategy, derived_series), (expected, _) in single.items():
+        series, _ = collection[
+            (
+                base.ObservationAggregationType.MONTHLY,
+                "1",
+                smoothing_strategy,
+                derived_series,
+            )
+        ]
+        assert series.index.tolist() == expected.index.tolist()
+        assert series.tolist() == pytest.approx(expected.tolist(), nan_ok=True)
+
+
+@pytest.mark.parametrize(
+    "start_year, end_year, expected",
+    [
+        pytest.param(None, None, "../..", id="open"),
+        pytest.param(1961, 1990, "1961/1990", id="closed"),
+        pytest.param(None, 2020, "../2020", id="open-start"),
+    ],
+)
+def test_mann_kendall_parameters_window(start_year, end_year, expected):
+    parameters = base.MannKendallParameters(start_year=start_year, end_year=end_year)
+    assert parameters.window == expected
+
+
+def test_get_observation_time_series_uses_precomputed_statistics(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    series_kwargs = {
+        "month": 1,
+        "temporal_range": "../..",
+        "include_decade_data": True,
+        "mann_kendall_parameters": base.MannKendallParameters(),
+    }
+    expected = operations.get_observation_time_series(
+        arpav_db_session, db_variable, sample_real_station, **series_kwargs
+    )
+    database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    num_processed = operations.refresh_measurement_statistics(
+        arpav_db_session,
+        [base.MannKendallParameters()],
+        aggregation_type_filter=base.ObservationAggregationType.MONTHLY,
+    )
+    stored_trends = database.collect_all_measurement_trends(
+        arpav_db_session,
+        station_id=sample_real_station.id,
+        variable_id=db_variable.id,
+        window="../..",
+    )
+    result = operations.get_observation_time_series(
+        arpav_db_session, db_variable, sample_real_station, **series_kwargs
+    )
+    assert num_processed > 0
+    assert "1" in [t.period for t in stored_trends]
+    for key, (expected_series, expected_info) in expected.items():
+        series, info = result[key]
+        assert series.index.tolist() == expected_series.index.tolist()
+        assert series.tolist() == pytest.approx(expected_series.tolist(), nan_ok=True)
+        assert info == expected_info
+
+
+def test_get_station_trends_uses_precomputed_trends(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    trends_kwargs = {
+        "aggregation_type": base.ObservationAggregationType.MONTHLY,
+        "period": "1",
+        "mann_kendall_parameters": base.MannKendallParameters(),
+    }
+    expected = operations.get_station_trends(
+        arpav_db_session, db_variable, **trends_kwargs
+    )
+    operations.refresh_measurement_statistics(
+        arpav_db_session,
+        [base.MannKendallParameters()],
+        aggregation_type_filter=base.ObservationAggregationType.MONTHLY,
+    )
+    result = operations.get_station_trends(
+        arpav_db_session, db_variable, **trends_kwargs
+    )
+    assert [s.id for s, _ in expected] == [sample_real_station.id]
+    assert [(s.id, t.get_info()) for s, t in result] == [
+        (s.id, pytest.approx(t.get_info())) for s, t in expected
+    ]
+
+
+def test_measurement_changes_delete_precomputed_statistics(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    operations.refresh_measurement_statistics(
+        arpav_db_session,
+        [base.MannKendallParameters()],
+        aggregation_type_filter=base.ObservationAggregationType.MONTHLY,
+    )
+    statistics_kwargs = {
+        "station_id": sample_real_station.id,
+        "variable_id": db_variable.id,
+    }
+    assert (
+        len(
+            database.collect_all_measurement_trends(
+                arpav_db_session, window="../..", **statistics_kwargs
+            )
+        )
+        > 0
+    )
+    database.create_monthly_measurement(
+        arpav_db_session,
+        observations.MonthlyMeasurementCreate(
+            **statistics_kwargs, value=-4.0, date=dt.date(2100, 1, 1)
+        ),
+    )
+    assert (
+        database.collect_all_measurement_trends(
+            arpav_db_session, window="../..", **statistics_kwargs
+        )
+        == []
+    )
+    assert (
+        database.collect_all_measurement_decade_means(
+            arpav_db_session, **statistics_kwargs
+        )
+        == []
+    )
+
+
+def test_get_station_trends_merges_precomputed_and_computed_trends(
+    arpav_db_session, sample_real_station, sample_real_monthly_measurements
+):
+    db_variable = database.get_variable_by_name(arpav_db_session, "TDd")
+    other_station = database.create_station(
+        arpav_db_session,
+        observations.StationCreate(
+            code="other",
+            geom=geojson_pydantic.Point(type="Point", coordinates=(12.0, 46.0)),
+        ),
+    )
+    database.create_many_monthly_measurements(
+        arpav_db_session,
+        [
+            observations.MonthlyMeasurementCreate(
+                station_id=other_station.id,
+                variable_id=db_variable.id,
+                value=m.value,
+                date=m.date,
+            )
+            for m in sample_real_monthly_measurements
+        ],
+    )
+    database.rebuild_measurement_series(
+        arpav_db_session, base.ObservationAggregationType.MONTHLY
+    )
+    operations.refresh_measurement_statistics(
+        arpav_db_session,
+        [base.MannKendallParameters()],
+        aggregation_type_filter=base.ObservationAggregationType.MONTHLY,
+        station_id_filter=sample_real_station.id,
+    )
+    result = operations.get_station_trends(
+        arpav_db_session,
+        db_variable,
+        aggregation_type=base.ObservationAggregationType.MONTHLY,
+        period="1",
+        mann_kendall_parameters=base.MannKendallParameters(),
+    )
+    assert sorted(s.id for s, _ in result) == sorted(
+        [sample_real_station.id, other_station.id]
+    )
+    first_trend, second_trend = (t for _, t in result)
+    assert first_trend.slope == pytest.approx(second_trend.slope)
@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from arpav_ppcv import (
+    config,
+    operations,
+    processpool,
+)
+from arpav_ppcv.schemas import base
+
+
+@pytest.fixture(scope="module")
+def process_pool():
+    pool = processpool.ProcessPool(max_workers=1, max_pending_tasks=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_process_pool_runs_in_worker_process(process_pool):
+    assert process_pool.run(os.getpid) != os.getpid()
+
+
+def test_process_pool_runs_inline_when_saturated(process_pool):
+    process_pool._slots.acquire()
+    try:
+        assert process_pool.run(os.getpid) == os.getpid()
+    finally:
+        process_pool._slots.release()
+
+
+def test_run_without_pool_runs_inline():
+    assert processpool.run(None, os.getpid) == os.getpid()
+
+
+def test_process_pool_smoothing_matches_inline(process_pool):
+    series = pd.Series(
+        np.random.default_rng(seed=3).normal(size=60),
+        index=pd.DatetimeIndex(
+            pd.to_datetime([str(y) for y in range(1976, 2036)], utc=True),
+            name="time",
+        ),
+        name="fake",
+    )
+    strategies = [
+        base.CoverageDataSmoothingStrategy.LOESS_SMOOTHING,
+        base.CoverageDataSmoothingStrategy.MOVING_AVERAGE_11_YEARS,
+    ]
+    expected = operations._smooth_coverage_series([series], strategies)
+    result = processpool.run(
+        process_pool, operations._smooth_coverage_series, [series], strategies
+    )
+    for strategy in strategies:
+        pd.testing.assert_series_equal(result[0][strategy], expected[0][strategy])
+
+
+def test_get_pool_is_disabled_by_default():
+    assert processpool.get_pool(config.ProcessPoolSettings()) is None
+
+
+def test_batched_smoothing_matches_single_series_smoothing():
+    index = pd.DatetimeIndex(
+        pd.to_datetime([str(y) for y in range(1976, 2036)], utc=True), name="time"
+    )
+    rng = np.random.default_rng(seed=5)
+    all_series = [
+        pd.Series(rng.normal(size=60), index=index, name=name)
+        for name in ("fake", "fake_lower_uncertainty", "fake_upper_uncertainty")
+    ]
+    strategies = [
+        base.CoverageDataSmoothingStrategy.LOESS_SMOOTHING,
+        base.CoverageDataSmoothingStrategy.MOVING_AVERAGE_11_YEARS,
+    ]
+    result = operations._smooth_coverage_series(all_series, strategies)
+    for series, smoothed in zip(all_series, result):
+        for strategy in strategies:
+            np.testing.assert_allclose(
+                smoothed[strategy].to_numpy(),
+                operations.process_coverage_smoothing_strategy(
+                    series.index.year.to_numpy(), series.to_numpy(), strategy
+                ),
+            )
+            assert smoothed[strategy].name == f"{series.name}__{strategy.value}"
+
+
+def test_shutdown_pool_discards_pool():
+    settings = config.ProcessPoolSettings(
+        enabled=True, max_workers=1, max_pending_tasks=1
+    )
+    pool = processpool.get_pool(settings)
+    processpool.shutdown_pool()
+    assert processpool.get_pool(settings) is not pool
+    processpool.shutdown_pool()
@@ -0,0 +1,48 @@
+import pytest
+import sqlmodel
+
+from arpav_ppcv import queryplans
+from arpav_ppcv.schemas import observations
+
+
+@pytest.mark.parametrize(
+    "plan_lines, expected",
+    [
+        pytest.param(
+            [
+                "Index Scan using ix_yearlymeasurement_station_variable_year on "
+                "yearlymeasurement  (cost=0.29..8.31 rows=1 width=36)",
+            ],
+            [],
+            id="index-scan",
+        ),
+        pytest.param(
+            [
+                "Sort  (cost=21.03..21.04 rows=1 width=36)",
+                "  ->  Seq Scan on monthlymeasurement  (cost=0.00..21.02 rows=1 width=36)",
+                "  ->  Seq Scan on station  (cost=0.00..1.50 rows=50 width=36)",
+            ],
+            ["monthlymeasurement"],
+            id="seq-scan-on-measurements",
+        ),
+    ],
+)
+def test_query_plan_sequential_scans(plan_lines, expected):
+    query_plan = queryplans.QueryPlan(name="fake", statement="", plan=plan_lines)
+    assert query_plan.sequential_scans == expected
+
+
+def test_explain_query_shapes(arpav_db_session):
+    dataset = queryplans.create_synthetic_dataset(
+        arpav_db_session,
+        num_stations=3,
+        num_variables=2,
+        start_year=2000,
+        end_year=2010,
+    )
+    plans = queryplans.explain_query_shapes(arpav_db_session, dataset)
+    arpav_db_session.rollback()
+    names = [p.name for p in plans]
+    assert any(name.startswith("monthly measurements for month") for name in names)
+    assert all(len(p.plan) > 0 for p in plans)
+    assert arpav_db_session.exec(sqlmodel.select(observations.Station)).first() is None
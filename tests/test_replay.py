@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from arpav_ppcv import (
+    config,
+    replay,
+)
+
+
+def test_replay_transport_matches_query_params(replay_fixtures_dir):
+    transport = replay.ReplayTransport.from_directory(replay_fixtures_dir)
+    with httpx.Client(transport=transport) as client:
+        response = client.get(
+            "http://localhost:8080/thredds/ncss/grid/ensembletwbc/clipped/tas_avg.nc",
+            params={"var": "tas_stdup", "accept": "csv"},
+        )
+        not_found_response = client.get(
+            "https://api.arpa.veneto.it/REST/v1/clima_indicatori/staz_attive",
+            params={"indicatore": "PRCPTOT"},
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv"
+    assert "tas_stdup[unit=" in response.text
+    assert not_found_response.status_code == 404
+
+
+def test_replay_transport_sync_client_json(replay_fixtures_dir):
+    transport = replay.ReplayTransport.from_directory(replay_fixtures_dir)
+    with httpx.Client(transport=transport) as client:
+        response = client.get(
+            "https://api.arpa.veneto.it/REST/v1/clima_indicatori/staz_attive",
+            params={"indicatore": "TDd"},
+        )
+    assert response.json()["data"][0]["statcd"] == 12345
+
+
+@pytest.mark.anyio
+async def test_replay_transport_async_client(replay_fixtures_dir):
+    transport = replay.ReplayTransport.from_directory(
+        replay_fixtures_dir, latency_seconds=0.01
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get(
+            "http://localhost:8080/thredds/ncss/grid/ensembletwbc/clipped/tas_avg.nc",
+            params={"var": "tas"},
+        )
+    assert response.status_code == 200
+    assert response.text.startswith("time,station")
+
+
+def test_replay_transport_error_injection(replay_fixtures_dir):
+    transport = replay.ReplayTransport.from_directory(
+        replay_fixtures_dir, error_rate=1, error_status_code=502
+    )
+    with httpx.Client(transport=transport) as client:
+        response = client.get(
+            "https://api.arpa.veneto.it/REST/v1/clima_indicatori/staz_attive",
+            params={"indicatore": "TDd"},
+        )
+    assert response.status_code == 502
+
+
+def test_build_transport_disabled_by_default():
+    assert replay.build_transport(config.ReplaySettings()) is None
+
+
+def test_build_transport_reuses_loaded_fixtures(tmp_path):
+    replay.write_recorded_response(tmp_path, "stations", "/staz_attive", "{}")
+    settings = config.ReplaySettings(enabled=True, fixtures_dir=tmp_path)
+    transport = replay.build_transport(settings)
+    assert replay.build_transport(settings.model_copy()) is transport
+    assert len(transport.recorded) == 1
+    other_transport = replay.build_transport(
+        settings.model_copy(update={"latency_seconds": 1})
+    )
+    assert other_transport is not transport
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,91 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyloess
+import pytest
+
+from arpav_ppcv import smoothing
+
+
+@pytest.mark.parametrize("window", [4, 5, 11])
+@pytest.mark.parametrize(
+    "missing_indexes",
+    [
+        pytest.param([], id="no-missing"),
+        pytest.param([0, 9, 10, 30], id="missing"),
+    ],
+)
+def test_centered_moving_average_matches_pandas(window, missing_indexes):
+    values = np.random.default_rng(seed=3).normal(size=40)
+    values[missing_indexes] = np.nan
+    result = smoothing.centered_moving_average(values, window)
+    expected = pd.Series(values).rolling(window=window, center=True).mean()
+    assert result.tolist() == pytest.approx(expected.tolist(), nan_ok=True)
+
+
+def test_centered_moving_average_of_short_series():
+    result = smoothing.centered_moving_average(np.array([1.0, 2.0, 3.0]), 5)
+    assert np.isnan(result).all()
+
+
+def test_centered_moving_average_many_matches_single_series():
+    values = np.random.default_rng(seed=3).normal(size=(3, 20))
+    values[1, 4] = np.nan
+    result = smoothing.centered_moving_average_many(values, 5)
+    for row, expected_row in zip(result, values):
+        assert row.tolist() == pytest.approx(
+            smoothing.centered_moving_average(expected_row, 5).tolist(), nan_ok=True
+        )
+
+
+def test_grouped_centered_moving_average_matches_pandas():
+    rng = np.random.default_rng(seed=3)
+    groups = np.repeat([0, 1, 2], [12, 4, 7])
+    values = rng.normal(size=len(groups))
+    result = smoothing.grouped_centered_moving_average(values, groups, 5)
+    expected = (
+        pd.Series(values)
+        .groupby(groups)
+        .transform(lambda s: s.rolling(window=5, center=True).mean())
+    )
+    assert result.tolist() == pytest.approx(expected.tolist(), nan_ok=True)
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        pytest.param(np.arange(125), id="evenly-spaced"),
+        pytest.param(np.arange(0, 150, 3), id="evenly-spaced-with-step"),
+        pytest.param(np.array([0, 1, 2, 4, 7, 8, 9, 12, 15, 16, 20, 21]), id="uneven"),
+    ],
+)
+@pytest.mark.parametrize("span, degree", [(0.75, 2), (0.3, 1)])
+def test_loess_matches_pyloess(x, span, degree):
+    y = np.cumsum(np.random.default_rng(seed=3).normal(size=len(x)))
+    smoothing.clear_loess_memo()
+    result = smoothing.loess(x, y, span=span, degree=degree)
+    expected = pyloess.loess(x.astype(float), y, span=span, degree=degree)[:, 1]
+    assert result.tolist() == pytest.approx(expected.tolist(), abs=1e-9)
+
+
+def test_loess_matches_pyloess_for_yearly_series():
+    years = np.arange(1976, 2101)
+    y = 15 + np.cumsum(np.random.default_rng(seed=3).normal(size=len(years)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = pyloess.loess(years, y, span=0.75, degree=2)[:, 1]
+    # pyloess fits polynomials of the raw years, which loses some precision
+    assert smoothing.loess(years, y).tolist() == pytest.approx(
+        expected.tolist(), abs=1e-4
+    )
+
+
+def test_loess_memoizes_results():
+    smoothing.clear_loess_memo()
+    x = np.arange(30)
+    y = np.random.default_rng(seed=3).normal(size=len(x))
+    first = smoothing.loess(x, y)
+    first[:] = 0
+    assert smoothing.loess(x, y).tolist() != first.tolist()
+    assert smoothing._get_evenly_spaced_loess_hat_matrix.cache_info().currsize == 1
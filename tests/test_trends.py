@@ -0,0 +1,63 @@
+import numpy as np
+import pymannkendall as mk
+import pytest
+
+from arpav_ppcv import trends
+
+
+def _get_series(kind: str) -> np.ndarray:
+    rng = np.random.default_rng(42)
+    if kind == "random":
+        return rng.normal(10, 2, size=40)
+    elif kind == "increasing":
+        return np.arange(35) * 0.1 + rng.normal(0, 0.5, size=35)
+    elif kind == "decreasing":
+        return -np.arange(30) * 0.2 + rng.normal(0, 0.5, size=30)
+    elif kind == "tied":
+        return np.round(rng.normal(5, 1, size=50))
+    elif kind == "missing":
+        values = np.arange(45) * 0.05 + rng.normal(0, 1, size=45)
+        values[[0, 7, 8, 30, 44]] = np.nan
+        return values
+    raise ValueError(kind)
+
+
+def _assert_matches_pymannkendall(result: trends.MannKendallResult, values: np.ndarray):
+    expected = mk.original_test(values)
+    assert result.trend == expected.trend
+    assert result.h == bool(expected.h)
+    for name, expected_value in (
+        ("p", expected.p),
+        ("z", expected.z),
+        ("tau", expected.Tau),
+        ("s", expected.s),
+        ("var_s", expected.var_s),
+        ("slope", expected.slope),
+        ("intercept", expected.intercept),
+    ):
+        assert getattr(result, name) == pytest.approx(expected_value), name
+
+
+@pytest.mark.parametrize(
+    "kind", ["random", "increasing", "decreasing", "tied", "missing"]
+)
+def test_mann_kendall_test_matches_pymannkendall(kind):
+    values = _get_series(kind)
+    _assert_matches_pymannkendall(trends.mann_kendall_test(values), values)
+
+
+def test_mann_kendall_test_many_matches_pymannkendall():
+    kinds = ["random", "increasing", "decreasing", "tied", "missing"]
+    all_values = [_get_series(kind) for kind in kinds]
+    padded = np.full((len(all_values), max(len(v) for v in all_values)), np.nan)
+    for index, values in enumerate(all_values):
+        padded[index, : len(values)] = values
+    results = trends.mann_kendall_test_many(padded)
+    assert len(results) == len(kinds)
+    for result, values in zip(results, all_values):
+        _assert_matches_pymannkendall(result, values)
+
+
+def test_mann_kendall_test_many_requires_2d_input():
+    with pytest.raises(ValueError):
+        trends.mann_kendall_test_many(np.arange(10.0))
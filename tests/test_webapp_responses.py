@@ -0,0 +1,92 @@
+import datetime as dt
+import json
+import uuid
+
+import geojson_pydantic
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from arpav_ppcv.schemas import (
+    base,
+    observations,
+)
+from arpav_ppcv.webapp import responses
+from arpav_ppcv.webapp.api_v2.schemas.base import (
+    CompactTimeSeries,
+    TimeSeries,
+)
+
+
+@pytest.fixture()
+def observation_series() -> tuple[pd.Series, observations.Variable]:
+    return (
+        pd.Series(
+            [1.5, np.nan, 3.25],
+            index=pd.date_range("2001-01-01", periods=3, freq="YS", tz="UTC"),
+        ),
+        observations.Variable(
+            name="TDd", display_name_english="temperature", display_name_italian="t"
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "model_factory",
+    [
+        pytest.param(
+            lambda series, variable: TimeSeries.from_observation_series(
+                series, variable, base.ObservationDataSmoothingStrategy.NO_SMOOTHING
+            ),
+            id="time-series",
+        ),
+        pytest.param(
+            lambda series, variable: geojson_pydantic.FeatureCollection(
+                type="FeatureCollection",
+                features=[
+                    geojson_pydantic.Feature(
+                        type="Feature",
+                        geometry=geojson_pydantic.Point(
+                            type="Point", coordinates=(11, 45)
+                        ),
+                        properties={"name": variable.name},
+                    )
+                ],
+            ),
+            id="geojson",
+        ),
+    ],
+)
+def test_fast_json_response_matches_jsonable_encoder(observation_series, model_factory):
+    model = model_factory(*observation_series)
+    assert json.loads(responses.FastJsonResponse(model).body) == jsonable_encoder(model)
+
+
+def test_fast_json_response_native_types():
+    identifier = uuid.uuid4()
+    content = {
+        "id": identifier,
+        "timestamp": pd.Timestamp("2001-01-01", tz="UTC"),
+        "date": dt.date(2001, 1, 1),
+        "values": np.array([1.5, 2.0]),
+        "count": np.int64(2),
+    }
+    assert json.loads(responses.FastJsonResponse(content).body) == {
+        "id": str(identifier),
+        "timestamp": "2001-01-01T00:00:00Z",
+        "date": "2001-01-01",
+        "values": [1.5, 2.0],
+        "count": 2,
+    }
+
+
+def test_compact_time_series_response(observation_series):
+    model = CompactTimeSeries.from_observation_series(
+        *observation_series, base.ObservationDataSmoothingStrategy.NO_SMOOTHING
+    )
+    response = responses.CompactTimeSeriesResponse(model)
+    assert response.media_type == responses.COMPACT_TIME_SERIES_MEDIA_TYPE
+    payload = json.loads(response.body)
+    assert payload["times"] == ["2001-01-01T00:00:00Z", "2003-01-01T00:00:00Z"]
+    assert payload["values"] == [1.5, 3.25]
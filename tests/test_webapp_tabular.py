@@ -0,0 +1,86 @@
+import io
+
+import anyio
+import numpy as np
+import pandas as pd
+import pytest
+
+from arpav_ppcv.webapp import tabular
+from arpav_ppcv.webapp.api_v2.schemas.base import (
+    TimeSeriesFormat,
+    TimestampFormat,
+)
+
+
+@pytest.fixture()
+def time_series_columns() -> dict[str, pd.Series]:
+    return {
+        "first:NO_SMOOTHING": pd.Series(
+            [1.0, 2.0, 3.0],
+            index=pd.DatetimeIndex(["2001-01-01", "2002-01-01", "2003-01-01"]),
+        ),
+        "second:NO_SMOOTHING": pd.Series(
+            [10.0, 30.0],
+            index=pd.DatetimeIndex(["2001-01-01", "2003-01-01"], tz="UTC"),
+        ),
+    }
+
+
+def _read_response(response) -> bytes:
+    async def read():
+        result = b""
+        async for chunk in response.body_iterator:
+            result += chunk.encode() if isinstance(chunk, str) else chunk
+        return result
+
+    return anyio.run(read)
+
+
+def test_build_time_series_table(time_series_columns):
+    table = tabular.build_time_series_table(time_series_columns)
+    assert table.index.name == "time"
+    assert list(table.columns) == ["first:NO_SMOOTHING", "second:NO_SMOOTHING"]
+    assert str(table.index.tz) == "UTC"
+    np.testing.assert_array_equal(
+        table["second:NO_SMOOTHING"].to_numpy(), [10.0, np.nan, 30.0]
+    )
+
+
+def test_build_time_series_table_epoch(time_series_columns):
+    table = tabular.build_time_series_table(time_series_columns, TimestampFormat.EPOCH)
+    assert table.index.tolist() == [978307200, 1009843200, 1041379200]
+
+
+def test_csv_response(time_series_columns):
+    table = tabular.build_time_series_table(time_series_columns)
+    response = tabular.get_time_series_table_response(
+        table, TimeSeriesFormat.CSV, filename="test"
+    )
+    assert response.media_type == "text/csv"
+    assert 'filename="test.csv"' in response.headers["content-disposition"]
+    assert _read_response(response).decode().splitlines() == [
+        "time,first:NO_SMOOTHING,second:NO_SMOOTHING",
+        "2001-01-01T00:00:00Z,1.0,10.0",
+        "2002-01-01T00:00:00Z,2.0,",
+        "2003-01-01T00:00:00Z,3.0,30.0",
+    ]
+
+
+@pytest.mark.parametrize(
+    "series_format", [TimeSeriesFormat.ARROW, TimeSeriesFormat.PARQUET]
+)
+def test_arrow_responses(time_series_columns, series_format):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    table = tabular.build_time_series_table(time_series_columns)
+    response = tabular.get_time_series_table_response(
+        table, series_format, filename="test"
+    )
+    content = io.BytesIO(_read_response(response))
+    if series_format == TimeSeriesFormat.ARROW:
+        result = pyarrow.ipc.open_stream(content).read_all()
+    else:
+        result = pyarrow.parquet.read_table(content)
+    pd.testing.assert_frame_equal(result.to_pandas(), table, check_freq=False)
@@ -0,0 +1,54 @@
+from arpav_ppcv.webapp import tilecache
+
+
+def test_tile_cache_roundtrip(tmp_path):
+    cache = tilecache.TileCache(tmp_path)
+    assert cache.get("stations", "v1", 3, 4, 2) is None
+    cache.set("stations", "v1", 3, 4, 2, b"tile")
+    cache.set("stations", "v1", 3, 4, 2, b"other tile", variant="TDd-monthly")
+    assert cache.get("stations", "v1", 3, 4, 2) == b"tile"
+    assert cache.get("stations", "v1", 3, 4, 2, variant="TDd-monthly") == (
+        b"other tile"
+    )
+
+
+def test_tile_cache_removes_older_versions(tmp_path):
+    cache = tilecache.TileCache(tmp_path)
+    v1 = tilecache.get_version({"stations": 1})
+    v2 = tilecache.get_version({"stations": 2})
+    cache.set("stations", v1, 3, 4, 2, b"tile")
+    cache.set("stations", v1, 3, 4, 2, b"tile", variant="TDd-monthly")
+    cache.set("municipalities", v1, 3, 4, 2, b"tile")
+    cache.set("stations", v2, 3, 4, 2, b"new tile")
+    assert cache.get("stations", v1, 3, 4, 2) is None
+    assert cache.get("stations", v2, 3, 4, 2) == b"new tile"
+    assert cache.get("stations", v1, 3, 4, 2, variant="TDd-monthly") == b"tile"
+    assert cache.get("municipalities", v1, 3, 4, 2) == b"tile"
+    assert [p.name for p in (tmp_path / "stations" / "default").iterdir()] == [v2]
+
+
+def test_tile_cache_keeps_newer_versions(tmp_path):
+    cache = tilecache.TileCache(tmp_path)
+    v1 = tilecache.get_version({"stations": 1})
+    v2 = tilecache.get_version({"stations": 2})
+    cache.set("stations", v2, 3, 4, 2, b"new tile")
+    # a worker which has not yet learned about the change stores an older tile
+    cache.set("stations", v1, 3, 4, 2, b"tile")
+    assert cache.get("stations", v2, 3, 4, 2) == b"new tile"
+
+
+def test_tile_cache_sanitizes_variants(tmp_path):
+    cache = tilecache.TileCache(tmp_path)
+    cache.set("stations", "v1", 0, 0, 0, b"tile", variant="../../escape")
+    assert cache.get("stations", "v1", 0, 0, 0, variant="../../escape") == b"tile"
+    assert all(
+        path.is_relative_to(tmp_path / "stations") for path in tmp_path.rglob("*.mvt")
+    )
+
+
+def test_get_version():
+    assert tilecache.get_version({"a": 1, "b": 2}) == tilecache.get_version(
+        {"b": 2, "a": 1}
+    )
+    assert tilecache.get_version({"a": 1}) != tilecache.get_version({"a": 2})
+    assert tilecache.get_version({"a": 1, "b": 2}).startswith("3-")
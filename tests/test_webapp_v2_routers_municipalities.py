@@ -0,0 +1,130 @@
+import uuid
+
+import pytest
+import shapely
+from geoalchemy2.shape import from_shape
+
+from arpav_ppcv import spatialindex
+from arpav_ppcv.schemas import municipalities
+from arpav_ppcv.webapp import dependencies
+from arpav_ppcv.webapp.api_v2.routers import municipalities as municipalities_router
+from arpav_ppcv.webapp.api_v2.schemas.geojson import (
+    municipalities as municipalities_geojson,
+)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        pytest.param("Venezia", "venezia"),
+        pytest.param("Forlì", "forli"),
+        pytest.param("Sant’Angelo  di Piove", "sant'angelo di piove"),
+        pytest.param("  SÈGUSINO ", "segusino"),
+    ],
+)
+def test_normalize_search_name(name, expected):
+    assert municipalities.normalize_search_name(name) == expected
+
+
+@pytest.mark.parametrize(
+    "zoom, expected",
+    [
+        pytest.param(0, municipalities.MunicipalityGeometrySimplification.COARSE),
+        pytest.param(7, municipalities.MunicipalityGeometrySimplification.COARSE),
+        pytest.param(8, municipalities.MunicipalityGeometrySimplification.MEDIUM),
+        pytest.param(10, municipalities.MunicipalityGeometrySimplification.FINE),
+        pytest.param(12, municipalities.MunicipalityGeometrySimplification.NONE),
+    ],
+)
+def test_simplification_from_zoom(zoom, expected):
+    assert municipalities.MunicipalityGeometrySimplification.from_zoom(zoom) == expected
+
+
+@pytest.mark.parametrize(
+    "geometry, simplify, zoom, expected",
+    [
+        pytest.param(municipalities.MunicipalityGeometryType.FULL, None, None, "geom"),
+        pytest.param(
+            municipalities.MunicipalityGeometryType.FULL,
+            municipalities.MunicipalityGeometrySimplification.MEDIUM,
+            0,
+            "geom_medium",
+        ),
+        pytest.param(
+            municipalities.MunicipalityGeometryType.FULL, None, 5, "geom_coarse"
+        ),
+        pytest.param(
+            municipalities.MunicipalityGeometryType.CENTROID, None, 5, "centroid"
+        ),
+        pytest.param(municipalities.MunicipalityGeometryType.BBOX, None, None, "bbox"),
+        pytest.param(municipalities.MunicipalityGeometryType.NONE, None, None, None),
+    ],
+)
+def test_get_geometry_column(geometry, simplify, zoom, expected):
+    assert (
+        municipalities_router._get_geometry_column(geometry, simplify, zoom) == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "geometry_column, expected_geometry",
+    [
+        pytest.param(
+            "centroid", {"type": "Point", "coordinates": [11.05, 45.05]}, id="centroid"
+        ),
+        pytest.param(None, None, id="none"),
+    ],
+)
+def test_municipality_feature_geometry(geometry_column, expected_geometry):
+    municipality = municipalities.Municipality(
+        geom=from_shape(shapely.MultiPolygon([shapely.box(11.0, 45.0, 11.1, 45.1)])),
+        centroid=from_shape(shapely.Point(11.05, 45.05)),
+        name="fake",
+        province_name="fake province",
+        region_name="fake region",
+    )
+    feature = municipalities_geojson.MunicipalityFeatureCollectionItem.from_db_instance(
+        municipality, None, geometry_column
+    )
+    serialized = feature.model_dump(mode="json")
+    assert serialized["geometry"] == expected_geometry
+    assert serialized["properties"] == {
+        "name": "fake",
+        "province_name": "fake province",
+        "region_name": "fake region",
+    }
+
+
+@pytest.mark.parametrize(
+    "coords, expected_status, expected_names",
+    [
+        pytest.param("POINT(11.05 45.05)", 200, ["fake"]),
+        pytest.param("MULTIPOINT((11.05 45.05), (10 44))", 200, ["fake", None]),
+        pytest.param("POLYGON((0 0, 1 0, 1 1, 0 0))", 400, None),
+        pytest.param("POINT(", 400, None),
+    ],
+)
+def test_locate_municipalities(
+    v2_app, test_client_v2_app, coords, expected_status, expected_names
+):
+    location = spatialindex.MunicipalityLocation(
+        id=uuid.uuid4(),
+        name="fake",
+        province_name="fake province",
+        region_name="fake region",
+    )
+    v2_app.dependency_overrides[dependencies.get_municipality_index] = lambda: (
+        spatialindex.MunicipalityIndex(
+            [location], [shapely.box(11.0, 45.0, 11.1, 45.1)]
+        )
+    )
+    response = test_client_v2_app.get(
+        test_client_v2_app.app.url_path_for("locate_municipalities"),
+        params={"coords": coords},
+    )
+    assert response.status_code == expected_status
+    if expected_names is not None:
+        assert [
+            item["municipality"]["name"] if item["municipality"] else None
+            for item in response.json()["items"]
+        ] == expected_names